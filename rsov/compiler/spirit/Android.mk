@@ -17,9 +17,11 @@
 LOCAL_PATH := $(call my-dir)
 
 SPIRIT_SRCS := \
+	arena.cpp\
 	builder.cpp\
 	entity.cpp\
 	instructions.cpp\
+	layout.cpp\
 	module.cpp\
 	pass.cpp\
 	pass_queue.cpp\
@@ -63,11 +65,24 @@ GEN := \
 	enum_dispatches_generated.h\
 	type_inst_dispatches_generated.h\
 	const_inst_dispatches_generated.h\
-	factory_methods_generated.h
+	factory_methods_generated.h\
+	operand_kinds_generated.h\
+	operand_layouts_generated.h
 
 FULL_GEN := $(addprefix $(PATH_TO_GENERATED)/,$(GEN))
-$(FULL_GEN): $(SPIRV_CORE_GRAMMAR) $(GENERATOR)
-	$(GENERATOR) $< --$(notdir $(@:%_generated.h=%)) $@
+GEN_STAMP := $(PATH_TO_GENERATED)/generated.stamp
+$(GEN_STAMP): PRIVATE_OUTPUTS := \
+	$(foreach gen,$(GEN),--$(gen:%_generated.h=%)=$(PATH_TO_GENERATED)/$(gen))
+$(GEN_STAMP): $(SPIRV_CORE_GRAMMAR) $(GENERATOR)
+	$(GENERATOR) $< $(PRIVATE_OUTPUTS)
+	touch $@
+# The generator leaves unchanged headers untouched, so that their users are
+# only rebuilt when they change. A header deleted since the stamp was written
+# is generated again on its own.
+.KATI_RESTAT: $(FULL_GEN)
+$(FULL_GEN): $(GEN_STAMP)
+	@test -e $@ || $(GENERATOR) $(SPIRV_CORE_GRAMMAR) \
+	  --$(patsubst %_generated.h,%,$(notdir $@))=$@
 
 LOCAL_GENERATED_SOURCES := $(FULL_GEN)
 
@@ -104,8 +119,19 @@ GEN := \
 	types_generated.h
 
 FULL_GEN := $(addprefix $(PATH_TO_GENERATED)/,$(GEN))
-$(FULL_GEN): $(SPIRV_CORE_GRAMMAR) $(GENERATOR)
-	$(GENERATOR) $< --$(notdir $(@:%_generated.h=%)) $@
+GEN_STAMP := $(PATH_TO_GENERATED)/generated.stamp
+$(GEN_STAMP): PRIVATE_OUTPUTS := \
+	$(foreach gen,$(GEN),--$(gen:%_generated.h=%)=$(PATH_TO_GENERATED)/$(gen))
+$(GEN_STAMP): $(SPIRV_CORE_GRAMMAR) $(GENERATOR)
+	$(GENERATOR) $< $(PRIVATE_OUTPUTS)
+	touch $@
+# The generator leaves unchanged headers untouched, so that their users are
+# only rebuilt when they change. A header deleted since the stamp was written
+# is generated again on its own.
+.KATI_RESTAT: $(FULL_GEN)
+$(FULL_GEN): $(GEN_STAMP)
+	@test -e $@ || $(GENERATOR) $(SPIRV_CORE_GRAMMAR) \
+	  --$(patsubst %_generated.h,%,$(notdir $@))=$@
 
 LOCAL_GENERATED_SOURCES := $(FULL_GEN)
 
@@ -122,6 +148,7 @@ include $(BUILD_HOST_NATIVE_TEST)
 include $(CLEAR_VARS)
 
 LOCAL_SRC_FILES := \
+  arena.cpp \
   entity.cpp \
   instructions.cpp \
   instructions_test.cpp \
@@ -146,8 +173,19 @@ GEN := \
 	opcodes_generated.h
 
 FULL_GEN := $(addprefix $(PATH_TO_GENERATED)/,$(GEN))
-$(FULL_GEN): $(SPIRV_CORE_GRAMMAR) $(GENERATOR)
-	$(GENERATOR) $< --$(notdir $(@:%_generated.h=%)) $@
+GEN_STAMP := $(PATH_TO_GENERATED)/generated.stamp
+$(GEN_STAMP): PRIVATE_OUTPUTS := \
+	$(foreach gen,$(GEN),--$(gen:%_generated.h=%)=$(PATH_TO_GENERATED)/$(gen))
+$(GEN_STAMP): $(SPIRV_CORE_GRAMMAR) $(GENERATOR)
+	$(GENERATOR) $< $(PRIVATE_OUTPUTS)
+	touch $@
+# The generator leaves unchanged headers untouched, so that their users are
+# only rebuilt when they change. A header deleted since the stamp was written
+# is generated again on its own.
+.KATI_RESTAT: $(FULL_GEN)
+$(FULL_GEN): $(GEN_STAMP)
+	@test -e $@ || $(GENERATOR) $(SPIRV_CORE_GRAMMAR) \
+	  --$(patsubst %_generated.h,%,$(notdir $@))=$@
 
 LOCAL_GENERATED_SOURCES := $(FULL_GEN)
 
@@ -189,6 +227,7 @@ include $(CLEAR_VARS)
 
 LOCAL_SRC_FILES := \
   builder_test.cpp \
+  layout_test.cpp \
   module_test.cpp \
   transformer_test.cpp \
 
@@ -230,11 +269,24 @@ GEN := \
 	enum_dispatches_generated.h\
 	type_inst_dispatches_generated.h\
 	const_inst_dispatches_generated.h\
-	factory_methods_generated.h
+	factory_methods_generated.h\
+	operand_kinds_generated.h\
+	operand_layouts_generated.h
 
 FULL_GEN := $(addprefix $(PATH_TO_GENERATED)/,$(GEN))
-$(FULL_GEN): $(SPIRV_CORE_GRAMMAR) $(GENERATOR)
-	$(GENERATOR) $< --$(notdir $(@:%_generated.h=%)) $@
+GEN_STAMP := $(PATH_TO_GENERATED)/generated.stamp
+$(GEN_STAMP): PRIVATE_OUTPUTS := \
+	$(foreach gen,$(GEN),--$(gen:%_generated.h=%)=$(PATH_TO_GENERATED)/$(gen))
+$(GEN_STAMP): $(SPIRV_CORE_GRAMMAR) $(GENERATOR)
+	$(GENERATOR) $< $(PRIVATE_OUTPUTS)
+	touch $@
+# The generator leaves unchanged headers untouched, so that their users are
+# only rebuilt when they change. A header deleted since the stamp was written
+# is generated again on its own.
+.KATI_RESTAT: $(FULL_GEN)
+$(FULL_GEN): $(GEN_STAMP)
+	@test -e $@ || $(GENERATOR) $(SPIRV_CORE_GRAMMAR) \
+	  --$(patsubst %_generated.h,%,$(notdir $@))=$@
 
 LOCAL_GENERATED_SOURCES := $(FULL_GEN)
 
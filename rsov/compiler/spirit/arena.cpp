@@ -0,0 +1,122 @@
+/*
+ * Copyright 2017, The Android Open Source Project
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "arena.h"
+
+#include <cstddef>
+#include <new>
+
+namespace android {
+namespace spirit {
+
+namespace {
+
+// Precedes each object, to find the arena it was allocated from
+struct alignas(std::max_align_t) Header {
+  Arena *mArena;
+  size_t mSize; // including the header
+};
+
+size_t AlignUp(size_t size) {
+  constexpr size_t align = alignof(std::max_align_t);
+  return (size + align - 1) & ~(align - 1);
+}
+
+} // anonymous namespace
+
+Arena *Arena::mCurrent = nullptr;
+
+Arena::Arena(size_t blockSize)
+    : mBlockSize(blockSize), mBlock(nullptr), mNext(nullptr), mEnd(nullptr),
+      mRefCount(1), mNumAllocations(0), mBytesAllocated(0) {}
+
+Arena::~Arena() {
+  for (char *block : mBlocks) {
+    ::operator delete(block);
+  }
+}
+
+void *Arena::Allocate(size_t size) {
+  const size_t fullSize = sizeof(Header) + AlignUp(size);
+  Arena *arena = mCurrent;
+  Header *header = static_cast<Header *>(
+      arena ? arena->allocate(fullSize) : ::operator new(fullSize));
+  header->mArena = arena;
+  header->mSize = fullSize;
+  return header + 1;
+}
+
+void Arena::Free(void *ptr) {
+  if (ptr == nullptr) {
+    return;
+  }
+  Header *header = static_cast<Header *>(ptr) - 1;
+  if (header->mArena) {
+    header->mArena->deallocate(header, header->mSize);
+  } else {
+    ::operator delete(header);
+  }
+}
+
+void Arena::release() {
+  if (mCurrent == this) {
+    mCurrent = nullptr;
+  }
+  unref();
+}
+
+void *Arena::allocate(size_t size) {
+  if (size > (size_t)(mEnd - mNext)) {
+    // A large object gets a block of its own, so that the current block is
+    // not wasted
+    const size_t blockSize = size > mBlockSize / 4 ? size : mBlockSize;
+    char *block = static_cast<char *>(::operator new(blockSize));
+    mBlocks.push_back(block);
+    if (blockSize != mBlockSize) {
+      mRefCount++;
+      mNumAllocations++;
+      mBytesAllocated += size;
+      return block;
+    }
+    mBlock = mNext = block;
+    mEnd = block + blockSize;
+  }
+  void *ret = mNext;
+  mNext += size;
+  mRefCount++;
+  mNumAllocations++;
+  mBytesAllocated += size;
+  return ret;
+}
+
+void Arena::deallocate(void *ptr, size_t size) {
+  char *start = static_cast<char *>(ptr);
+  // The memory of the last object allocated is reused, as when deserializing
+  // an instruction as each possible type in turn until one succeeds
+  if (start >= mBlock && start + size == mNext) {
+    mNext = start;
+  }
+  unref();
+}
+
+void Arena::unref() {
+  if (--mRefCount == 0) {
+    delete this;
+  }
+}
+
+} // namespace spirit
+} // namespace android
@@ -0,0 +1,81 @@
+/*
+ * Copyright 2017, The Android Open Source Project
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef ARENA_H
+#define ARENA_H
+
+#include <stddef.h>
+
+#include <vector>
+
+namespace android {
+namespace spirit {
+
+// Bump allocator for the instructions of a module.
+//
+// Instructions are allocated from the arena of the current module, one block
+// of memory for many instructions, instead of one heap object each. Deleting
+// an instruction runs its destructor, but only gives its memory back if it
+// was the last allocated. The blocks are freed all at once, when the module
+// has released the arena and every instruction allocated from it has been
+// deleted, so that instructions that outlive their module stay valid.
+class Arena {
+public:
+  static constexpr size_t kDefaultBlockSize = 16 * 1024;
+
+  explicit Arena(size_t blockSize = kDefaultBlockSize);
+
+  static Arena *getCurrent() { return mCurrent; }
+  static void setCurrent(Arena *arena) { mCurrent = arena; }
+
+  // Allocates memory for an object from the current arena, or from the heap
+  // if there is none
+  static void *Allocate(size_t size);
+
+  // Frees memory returned by Allocate()
+  static void Free(void *ptr);
+
+  // Drops the reference of the owner of the arena, which is deleted once all
+  // the objects allocated from it are freed
+  void release();
+
+  size_t getNumAllocations() const { return mNumAllocations; }
+  size_t getNumBlocks() const { return mBlocks.size(); }
+  size_t getBytesAllocated() const { return mBytesAllocated; }
+
+private:
+  ~Arena();
+
+  void *allocate(size_t size);
+  void deallocate(void *ptr, size_t size);
+  void unref();
+
+  static Arena *mCurrent;
+
+  const size_t mBlockSize;
+  std::vector<char *> mBlocks;
+  char *mBlock; // the block being filled
+  char *mNext;
+  char *mEnd;
+  size_t mRefCount;
+  size_t mNumAllocations;
+  size_t mBytesAllocated;
+};
+
+} // namespace spirit
+} // namespace android
+
+#endif // ARENA_H
@@ -22,16 +22,42 @@
 #include "test_utils.h"
 #include "gtest/gtest.h"
 
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <memory>
+#include <new>
+
+// Number of allocations from the heap, for the benchmarks
+static size_t gNumHeapAllocations = 0;
+
+// Not inlined, so that the compiler does not pair the malloc() and free() in
+// them with the new and delete expressions of the code under test
+__attribute__((noinline)) void *operator new(size_t size) {
+  gNumHeapAllocations++;
+  if (void *ptr = std::malloc(size)) {
+    return ptr;
+  }
+  throw std::bad_alloc();
+}
+
+__attribute__((noinline)) void operator delete(void *ptr) noexcept {
+  std::free(ptr);
+}
+
+__attribute__((noinline)) void operator delete(void *ptr, size_t) noexcept {
+  std::free(ptr);
+}
+
 namespace android {
 namespace spirit {
 
-TEST(BuilderTest, testBuildAndSerialize) {
-  Builder b;
+namespace {
 
+// Builds an invert kernel, as in test_data/invert.spv
+Module *BuildInvertKernel(Builder &b) {
   Module *m = b.MakeModule();
 
-  ASSERT_NE(nullptr, m);
-
   m->addCapability(Capability::Shader);
   m->addCapability(Capability::Addresses);
   m->setMemoryModel(AddressingModel::Physical32, MemoryModel::GLSL450);
@@ -169,6 +195,18 @@ TEST(BuilderTest, testBuildAndSerialize) {
           //          ->addToInterface(GSize)
           ->setLocalSize(1, 1, 1));
 
+  return m;
+}
+
+} // anonymous namespace
+
+TEST(BuilderTest, testBuildAndSerialize) {
+  Builder b;
+
+  Module *m = BuildInvertKernel(b);
+
+  ASSERT_NE(nullptr, m);
+
   EXPECT_EQ(1, countEntity<MemoryModelInst>(m));
   EXPECT_EQ(1, countEntity<EntryPointInst>(m));
   EXPECT_EQ(3, countEntity<LoadInst>(m));
@@ -229,5 +267,53 @@ TEST(BuilderTest, testLoadAndModify) {
   EXPECT_TRUE(words == words1);
 }
 
+// Reports the heap and arena allocations and the time taken to build a kernel
+// through the Builder, and to load the greyscale kernels
+TEST(BuilderTest, benchmarkBuildAndLoad) {
+  constexpr int kIterations = 100;
+  using Clock = std::chrono::steady_clock;
+
+  size_t heapAllocations = gNumHeapAllocations;
+  size_t arenaAllocations = 0;
+  size_t arenaBlocks = 0;
+  auto start = Clock::now();
+  for (int i = 0; i < kIterations; i++) {
+    Builder b;
+    std::unique_ptr<Module> m(BuildInvertKernel(b));
+    arenaAllocations += m->getArena()->getNumAllocations();
+    arenaBlocks += m->getArena()->getNumBlocks();
+  }
+  std::chrono::duration<double, std::micro> time = Clock::now() - start;
+  heapAllocations = gNumHeapAllocations - heapAllocations;
+  std::cout << "Build invert: " << time.count() / kIterations << " us, "
+            << heapAllocations / kIterations << " heap allocations, "
+            << arenaAllocations / kIterations << " arena allocations in "
+            << arenaBlocks / kIterations << " arena blocks" << std::endl;
+
+  static const std::string testDataPath(
+      "frameworks/rs/rsov/compiler/spirit/test_data/");
+  for (const char *testFile : {"greyscale.spv", "greyscale2.spv"}) {
+    const auto words =
+        readFile<uint32_t>(getAbsolutePath(testDataPath + testFile));
+    heapAllocations = gNumHeapAllocations;
+    arenaAllocations = 0;
+    arenaBlocks = 0;
+    start = Clock::now();
+    for (int i = 0; i < kIterations; i++) {
+      std::unique_ptr<Module> m(Deserialize<Module>(words));
+      ASSERT_NE(nullptr, m);
+      arenaAllocations += m->getArena()->getNumAllocations();
+      arenaBlocks += m->getArena()->getNumBlocks();
+    }
+    time = Clock::now() - start;
+    heapAllocations = gNumHeapAllocations - heapAllocations;
+    std::cout << "Load " << testFile << ": " << time.count() / kIterations
+              << " us, " << heapAllocations / kIterations
+              << " heap allocations, " << arenaAllocations / kIterations
+              << " arena allocations in " << arenaBlocks / kIterations
+              << " arena blocks" << std::endl;
+  }
+}
+
 } // namespace spirit
 } // namespace android
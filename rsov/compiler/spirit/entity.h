@@ -55,7 +55,13 @@ template <typename T> T *Deserialize(InputWordStream &IS) {
 }
 
 template <typename T> T *Deserialize(const std::vector<uint32_t> &words) {
-  std::unique_ptr<InputWordStream> IS(InputWordStream::Create(words));
+  std::unique_ptr<InputWordStream> IS(
+      InputWordStream::Create(words.data(), words.size()));
+  return Deserialize<T>(*IS);
+}
+
+template <typename T> T *Deserialize(const char *filePath) {
+  std::unique_ptr<InputWordStream> IS(InputWordStream::Create(filePath));
   return Deserialize<T>(*IS);
 }
 
@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 #
 # Copyright (C) 2017 The Android Open Source Project
 #
@@ -15,28 +15,186 @@
 # limitations under the License.
 #
 
+"""Generates the spirit C++ sources from the SPIR-V core grammar.
+
+Usage: generate.py grammar.json --instructions=out.h [--types=out.h ...]
+                   [--python=spirv.py]
+
+The grammar is read once, and turned once into a model of each instruction:
+its members, fixed word count, id references and whether it has a result.
+Every output requested on the command line is then written from that model,
+each by its own writer function taking the stream to write to. Besides the
+C++ headers, --python writes a Python module reading and writing SPIR-V
+binaries, for host tools.
+
+Generation is incremental: next to each output is kept the digest of the
+grammar, of this script and of the options of the output. An output whose
+digest did not change is left alone, and an output is only replaced if its
+contents changed, so that its timestamp only moves when the C++ sources
+including it need to be rebuilt.
+"""
+
+import collections
+import functools
 import getopt
+import hashlib
+import io
 import json
-import string
+import os
 import sys
+import tempfile
+
+ID_REF_KINDS = frozenset(['IdRef', 'IdResultType', 'IdMemorySemantics',
+                          'IdScope'])
+
+# One operand of an instruction, as a member of its class
+Member = collections.namedtuple('Member', ['type', 'var', 'quantifier',
+                                           'comment'])
+
+
+class InstructionModel(object):
+    """What the writers need to know about an instruction of the grammar."""
+
+    def __init__(self, inst, kinds_by_name):
+        self.opname = inst['opname']
+        self.opcode = inst['opcode']
+        self.class_name = class_name(self.opname)
+        self.members = generate_member_list(inst.get('operands'))
+        self.fixed_word_count = fixed_word_count(self.members)
+        self.has_result = has_result(self.members)
+        # the members referring to ids, with the fields of each that do
+        self.id_refs = [(m, id_ref_fields(m.type, kinds_by_name))
+                        for m in self.members
+                        if id_ref_fields(m.type, kinds_by_name)]
+        # the parameters of the constructor and factory method, in order
+        self.params = [m for m in self.members if m.var != 'mResult']
+        # the operand kinds and quantifiers, for the operand layout tables
+        self.operands = [(operand['kind'], operand.get('quantifier'))
+                         for operand in inst.get('operands', [])]
+
+
+class Model(object):
+    """The grammar, and the model of each of its instructions."""
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        self.operand_kinds = grammar['operand_kinds']
+        self.operand_kinds_by_name = dict((ty['kind'], ty)
+                                          for ty in self.operand_kinds)
+        self.instructions = [InstructionModel(inst, self.operand_kinds_by_name)
+                             for inst in grammar['instructions']]
+
+
+@functools.lru_cache(maxsize=None)
+def read_grammar(grammar_path):
+    with open(grammar_path, 'rb') as grammar_file:
+        return grammar_file.read()
 
-def generate_header_file(filename, with_guard, printer):
-    f = open(filename, 'w')
-    orig_stdout = sys.stdout
-    sys.stdout = f
-    print '// DO NOT MODIFY. AUTO-GENERATED.\n'
+
+@functools.lru_cache(maxsize=None)
+def load_model(grammar_path):
+    return Model(json.loads(read_grammar(grammar_path).decode('utf-8')))
+
+
+@functools.lru_cache(maxsize=None)
+def generator_source():
+    with open(os.path.abspath(__file__), 'rb') as source:
+        return source.read()
+
+
+def output_digest(grammar_path, name, with_guard):
+    """Digest of what an output is generated from."""
+    sha = hashlib.sha256()
+    sha.update(read_grammar(grammar_path))
+    sha.update(generator_source())
+    sha.update(('%s:%s' % (name, with_guard)).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def digest_path(filename):
+    return filename + '.digest'
+
+
+def is_up_to_date(filename, digest):
+    try:
+        with open(digest_path(filename)) as digest_file:
+            return (digest_file.read().strip() == digest
+                    and os.path.exists(filename))
+    except IOError:
+        return False
+
+
+def replace_if_changed(filename, contents):
+    """Write a file, unless it already has these contents.
+
+    The contents are written to a temporary file next to it, which then
+    replaces it, so that a build interrupted halfway never leaves a truncated
+    output.
+
+    Returns:
+        True if the file was written.
+    """
+    try:
+        with open(filename, 'rb') as old:
+            if old.read() == contents:
+                return False
+    except IOError:
+        pass
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filename) or '.',
+                                    prefix='.' + os.path.basename(filename))
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(contents)
+        # mkstemp creates the file readable by its owner only
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return True
+
+
+def generate_header_file(filename, with_guard, writer, model):
+    out = io.StringIO()
+    out.write('// DO NOT MODIFY. AUTO-GENERATED.\n\n')
     if with_guard:
-        print "#pragma once"
-        print
-        print "namespace android {"
-        print "namespace spirit {"
-        print
-    printer()
+        out.write('#pragma once\n\n')
+        out.write('namespace android {\n')
+        out.write('namespace spirit {\n\n')
+    writer(out, model)
     if with_guard:
-        print "} // namespace spirit"
-        print "} // namespace android"
-    f.close()
-    sys.stdout = orig_stdout
+        out.write('} // namespace spirit\n')
+        out.write('} // namespace android\n')
+    return replace_if_changed(filename, out.getvalue().encode('utf-8'))
+
+
+def generate_python_file(filename, writer, model):
+    out = io.StringIO()
+    out.write('# DO NOT MODIFY. AUTO-GENERATED.\n')
+    writer(out, model)
+    return replace_if_changed(filename, out.getvalue().encode('utf-8'))
+
+
+def generate_output(grammar_path, name, filename):
+    """Generate an output, unless it is up to date.
+
+    Returns:
+        True if the output file was written.
+    """
+    with_guard, writer = OUTPUTS[name]
+    digest = output_digest(grammar_path, name, with_guard)
+    if is_up_to_date(filename, digest):
+        return False
+    if with_guard is None:
+        written = generate_python_file(filename, writer,
+                                       load_model(grammar_path))
+    else:
+        written = generate_header_file(filename, with_guard, writer,
+                                       load_model(grammar_path))
+    replace_if_changed(digest_path(filename), (digest + '\n').encode('utf-8'))
+    return written
 
 
 
@@ -55,43 +213,33 @@ def factory_method_name(opname, outlined):
 
 
 def factory_method_prototype(inst, outlined):
-    opname = inst['opname']
-    operands = inst.get('operands')
-    str = "%s *%s(" % (class_name(opname), factory_method_name(opname, outlined))
-    first = True;
-    for type, var, quantifier, comment in generate_member_list(operands):
-        if var != "mResult":
-            param = var[1:]
-            if first:
-                first = False
-            else:
-                str += ', '
-            if quantifier == '?':
-                str += '%s *%s=nullptr' % (type, param)
-            elif quantifier == '*':
-                vecTy = "std::vector<%s>" % type
-                str += '%s %s=%s()' % (vecTy, param, vecTy)
-            else:
-                str +=  '%s %s' % (type, param)
-    str += ')'
-    return str
+    params = []
+    for type, var, quantifier, comment in inst.params:
+        param = var[1:]
+        if quantifier == '?':
+            params.append('%s *%s=nullptr' % (type, param))
+        elif quantifier == '*':
+            vecTy = "std::vector<%s>" % type
+            params.append('%s %s=%s()' % (vecTy, param, vecTy))
+        else:
+            params.append('%s %s' % (type, param))
+    return "%s *%s(%s)" % (inst.class_name,
+                           factory_method_name(inst.opname, outlined),
+                           ', '.join(params))
+
 
 
+def moved(type, name):
+    """The argument passing name on, moved if copying it would allocate."""
+    if type == 'LiteralString':
+        return "std::move(%s)" % name
+    return name
+
 
 def factory_method_body(inst):
-    opname = inst['opname']
-    operands = inst.get('operands')
-    clazz = class_name(opname)
-    str = "%s *ret = new %s(" % (clazz, clazz)
-    first = True
-    for type, var, quantifier, comment in generate_member_list(operands):
-        if var != "mResult" and quantifier != '*' and quantifier != '?':
-            param = var[1:]
-            if first:
-                first = False
-            else:
-                str += ', '
-            str += param
+    clazz = inst.class_name
+    str = "%s *ret = new %s(%s" % (clazz, clazz, ', '.join(
+        moved(m.type, m.var[1:]) for m in inst.params if m.quantifier is None))
     str += """);
     if (!ret) {
         return nullptr;
@@ -102,27 +250,23 @@ def factory_method_body(inst):
       ret->setId(Module::getCurrentModule()->nextId());
     }
 """
-    for type, var, quantifier, comment in generate_member_list(operands):
+    for type, var, quantifier, comment in inst.members:
         param = var[1:]
-        # TODO: use vector::swap() or move instead of copy
-        if quantifier == '?' or quantifier == '*':
+        if quantifier == '?':
             str += "    ret->%s = %s;\n" % (var, param)
+        elif quantifier == '*':
+            str += "    ret->%s = std::move(%s);\n" % (var, param)
     str += "    return ret;"
     return str
 
 
 
-def print_factory_method(inst):
-    print """%s {
+def write_factory_methods(out, model):
+    for inst in model.instructions:
+        out.write("""%s {
     %s
-}""" % (factory_method_prototype(inst, False),
-        factory_method_body(inst))
-
-
-
-def print_factory_methods(insts):
-    for inst in insts:
-        print_factory_method(inst)
+}
+""" % (factory_method_prototype(inst, False), factory_method_body(inst)))
 
 
 
@@ -146,29 +290,27 @@ def enum_enumerants(ty, enumerants):
 
 def generate_enum(ty):
     typeName = ty['kind']
-    print """enum class %s : uint32_t {\n%s};
-""" % (typeName,
-       enum_enumerants(typeName, ty['enumerants']))
+    return """enum class %s : uint32_t {\n%s};
+
+""" % (typeName, enum_enumerants(typeName, ty['enumerants']))
 
 
 def generate_composite_fields(bases):
     str = ""
-    i = 0
-    for field in bases:
+    for i, field in enumerate(bases):
         str += "  %s mField%d;\n" % (field, i)
-        i = i + 1
     return str
 
 
 
-def print_type_definitions(operand_kinds):
-    for ty in operand_kinds:
+def write_type_definitions(out, model):
+    for ty in model.operand_kinds:
         category = ty['category']
         if category == 'BitEnum' or category == 'ValueEnum':
-            generate_enum(ty)
+            out.write(generate_enum(ty))
         elif category == 'Composite':
-            print "struct %s {\n%s};\n" % (ty['kind'],
-                                           generate_composite_fields(ty['bases']))
+            out.write("struct %s {\n%s};\n\n" % (
+                ty['kind'], generate_composite_fields(ty['bases'])))
 
 
 
@@ -199,8 +341,8 @@ def generate_member_list(operands):
             varName = "mOperand%d" % index
             index = index + 1
         quantifier = operand.get('quantifier')
-        comment = operand.get('name');
-        members.append((type, varName, quantifier, comment))
+        comment = operand.get('name')
+        members.append(Member(type, varName, quantifier, comment))
     return members
 
 def fixed_word_count(member_list):
@@ -219,55 +361,46 @@ def string_for_members(opname, member_list):
             member_str += "  /* %s\n  */\n" % comment
         member_str += "  "
         if quantifier == '?':
-            type = type + '*';
+            type = type + '*'
         elif quantifier == '*':
-            type = 'std::vector<%s>' % type;
+            type = 'std::vector<%s>' % type
         member_str += "%s %s;" % (type, var)
         if comment is not None and comment.find('\n') == -1:
             member_str += "  // %s" % comment
         member_str += "\n"
     return member_str
 
-def string_for_constructor(opname, opcode, members):
+def string_for_constructor(inst):
+    opname = inst.opname
+    members = inst.members
     # Default constructor
-    initializer = "Instruction(%s, %d)" % (opname, fixed_word_count(members))
-    first = True
+    initializer = "Instruction(%s, %d)" % (opname, inst.fixed_word_count)
     for type, var, quantifier, comment in members:
         if quantifier == '?':
             initializer += ", %s(nullptr)" % var
-    str = "%s() : %s {}" % (class_name(opname), initializer)
+    str = "%s() : %s {}" % (inst.class_name, initializer)
 
     # Constructor with values for members
-    if members == [] or (len(members) == 1 and members[0][0]=='IdResult'):
+    if members == [] or (len(members) == 1 and members[0].type == 'IdResult'):
         return str
-    nonOptionalOperandExists = False
-    for type, var, quantifier, comment in members:
-        if quantifier is None:
-            nonOptionalOperandExists = True
-    if not nonOptionalOperandExists:
+    if all(m.quantifier is not None for m in members):
         return str
-    params = ""
-    initializer = "Instruction(%s, %d)" % (opname, fixed_word_count(members))
-    first = True
-    for type, var, quantifier, comment in members:
-        if var != "mResult" and quantifier != '*':
-            initializer += ", "
-            if quantifier == '?':
-                initializer += "%s(nullptr)" % var
-            else:
-                if first:
-                    first = False
-                else:
-                    params += ", "
-                param = var[1:]  # remove the prefix "m"
-                params += "%s %s" % (type, param)
-                initializer += "%s(%s)" % (var, param)
-    if params != "":
-        str += "\n  %s(%s) :\n    %s {}" % (class_name(opname), params, initializer)
-    str += "\n  virtual ~%s() {}" % class_name(opname)
+    params = []
+    initializer = "Instruction(%s, %d)" % (opname, inst.fixed_word_count)
+    for type, var, quantifier, comment in inst.params:
+        if quantifier is None:
+            param = var[1:]  # remove the prefix "m"
+            params.append("%s %s" % (type, param))
+            initializer += ", %s(%s)" % (var, moved(type, param))
+        elif quantifier == '?':
+            initializer += ", %s(nullptr)" % var
+    if params:
+        str += "\n  %s(%s) :\n    %s {}" % (inst.class_name, ', '.join(params),
+                                            initializer)
+    str += "\n  virtual ~%s() {}" % inst.class_name
     return str
 
-def string_for_serializer_body(opcode, members):
+def string_for_serializer_body(members):
     body =  "setWordCount();\n"
     body += "    OS << mCodeAndCount;\n"
     for type, var, quantifier, comment in members:
@@ -293,14 +426,14 @@ def string_for_deserializer_body(name, members):
     body += " &&\n           DeserializeExtraOperands(IS);\n"
     return body
 
-def string_for_get_word_count(members):
-    str = """uint16_t getWordCount() const override {
+def string_for_compute_word_count(members):
+    str = """uint16_t computeWordCount() const override {
     uint16_t count = mFixedWordCount;\n"""
     for type, var, quantifier, comment in members:
         if quantifier == '?':
             str += "    if (%s) count += WordCount(*%s);\n" % (var, var)
         elif quantifier == '*':
-            str += "    if (!%s.empty()) count += WordCount(%s[0]) * %s.size();\n" % (var, var, var)
+            str += "    count += WordCount(%s);\n" % var
         elif type == 'LiteralString':
             str += "    count += WordCount(%s) - 1;\n" % var
 
@@ -309,10 +442,44 @@ def string_for_get_word_count(members):
   }"""
     return str
 
-def string_for_accept():
-    return """
-  void accept(IVisitor *v) override { v->visit(this); }
-"""
+def string_for_mutators(inst):
+    """Setters of the operands whose word count varies, which invalidate the
+    cached word count of the instruction."""
+    str = ""
+    for type, var, quantifier, comment in inst.members:
+        name = var[1:]
+        if quantifier == '?':
+            str += """
+  %s *set%s(%s *operand) {
+    %s = operand;
+    invalidateWordCount();
+    return this;
+  }
+""" % (inst.class_name, name, type, var)
+        elif quantifier == '*':
+            str += """
+  %s *add%s(const %s &operand) {
+    %s.push_back(operand);
+    invalidateWordCount();
+    return this;
+  }
+
+  %s *set%s(std::vector<%s> operands) {
+    %s = std::move(operands);
+    invalidateWordCount();
+    return this;
+  }
+""" % (inst.class_name, name, type, var,
+       inst.class_name, name, type, var)
+        elif type == 'LiteralString':
+            str += """
+  %s *set%s(%s operand) {
+    %s = std::move(operand);
+    invalidateWordCount();
+    return this;
+  }
+""" % (inst.class_name, name, type, var)
+    return str
 
 def has_result(members):
     for type, val, quantifier, comment in members:
@@ -328,37 +495,47 @@ def string_for_has_result(hasResult):
         retVal = "false"
     return "bool hasResult() const override { return %s; }" % retVal
 
-def string_for_get_all_refs(members):
-    str = """std::vector<const IdRef*> getAllIdRefs() const override {
-    std::vector<const IdRef*> ret = {"""
-    first = True
-    # TODO: what if references are in * operands?
-    for type, var, quantifier, comment in members:
-        if type == 'IdRef' or type == 'IdResultType' or type == 'IdMemorySemantics' or type == 'IdScope':
-            if quantifier == '*':
-                pass
+def id_ref_fields(type, kinds_by_name):
+    """The fields of an operand of this type that refer to ids.
+
+    An id is its own field, written as the empty string. The fields of a
+    composite are those of its bases that are ids.
+    """
+    if type in ID_REF_KINDS:
+        return ['']
+    ty = kinds_by_name.get(type)
+    if ty is None or ty['category'] != 'Composite':
+        return []
+    return ['.mField%d' % i for i, base in enumerate(ty['bases'])
+            if base in ID_REF_KINDS]
+
+
+def block(statements):
+    """A statement, or a block of several statements, on one line."""
+    if len(statements) == 1:
+        return statements[0]
+    return "{ %s }" % ' '.join(statements)
+
+
+def string_for_visit_id_refs(id_refs):
+    if not id_refs:
+        return "void visitIdRefs(IdRefVisitor *) const override {}"
+    str = "void visitIdRefs(IdRefVisitor *v) const override {\n"
+    for (type, var, quantifier, comment), fields in id_refs:
+        if quantifier == '?':
+            if fields == ['']:
+                visits = ["v->visit(*%s);" % var]
             else:
-                if first:
-                    first = False
-                else:
-                    str += ", "
-                if quantifier == '?':
-                    str += "%s" % var
-                else:
-                    str += "&%s" % var
-    str += """};
-"""
-    for type, var, quantifier, comment in members:
-        if type == 'IdRef' or type == 'IdResultType' or type == 'IdMemorySemantics' or type == 'IdScope':
-            if quantifier == '*':
-                str+="""
-    for(const auto &ref : %s) {
-        ret.push_back(&ref);
-    }
-""" % var
-    str += """
-    return ret;
-  }"""
+                visits = ["v->visit(%s->%s);" % (var, field[1:])
+                          for field in fields]
+            str += "    if (%s) %s\n" % (var, block(visits))
+        elif quantifier == '*':
+            visits = ["v->visit(ref%s);" % field for field in fields]
+            str += "    for (const auto &ref : %s) %s\n" % (var, block(visits))
+        else:
+            for field in fields:
+                str += "    v->visit(%s%s);\n" % (var, field)
+    str += "  }"
     return str
 
 def string_for_get_set_id(hasResult):
@@ -366,18 +543,12 @@ def string_for_get_set_id(hasResult):
         return """IdResult getId() const override { return mResult; }
   void setId(IdResult id) override { mResult = id; }"""
     else:
-        retVal = "0"
         return """IdResult getId() const override { return 0; }
   void setId(IdResult) override {}"""
 
 
-def print_instruction_class(inst):
-    opname = inst['opname']
-    opcode = inst['opcode']
-    operands = inst.get('operands')
-    members = generate_member_list(operands)
-    hasResult = has_result(members)
-    print """class %s : public Instruction {
+def string_for_instruction_class(inst):
+    return """class %s : public Instruction {
  public:
   %s
 
@@ -396,20 +567,22 @@ def print_instruction_class(inst):
   %s
 
   %s
-%s};
-""" % (class_name(opname),
-       string_for_constructor(opname, opcode, members),
-       string_for_serializer_body(opcode, members),
-       string_for_deserializer_body(opname, members),
-       string_for_get_word_count(members),
-       string_for_has_result(hasResult),
-       string_for_get_set_id(hasResult),
-       string_for_get_all_refs(members),
-       string_for_members(opname, members))
-
-def print_all_instruction_classes(insts):
-    for inst in insts:
-        print_instruction_class(inst)
+%s%s};
+
+""" % (inst.class_name,
+       string_for_constructor(inst),
+       string_for_serializer_body(inst.members),
+       string_for_deserializer_body(inst.opname, inst.members),
+       string_for_compute_word_count(inst.members),
+       string_for_has_result(inst.has_result),
+       string_for_get_set_id(inst.has_result),
+       string_for_visit_id_refs(inst.id_refs),
+       string_for_mutators(inst),
+       string_for_members(inst.opname, inst.members))
+
+def write_instruction_classes(out, model):
+    for inst in model.instructions:
+        out.write(string_for_instruction_class(inst))
 
 ################################################################################
 #
@@ -417,13 +590,31 @@ def print_all_instruction_classes(insts):
 #
 ################################################################################
 
-def print_opcode_enum(insts):
-    print "enum OpCode {"
-    for inst in insts:
-        opname = inst['opname']
-        opcode = inst['opcode']
-        print "  %s = %d," % (opname, opcode)
-    print "};"
+def write_opcode_enum(out, model):
+    out.write("enum OpCode {\n")
+    for inst in model.instructions:
+        out.write("  %s = %d,\n" % (inst.opname, inst.opcode))
+    out.write("};\n")
+    write_id_ref_bitmap(out, model)
+
+
+def write_id_ref_bitmap(out, model):
+    """Bitmap of the opcodes whose instructions may refer to ids."""
+    opcodes = [inst.opcode for inst in model.instructions if inst.id_refs]
+    bitmap = [0] * (max(inst.opcode for inst in model.instructions) // 64 + 1)
+    for opcode in opcodes:
+        bitmap[opcode // 64] |= 1 << (opcode % 64)
+    out.write("""
+// Returns false if instructions of the opcode never refer to an id
+inline bool HasIdRefs(uint32_t opcode) {
+  static constexpr uint64_t kBitmap[] = {
+""")
+    for word in bitmap:
+        out.write("    0x%016xULL,\n" % word)
+    out.write("""  };
+  return opcode < 64 * %d && ((kBitmap[opcode / 64] >> (opcode %% 64)) & 1);
+}
+""" % len(bitmap))
 
 
 
@@ -433,28 +624,705 @@ def print_opcode_enum(insts):
 #
 ################################################################################
 
-def print_dispatches(insts):
-    for inst in insts:
-        opname = inst['opname']
-        print "HANDLE_INSTRUCTION(%s,%s)" % (opname, class_name(opname))
-
-def print_type_inst_dispatches(insts):
-    for inst in insts:
-        opname = inst['opname']
-        if opname[:6] == "OpType":
-            print "HANDLE_INSTRUCTION(%s, %s)" % (opname, class_name(opname))
-
-def print_const_inst_dispatches(insts):
-    for inst in insts:
-        opname = inst['opname']
-        if opname[:10] == "OpConstant":
-            print "HANDLE_INSTRUCTION(%s, %s)" % (opname, class_name(opname))
-
-def print_enum_dispatches(operand_kinds):
-    for ty in operand_kinds:
+def write_dispatches(out, model):
+    for inst in model.instructions:
+        out.write("HANDLE_INSTRUCTION(%s,%s)\n" % (inst.opname,
+                                                  inst.class_name))
+
+def write_type_inst_dispatches(out, model):
+    for inst in model.instructions:
+        if inst.opname[:6] == "OpType":
+            out.write("HANDLE_INSTRUCTION(%s, %s)\n" % (inst.opname,
+                                                       inst.class_name))
+
+def write_const_inst_dispatches(out, model):
+    for inst in model.instructions:
+        if inst.opname[:10] == "OpConstant":
+            out.write("HANDLE_INSTRUCTION(%s, %s)\n" % (inst.opname,
+                                                       inst.class_name))
+
+def write_enum_dispatches(out, model):
+    for ty in model.operand_kinds:
         category = ty['category']
         if category == 'BitEnum' or category == 'ValueEnum':
-            print "HANDLE_ENUM(%s)" % ty['kind']
+            out.write("HANDLE_ENUM(%s)\n" % ty['kind'])
+
+
+
+################################################################################
+#
+# Generate operand layout tables
+#
+################################################################################
+
+# Operand kind of the words past the operands listed in the grammar
+EXTRA_OPERAND_KIND = 'ExtraOperand'
+
+QUANTIFIERS = {None: 'Quantifier::One', '?': 'Quantifier::Optional',
+               '*': 'Quantifier::ZeroOrMore'}
+
+# Word offset of an operand following a variable number of words
+VARIABLE_OFFSET = None
+
+
+def operand_kind_info(ty, kinds_by_name):
+    """Word count, id reference mask and result flag of an operand kind.
+
+    The word count of a literal string is 0, as it depends on its length.
+    Bit i of the mask is set if word i of the operand refers to an id.
+    """
+    kind = ty['kind']
+    category = ty['category']
+    if category == 'Id':
+        return 1, (0 if kind == 'IdResult' else 1), kind == 'IdResult'
+    if category == 'Composite':
+        mask = 0
+        for i, base in enumerate(ty['bases']):
+            if kinds_by_name[base]['category'] == 'Id':
+                mask |= 1 << i
+        return len(ty['bases']), mask, False
+    if kind == 'LiteralString':
+        return 0, 0, False
+    return 1, 0, False
+
+
+def operand_layouts(inst, kinds_by_name):
+    """The (kind, quantifier, word offset) of each operand of an instruction."""
+    layouts = []
+    offset = 1  # past the word of opcode and word count
+    for kind, quantifier in inst.operands:
+        layouts.append((kind, quantifier, offset))
+        words = operand_kind_info(kinds_by_name[kind], kinds_by_name)[0]
+        if offset is VARIABLE_OFFSET or quantifier is not None or words == 0:
+            offset = VARIABLE_OFFSET
+        else:
+            offset += words
+    return layouts
+
+
+def min_word_count(inst, kinds_by_name):
+    wc = 1
+    for kind, quantifier in inst.operands:
+        if quantifier is None:
+            wc += max(1, operand_kind_info(kinds_by_name[kind],
+                                           kinds_by_name)[0])
+    return wc
+
+
+def write_operand_kinds(out, model):
+    out.write("enum class OperandKind : uint8_t {\n")
+    for ty in model.operand_kinds:
+        out.write("  %s,\n" % ty['kind'])
+    out.write("  %s,\n" % EXTRA_OPERAND_KIND)
+    out.write("};\n\n")
+
+
+def write_operand_layouts(out, model):
+    kinds = model.operand_kinds_by_name
+    out.write("static constexpr OperandKindInfo kOperandKindInfos[] = {\n")
+    for ty in model.operand_kinds:
+        words, mask, is_result = operand_kind_info(ty, kinds)
+        out.write("  {%d, 0x%x, %s}, // %s\n" % (
+            words, mask, 'true' if is_result else 'false', ty['kind']))
+    out.write("  {1, 0x0, false}, // %s\n" % EXTRA_OPERAND_KIND)
+    out.write("};\n\n")
+
+    num_operands = 0
+    for inst in model.instructions:
+        if not inst.operands:
+            continue
+        out.write("static constexpr OperandLayout k%sOperands[] = {\n"
+                  % inst.opname)
+        for kind, quantifier, offset in operand_layouts(inst, kinds):
+            out.write("  {OperandKind::%s, %s, %s},\n" % (
+                kind, QUANTIFIERS[quantifier],
+                'kVariableOffset' if offset is VARIABLE_OFFSET else offset))
+        out.write("};\n\n")
+        num_operands += len(inst.operands)
+
+    out.write("static constexpr InstructionLayout kInstructionLayouts[] = {\n")
+    for inst in model.instructions:
+        operands = ("k%sOperands" % inst.opname) if inst.operands else 'nullptr'
+        out.write("  {%s, %d, %d, %s},\n" % (
+            inst.opname, min_word_count(inst, kinds), len(inst.operands),
+            operands))
+    out.write("};\n\n")
+
+    out.write("static constexpr size_t kNumOperandLayouts = %d;\n\n"
+              % num_operands)
+
+    out.write("static const InstructionLayout *"
+              "LookupInstructionLayout(uint32_t opcode) {\n")
+    out.write("  switch (opcode) {\n")
+    for i, inst in enumerate(model.instructions):
+        out.write("  case %s: return &kInstructionLayouts[%d];\n"
+                  % (inst.opname, i))
+    out.write("  default: return nullptr;\n")
+    out.write("  }\n")
+    out.write("}\n\n")
+
+
+
+################################################################################
+#
+# Generate Python reader and writer
+#
+################################################################################
+
+PYTHON_PROLOGUE = '''
+"""Reads and writes SPIR-V modules, for host tools.
+
+The layout of the operands of each opcode is generated from the grammar, as
+for the C++ layout tables. A module is indexed by instruction on first use,
+recording only the offset and opcode of each instruction, and the operands of
+an instruction are decoded when asked for. The words are read in place, from
+a memoryview or, if NumPy is installed, a NumPy array, which the opcode
+histogram and the index of id uses then work on as a whole.
+
+Usage: python spirv.py [--histogram] module.spv...
+"""
+
+import argparse
+import array
+import collections
+import mmap
+import os
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+'''
+
+# The code of the module, which only depends on the tables
+PYTHON_RUNTIME = r'''
+MAGIC_NUMBER = 0x07230203
+HEADER_WORD_COUNT = 5
+EXTRA_OPERAND = 'ExtraOperand'
+
+_SWAPPED_MAGIC_NUMBER = 0x03022307
+
+
+def _is_numpy(words):
+    return numpy is not None and isinstance(words, numpy.ndarray)
+
+
+def _string_word_count(words, start, end):
+    for i in range(start, end):
+        if not words[i] & 0xFF000000:
+            return i - start + 1
+    raise ValueError('Unterminated literal string at word %d' % start)
+
+
+def decode_string(words):
+    """Decodes the words of a literal string."""
+    data = array.array('I', [int(word) for word in words])
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes().split(b'\0', 1)[0].decode('utf-8')
+
+
+def encode_string(string):
+    """Encodes a literal string into words, nul terminated and padded."""
+    data = string.encode('utf-8') + b'\0'
+    data += b'\0' * (-len(data) % 4)
+    words = array.array('I')
+    words.frombytes(data)
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return words.tolist()
+
+
+def enumerant_value(kind, name):
+    """The value of an enumerant, or of flags joined by '|'."""
+    value = 0
+    for flag in name.split('|'):
+        value |= ENUMERANT_VALUES[kind][flag.strip()]
+    return value
+
+
+def operand_spans(words, start, opcode):
+    """Splits the operands of the instruction at words[start].
+
+    Returns:
+        A list of (kind, offset, count): the operand kind, and the offset
+        from start and the number of its words. The words past the operands
+        of the grammar are returned one by one, as EXTRA_OPERAND.
+    """
+    word_count = int(words[start]) >> 16
+    end = start + word_count
+    spans = []
+    offset = start + 1
+    for kind, quantifier in LAYOUTS.get(opcode, ()):
+        size = OPERAND_KINDS[kind][0]
+        while True:
+            if offset >= end:
+                if quantifier is None:
+                    raise ValueError('Missing operand %s of %s at word %d' %
+                                     (kind, OPNAMES[opcode], start))
+                break
+            count = size or _string_word_count(words, offset, end)
+            if offset + count > end:
+                raise ValueError('Truncated operand %s of %s at word %d' %
+                                 (kind, OPNAMES[opcode], start))
+            spans.append((kind, offset - start, count))
+            offset += count
+            if quantifier != '*':
+                break
+    for offset in range(offset, end):
+        spans.append((EXTRA_OPERAND, offset - start, 1))
+    return spans
+
+
+class Instruction(object):
+    """An instruction of a module, whose operands are decoded on demand."""
+
+    __slots__ = ('module', 'index', 'offset', 'opcode')
+
+    def __init__(self, module, index, offset, opcode):
+        self.module = module
+        self.index = index
+        self.offset = offset
+        self.opcode = opcode
+
+    @property
+    def opname(self):
+        return OPNAMES.get(self.opcode, 'Op%d' % self.opcode)
+
+    @property
+    def word_count(self):
+        return int(self.module.words[self.offset]) >> 16
+
+    @property
+    def words(self):
+        return self.module.words[self.offset:self.offset + self.word_count]
+
+    def operands(self):
+        """Decodes the operands.
+
+        Returns:
+            A list of (kind, value): an int for an id, a literal number or
+            an enumerant, a str for a literal string, and a tuple of ints
+            for a pair.
+        """
+        words = self.module.words
+        operands = []
+        for kind, offset, count in operand_spans(words, self.offset,
+                                                 self.opcode):
+            start = self.offset + offset
+            if kind == 'LiteralString':
+                value = decode_string(words[start:start + count])
+            elif count == 1:
+                value = int(words[start])
+            else:
+                value = tuple(int(word) for word in words[start:start + count])
+            operands.append((kind, value))
+        return operands
+
+    def result_id(self):
+        """The id the instruction defines, or None."""
+        offset = RESULT_OFFSETS.get(self.opcode)
+        if offset is None or offset >= self.word_count:
+            return None
+        return int(self.module.words[self.offset + offset])
+
+    def id_refs(self):
+        """The ids the instruction refers to, in order."""
+        words = self.module.words
+        ids = []
+        for kind, offset, count in operand_spans(words, self.offset,
+                                                 self.opcode):
+            mask = OPERAND_KINDS[kind][1]
+            for i in range(count):
+                if mask & (1 << i):
+                    ids.append(int(words[self.offset + offset + i]))
+        return ids
+
+    def __repr__(self):
+        operands = []
+        for kind, value in self.operands():
+            names = ENUMERANTS.get(kind)
+            if kind == 'IdResult':
+                continue
+            if names and value in names:
+                operands.append(names[value])
+            elif OPERAND_KINDS[kind][1] == 1:
+                operands.append('%%%d' % value)
+            else:
+                operands.append(repr(value))
+        text = ' '.join([self.opname] + operands)
+        result = self.result_id()
+        if result is not None:
+            text = '%%%d = %s' % (result, text)
+        return text
+
+
+class Module(object):
+    """A SPIR-V module, indexed by instruction on first use.
+
+    The words are kept as given: an array('I') or a memoryview of format
+    'I', or a NumPy array of uint32 when NumPy is installed, in the byte
+    order of the host.
+    """
+
+    def __init__(self, words):
+        if len(words) < HEADER_WORD_COUNT or words[0] != MAGIC_NUMBER:
+            raise ValueError('Not a SPIR-V module')
+        self.words = words
+        self._offsets = None
+        self._opcodes = None
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reads a module in place, unless its byte order is swapped."""
+        if len(data) % 4:
+            raise ValueError('Not a whole number of words')
+        if numpy is not None:
+            words = numpy.frombuffer(data, dtype=numpy.uint32)
+        else:
+            words = memoryview(data).cast('B').cast('I')
+        if len(words) and words[0] == _SWAPPED_MAGIC_NUMBER:
+            if numpy is not None:
+                words = words.byteswap()
+            else:
+                words = array.array('I', words)
+                words.byteswap()
+        return cls(words)
+
+    @classmethod
+    def from_file(cls, path):
+        """Reads a module from a file, mapped into memory."""
+        with open(path, 'rb') as module_file:
+            if os.fstat(module_file.fileno()).st_size == 0:
+                raise ValueError('Not a SPIR-V module')
+            data = mmap.mmap(module_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_bytes(data)
+
+    @property
+    def version(self):
+        return (int(self.words[1]) >> 16) & 0xFF, (int(self.words[1]) >> 8) & 0xFF
+
+    @property
+    def generator(self):
+        return int(self.words[2])
+
+    @property
+    def bound(self):
+        return int(self.words[3])
+
+    def _index(self):
+        words = self.words
+        if _is_numpy(words):
+            words = words.tolist()
+        offsets = array.array('I')
+        end = len(words)
+        i = HEADER_WORD_COUNT
+        while i < end:
+            word_count = words[i] >> 16
+            if word_count == 0 or i + word_count > end:
+                raise ValueError('Malformed instruction at word %d' % i)
+            offsets.append(i)
+            i += word_count
+        if _is_numpy(self.words):
+            self._offsets = numpy.frombuffer(offsets, dtype=numpy.uint32)
+            self._opcodes = self.words[self._offsets] & 0xFFFF
+        else:
+            self._offsets = offsets
+            self._opcodes = array.array(
+                'H', [words[offset] & 0xFFFF for offset in offsets])
+
+    @property
+    def offsets(self):
+        """The word offset of each instruction."""
+        if self._offsets is None:
+            self._index()
+        return self._offsets
+
+    @property
+    def opcodes(self):
+        """The opcode of each instruction."""
+        if self._opcodes is None:
+            self._index()
+        return self._opcodes
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return Instruction(self, index, int(self.offsets[index]),
+                           int(self.opcodes[index]))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def histogram(self):
+        """Counts the instructions of each opcode, by opcode name."""
+        if _is_numpy(self.opcodes):
+            counts = numpy.bincount(self.opcodes)
+            counts = dict((int(opcode), int(counts[opcode]))
+                          for opcode in numpy.flatnonzero(counts))
+        else:
+            counts = collections.Counter(self.opcodes)
+        return collections.Counter(
+            dict((OPNAMES.get(opcode, 'Op%d' % opcode), count)
+                 for opcode, count in counts.items()))
+
+    def _fixed_ids(self, table):
+        """Yields (ids, instruction indices) for the ids at fixed offsets."""
+        opcodes = self.opcodes
+        if _is_numpy(opcodes):
+            for opcode in numpy.unique(opcodes):
+                indices = numpy.flatnonzero(opcodes == opcode)
+                for offset in table.get(int(opcode), ()):
+                    yield self.words[self.offsets[indices] + offset], indices
+            return
+        words = self.words
+        offsets = self.offsets
+        ids = []
+        indices = []
+        for index, opcode in enumerate(opcodes):
+            for offset in table.get(opcode, ()):
+                ids.append(words[offsets[index] + offset])
+                indices.append(index)
+        yield ids, indices
+
+    def definitions(self):
+        """Maps each id to the index of the instruction defining it."""
+        result_offsets = dict((opcode, (offset,)) for opcode, offset
+                              in RESULT_OFFSETS.items())
+        definitions = {}
+        for ids, indices in self._fixed_ids(result_offsets):
+            definitions.update(zip((int(i) for i in ids),
+                                   (int(i) for i in indices)))
+        return definitions
+
+    def id_uses(self):
+        """Maps each id to the indices of the instructions referring to it.
+
+        The ids at a fixed offset in their instruction, most of them, are
+        gathered for all the instructions of an opcode at once. Only the
+        instructions with ids after operands of variable size are decoded
+        one by one.
+        """
+        uses = collections.defaultdict(list)
+        for ids, indices in self._fixed_ids(FIXED_ID_OFFSETS):
+            for id_, index in zip(ids, indices):
+                uses[int(id_)].append(int(index))
+        for index, opcode in enumerate(self.opcodes):
+            if int(opcode) in VARIABLE_ID_OPCODES:
+                inst = self[index]
+                fixed = len(FIXED_ID_OFFSETS.get(inst.opcode, ()))
+                for id_ in inst.id_refs()[fixed:]:
+                    uses[id_].append(index)
+        for indices in uses.values():
+            indices.sort()
+        return dict(uses)
+
+    def to_bytes(self):
+        if _is_numpy(self.words):
+            return self.words.astype('<u4').tobytes()
+        words = array.array('I', self.words)
+        if sys.byteorder == 'big':
+            words.byteswap()
+        return words.tobytes()
+
+
+def encode_instruction(opname, *operands):
+    """Encodes an instruction.
+
+    Args:
+        opname: The name of the opcode, e.g. 'OpName'.
+        operands: The operands in the order of the grammar, the result id
+            included: ints for ids and literal numbers, ints or names for
+            enumerants, strs for literal strings, and tuples for pairs.
+            Any operand past those of the grammar is encoded as one word.
+
+    Returns:
+        A list of words.
+    """
+    opcode = OPCODES[opname]
+    words = [0]
+    operands = list(operands)
+    for kind, quantifier in LAYOUTS[opcode]:
+        while operands:
+            value = operands.pop(0)
+            if kind == 'LiteralString':
+                words.extend(encode_string(value))
+            elif isinstance(value, tuple):
+                words.extend(value)
+            elif isinstance(value, str):
+                words.append(enumerant_value(kind, value))
+            else:
+                words.append(value)
+            if quantifier != '*':
+                break
+        else:
+            if quantifier is None:
+                raise ValueError('Missing operand %s of %s' % (kind, opname))
+    words.extend(operands)
+    if len(words) > 0xFFFF:
+        raise ValueError('Too many operands for %s' % opname)
+    words[0] = (len(words) << 16) | opcode
+    return words
+
+
+def encode_module(instructions, bound, version=(1, 1), generator=0):
+    """Encodes a module.
+
+    Args:
+        instructions: The instructions, each a list of words, as returned by
+            encode_instruction(), or an Instruction of another module.
+        bound: Every id of the module is less than this.
+        version: The (major, minor) version of SPIR-V.
+        generator: The magic number of the generator of the module.
+
+    Returns:
+        An array('I') of the words of the module.
+    """
+    words = array.array('I', [MAGIC_NUMBER,
+                              (version[0] << 16) | (version[1] << 8),
+                              generator, bound, 0])
+    for inst in instructions:
+        if isinstance(inst, Instruction):
+            inst = inst.words
+        words.extend(int(word) for word in inst)
+    return words
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Print SPIR-V modules, or the histogram of their opcodes.')
+    parser.add_argument('modules', nargs='+', help='The .spv files.')
+    parser.add_argument('--histogram', action='store_true',
+                        help='Print the number of instructions by opcode.')
+    args = parser.parse_args()
+    for path in args.modules:
+        module = Module.from_file(path)
+        if len(args.modules) > 1:
+            print('%s:' % path)
+        if args.histogram:
+            for opname, count in module.histogram().most_common():
+                print('%8d %s' % (count, opname))
+        else:
+            for inst in module:
+                print(repr(inst))
+
+
+if __name__ == '__main__':
+    main()
+'''
+
+
+def enumerant_values(ty):
+    values = []
+    for enumerant in ty['enumerants']:
+        value = enumerant['value']
+        if not isinstance(value, int):
+            value = int(value, 0)
+        values.append((enumerant['enumerant'], value))
+    return values
+
+
+def python_id_offsets(inst, kinds_by_name):
+    """The word offsets of the result and of the ids at fixed offsets.
+
+    Returns:
+        The offset of the result id, or None, the offsets of the ids referred
+        to at fixed offsets, and whether other operands may refer to ids.
+    """
+    result = None
+    fixed = []
+    variable = False
+    for kind, quantifier, offset in operand_layouts(inst, kinds_by_name):
+        words, mask, is_result = operand_kind_info(kinds_by_name[kind],
+                                                   kinds_by_name)
+        if offset is VARIABLE_OFFSET or quantifier is not None:
+            variable = variable or mask != 0
+        elif is_result:
+            result = offset
+        else:
+            fixed.extend(offset + i for i in range(words) if mask & (1 << i))
+    return result, fixed, variable
+
+
+def write_python_module(out, model):
+    kinds = model.operand_kinds_by_name
+    out.write(PYTHON_PROLOGUE)
+
+    out.write("OPCODES = {\n")
+    for inst in model.instructions:
+        out.write("    %r: %d,\n" % (inst.opname, inst.opcode))
+    out.write("}\n\n")
+    out.write("OPNAMES = dict((opcode, opname) for opname, opcode "
+              "in OPCODES.items())\n\n")
+
+    out.write("# kind: (word count, 0 for a literal string, id reference "
+              "mask, is result)\n")
+    out.write("OPERAND_KINDS = {\n")
+    for ty in model.operand_kinds:
+        out.write("    %r: (%d, 0x%x, %r),\n"
+                  % ((ty['kind'],) + operand_kind_info(ty, kinds)))
+    out.write("    %r: (1, 0x0, False),\n" % EXTRA_OPERAND_KIND)
+    out.write("}\n\n")
+
+    out.write("# opcode: ((kind, quantifier), ...)\n")
+    out.write("LAYOUTS = {\n")
+    for inst in model.instructions:
+        out.write("    %d: %r,  # %s\n" % (
+            inst.opcode, tuple(inst.operands), inst.opname))
+    out.write("}\n\n")
+
+    out.write("ENUMERANT_VALUES = {\n")
+    for ty in model.operand_kinds:
+        if ty['category'] in ('BitEnum', 'ValueEnum'):
+            out.write("    %r: {\n" % ty['kind'])
+            for name, value in enumerant_values(ty):
+                out.write("        %r: 0x%x,\n" % (name, value))
+            out.write("    },\n")
+    out.write("}\n\n")
+    out.write("ENUMERANTS = dict(\n"
+              "    (kind, dict((value, name) for name, value\n"
+              "                in reversed(list(values.items()))))\n"
+              "    for kind, values in ENUMERANT_VALUES.items())\n\n")
+
+    result_offsets = []
+    fixed_id_offsets = []
+    variable_id_opcodes = []
+    for inst in model.instructions:
+        result, fixed, variable = python_id_offsets(inst, kinds)
+        if result is not None:
+            result_offsets.append((inst, result))
+        if fixed:
+            fixed_id_offsets.append((inst, fixed))
+        if variable:
+            variable_id_opcodes.append(inst)
+
+    out.write("# opcode: word offset of the result id\n")
+    out.write("RESULT_OFFSETS = {\n")
+    for inst, offset in result_offsets:
+        out.write("    %d: %d,  # %s\n" % (inst.opcode, offset, inst.opname))
+    out.write("}\n\n")
+
+    out.write("# opcode: word offsets of the ids referred to, which do not "
+              "follow any operand\n# of variable size\n")
+    out.write("FIXED_ID_OFFSETS = {\n")
+    for inst, offsets in fixed_id_offsets:
+        out.write("    %d: %r,  # %s\n" % (
+            inst.opcode, tuple(offsets), inst.opname))
+    out.write("}\n\n")
+
+    out.write("# The opcodes with ids referred to at variable offsets\n")
+    out.write("VARIABLE_ID_OPCODES = frozenset([\n")
+    for inst in variable_id_opcodes:
+        out.write("    %d,  # %s\n" % (inst.opcode, inst.opname))
+    out.write("])\n")
+
+    out.write(PYTHON_RUNTIME)
 
 
 
@@ -464,44 +1332,34 @@ def print_enum_dispatches(operand_kinds):
 #
 ################################################################################
 
+# The outputs: command line option, whether the file needs the namespaces
+# (None for a Python module), and the writer of its contents
+OUTPUTS = collections.OrderedDict([
+    ("instructions", (True, write_instruction_classes)),
+    ("types", (True, write_type_definitions)),
+    ("opcodes", (True, write_opcode_enum)),
+    ("instruction_dispatches", (False, write_dispatches)),
+    ("enum_dispatches", (False, write_enum_dispatches)),
+    ("type_inst_dispatches", (False, write_type_inst_dispatches)),
+    ("const_inst_dispatches", (False, write_const_inst_dispatches)),
+    ("factory_methods", (False, write_factory_methods)),
+    ("operand_kinds", (True, write_operand_kinds)),
+    ("operand_layouts", (True, write_operand_layouts)),
+    ("python", (None, write_python_module)),
+])
+
 def main():
     try:
-        opts, args = getopt.getopt(sys.argv[2:],"h",["instructions=",
-                                                     "types=",
-                                                     "opcodes=",
-                                                     "instruction_dispatches=",
-                                                     "enum_dispatches=",
-                                                     "type_inst_dispatches=",
-                                                     "const_inst_dispatches=",
-                                                     "factory_methods="])
+        opts, args = getopt.getopt(sys.argv[2:], "h",
+                                   [name + "=" for name in OUTPUTS])
     except getopt.GetoptError:
-        print sys.argv[0], ''
+        print(sys.argv[0], '')
         sys.exit(2)
 
-    with open(sys.argv[1]) as grammar_file:
-        grammar = json.load(grammar_file)
-
-    instructions = grammar['instructions']
-
     for opt, arg in opts:
-        if opt == "--instructions":
-            generate_header_file(arg, True, lambda: print_all_instruction_classes(instructions))
-        elif opt == "--types":
-            kinds = grammar['operand_kinds']
-            generate_header_file(arg, True, lambda: print_type_definitions(kinds))
-        elif opt == "--opcodes":
-            generate_header_file(arg, True, lambda: print_opcode_enum(instructions))
-        elif opt == "--instruction_dispatches":
-            generate_header_file(arg, False, lambda: print_dispatches(instructions))
-        elif opt == "--enum_dispatches":
-            kinds = grammar['operand_kinds']
-            generate_header_file(arg, False, lambda: print_enum_dispatches(kinds))
-        elif opt == "--type_inst_dispatches":
-            generate_header_file(arg, False, lambda: print_type_inst_dispatches(instructions))
-        elif opt == "--const_inst_dispatches":
-            generate_header_file(arg, False, lambda: print_const_inst_dispatches(instructions))
-        elif opt == "--factory_methods":
-            generate_header_file(arg, False, lambda: print_factory_methods(instructions))
+        name = opt[2:]
+        if name in OUTPUTS:
+            generate_output(sys.argv[1], name, arg)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2017 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Tests the Python SPIR-V reader and writer written by generate.py --python.
+
+Usage: generate_python_test.py [grammar.json]
+
+The module is generated from the grammar given on the command line, or else
+from the core grammar of the NDK prebuilts under $ANDROID_BUILD_TOP, and
+checked against the modules of test_data.
+"""
+
+import array
+import collections
+import glob
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SPIRIT_DIR = os.path.dirname(os.path.abspath(__file__))
+GENERATOR = os.path.join(SPIRIT_DIR, 'generate.py')
+TEST_DATA = sorted(glob.glob(os.path.join(SPIRIT_DIR, 'test_data', '*.spv')))
+CORE_GRAMMAR = ('prebuilts/ndk/current/sources/third_party/shaderc/'
+                'third_party/spirv-tools/external/spirv-headers/include/'
+                'spirv/1.1/spirv.core.grammar.json')
+
+grammar_path = os.path.join(os.environ.get('ANDROID_BUILD_TOP', ''),
+                            CORE_GRAMMAR)
+
+
+def read_words(path):
+    words = array.array('I')
+    with open(path, 'rb') as module_file:
+        words.frombytes(module_file.read())
+    return words
+
+
+def decode_plainly(words):
+    """Splits the words of a module into (opcode, words) pairs."""
+    instructions = []
+    i = 5
+    while i < len(words):
+        word_count = words[i] >> 16
+        instructions.append((words[i] & 0xFFFF, words[i:i + word_count]))
+        i += word_count
+    return instructions
+
+
+class GeneratePythonTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        if not os.path.exists(grammar_path):
+            raise unittest.SkipTest('No grammar at ' + grammar_path)
+        cls.tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(cls.tmp_dir, 'spirv.py')
+        subprocess.check_call([sys.executable, GENERATOR, grammar_path,
+                               '--python=' + path])
+        spec = importlib.util.spec_from_file_location('spirv', path)
+        cls.spirv = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cls.spirv)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_round_trip(self):
+        for path in TEST_DATA:
+            with open(path, 'rb') as module_file:
+                data = module_file.read()
+            module = self.spirv.Module.from_file(path)
+            self.assertEqual(data, module.to_bytes(), path)
+
+            instructions = [
+                self.spirv.encode_instruction(
+                    inst.opname, *[value for _, value in inst.operands()])
+                for inst in module]
+            words = self.spirv.encode_module(instructions, module.bound,
+                                             module.version, module.generator)
+            self.assertEqual(data, words.tobytes(), path)
+
+    def test_byte_swapped(self):
+        for path in TEST_DATA:
+            module = self.spirv.Module(read_words(path))
+            words = read_words(path)
+            words.byteswap()
+            swapped = self.spirv.Module.from_bytes(words.tobytes())
+            self.assertEqual(module.to_bytes(), swapped.to_bytes(), path)
+            self.assertEqual([inst.operands() for inst in module],
+                             [inst.operands() for inst in swapped], path)
+
+    def test_histogram(self):
+        for path in TEST_DATA:
+            module = self.spirv.Module.from_file(path)
+            expected = collections.Counter(
+                self.spirv.OPNAMES[opcode]
+                for opcode, _ in decode_plainly(read_words(path)))
+            self.assertEqual(expected, module.histogram(), path)
+
+    def test_id_uses(self):
+        for path in TEST_DATA:
+            module = self.spirv.Module.from_file(path)
+            uses = collections.defaultdict(list)
+            definitions = {}
+            for index, inst in enumerate(module):
+                for id_ in inst.id_refs():
+                    uses[id_].append(index)
+                if inst.result_id() is not None:
+                    definitions[inst.result_id()] = index
+            self.assertEqual(dict(uses), module.id_uses(), path)
+            self.assertEqual(definitions, module.definitions(), path)
+
+    def test_encode_instruction(self):
+        spirv = self.spirv
+        self.assertEqual([(3 << 16) | spirv.OPCODES['OpName'], 1, 0x6261],
+                         spirv.encode_instruction('OpName', 1, 'ab'))
+        self.assertEqual(
+            [(3 << 16) | spirv.OPCODES['OpMemoryModel'], 0, 1],
+            spirv.encode_instruction('OpMemoryModel', 'Logical', 'GLSL450'))
+        with self.assertRaises(ValueError):
+            spirv.encode_instruction('OpName', 1)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and not sys.argv[1].startswith('-'):
+        grammar_path = sys.argv.pop(1)
+    unittest.main()
@@ -21,8 +21,10 @@
 
 #include <iostream>
 #include <string>
+#include <utility>
 #include <vector>
 
+#include "arena.h"
 #include "core_defs.h"
 #include "entity.h"
 #include "opcodes_generated.h"
@@ -42,6 +44,30 @@ inline uint16_t WordCount(PairIdRefIdRef) { return 2; }
 inline uint16_t WordCount(const std::string &operand) {
   return operand.length() / 4 + 1;
 }
+template <typename T> uint16_t WordCount(const std::vector<T> &operands) {
+  uint16_t count = 0;
+  for (const T &operand : operands) {
+    count += WordCount(operand);
+  }
+  return count;
+}
+
+class IdRefVisitor {
+public:
+  virtual ~IdRefVisitor() {}
+
+  virtual void visit(const IdRef &ref) = 0;
+};
+
+template <typename T> class IdRefAction : public IdRefVisitor {
+public:
+  IdRefAction(T &action) : mAction(action) {}
+
+  void visit(const IdRef &ref) override { mAction(ref); }
+
+private:
+  T &mAction;
+};
 
 class Instruction : public Entity {
 public:
@@ -50,21 +76,52 @@ public:
       : mCodeAndCount(opCode), mFixedWordCount(fixedWordCount) {}
   virtual ~Instruction() {}
 
+  // Instructions are allocated from the arena of the current module
+  static void *operator new(size_t size) { return Arena::Allocate(size); }
+  static void operator delete(void *ptr) { Arena::Free(ptr); }
+
   void accept(IVisitor *v) override;
 
+  // The word count is computed once, and cached until an operand of variable
+  // size changes. Code changing such an operand directly, instead of through
+  // the setters of the instruction class, needs to call invalidateWordCount().
   void setWordCount() const {
     if (mCodeAndCount.mWordCount == 0) {
-      mCodeAndCount.mWordCount = getWordCount();
+      mCodeAndCount.mWordCount = computeWordCount();
     }
   }
-  virtual uint16_t getWordCount() const = 0;
+  uint16_t getWordCount() const {
+    setWordCount();
+    return mCodeAndCount.mWordCount;
+  }
+  void invalidateWordCount() { mCodeAndCount.mWordCount = 0; }
+  virtual uint16_t computeWordCount() const = 0;
   virtual bool hasResult() const = 0;
   virtual IdResult getId() const = 0;
   virtual void setId(IdResult) = 0;
-  virtual std::vector<const IdRef *> getAllIdRefs() const = 0;
+  virtual void visitIdRefs(IdRefVisitor *v) const = 0;
+
+  // Whether the instruction may refer to ids, without a virtual call
+  bool hasIdRefs() const { return HasIdRefs(getOpCode()); }
+
+  // Calls action(const IdRef &) for each id the instruction refers to,
+  // without allocating
+  template <typename T> void forEachIdRef(T action) const {
+    if (hasIdRefs()) {
+      IdRefAction<T> v(action);
+      visitIdRefs(&v);
+    }
+  }
+
+  std::vector<const IdRef *> getAllIdRefs() const {
+    std::vector<const IdRef *> ret;
+    forEachIdRef([&ret](const IdRef &ref) { ret.push_back(&ref); });
+    return ret;
+  }
 
   Instruction *addExtraOperand(uint32_t word) {
     mExtraOperands.push_back(word);
+    invalidateWordCount();
     return this;
   }
 
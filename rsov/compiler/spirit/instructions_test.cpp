@@ -51,5 +51,70 @@ TEST(InstructionTest, testOpExtInstImport) {
   EXPECT_STREQ("GLSL.std.450", i->mOperand1.c_str());
 }
 
+TEST(InstructionTest, testForEachIdRef) {
+  // OpEntryPoint GLCompute %2 "a" %3 %4
+  std::vector<uint32_t> words = {0x0006000f, 0x00000005, 0x00000002,
+                                 0x00000061, 0x00000003, 0x00000004};
+  std::unique_ptr<EntryPointInst> i(Deserialize<EntryPointInst>(words));
+  ASSERT_NE(nullptr, i);
+  EXPECT_TRUE(i->hasIdRefs());
+
+  std::vector<uint32_t> ids;
+  i->forEachIdRef([&ids](const IdRef &ref) { ids.push_back(ref.mId); });
+  EXPECT_EQ(std::vector<uint32_t>({2, 3, 4}), ids);
+  EXPECT_EQ(3U, i->getAllIdRefs().size());
+
+  EXPECT_FALSE(HasIdRefs(OpCapability));
+  EXPECT_FALSE(HasIdRefs(0xFFFF));
+}
+
+TEST(InstructionTest, testForEachIdRefInPairs) {
+  // %1 = OpPhi %2 %3 %4 %5 %6
+  std::vector<uint32_t> phiWords = {0x000700f5, 0x00000002, 0x00000001,
+                                    0x00000003, 0x00000004, 0x00000005,
+                                    0x00000006};
+  std::unique_ptr<PhiInst> phi(Deserialize<PhiInst>(phiWords));
+  ASSERT_NE(nullptr, phi);
+  EXPECT_TRUE(HasIdRefs(OpPhi));
+
+  std::vector<uint32_t> ids;
+  phi->forEachIdRef([&ids](const IdRef &ref) { ids.push_back(ref.mId); });
+  EXPECT_EQ(std::vector<uint32_t>({2, 3, 4, 5, 6}), ids);
+
+  // OpSwitch %1 %2 5 %3
+  std::vector<uint32_t> switchWords = {0x000500fb, 0x00000001, 0x00000002,
+                                       0x00000005, 0x00000003};
+  std::unique_ptr<SwitchInst> sw(Deserialize<SwitchInst>(switchWords));
+  ASSERT_NE(nullptr, sw);
+
+  ids.clear();
+  sw->forEachIdRef([&ids](const IdRef &ref) { ids.push_back(ref.mId); });
+  EXPECT_EQ(std::vector<uint32_t>({1, 2, 3}), ids);
+}
+
+TEST(InstructionTest, testWordCountInvalidation) {
+  // OpEntryPoint GLCompute %2 "a" %3
+  std::vector<uint32_t> words = {0x0005000f, 0x00000005, 0x00000002,
+                                 0x00000061, 0x00000003};
+  std::unique_ptr<EntryPointInst> i(Deserialize<EntryPointInst>(words));
+  ASSERT_NE(nullptr, i);
+  EXPECT_EQ(5, i->getWordCount());
+
+  IdRef ref;
+  ref.mId = 4;
+  i->addOperand4(ref);
+  EXPECT_EQ(6, i->getWordCount());
+
+  i->setOperand3("main");
+  EXPECT_EQ(7, i->getWordCount());
+
+  i->addExtraOperand(0);
+  EXPECT_EQ(8, i->getWordCount());
+
+  std::unique_ptr<OutputWordStream> OS(OutputWordStream::Create());
+  i->Serialize(*OS);
+  EXPECT_EQ(8U, OS->getWords().size());
+}
+
 } // namespace spirit
 } // namespace android
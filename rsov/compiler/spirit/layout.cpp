@@ -0,0 +1,86 @@
+/*
+ * Copyright 2017, The Android Open Source Project
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "layout.h"
+
+#include "opcodes_generated.h"
+#include "operand_layouts_generated.h"
+
+namespace android {
+namespace spirit {
+
+const InstructionLayout *GetInstructionLayout(uint32_t opcode) {
+  return LookupInstructionLayout(opcode);
+}
+
+const OperandKindInfo &GetOperandKindInfo(OperandKind kind) {
+  return kOperandKindInfos[static_cast<uint8_t>(kind)];
+}
+
+size_t GetLayoutTablesSize() {
+  return sizeof(kOperandKindInfos) + sizeof(kInstructionLayouts) +
+         kNumOperandLayouts * sizeof(OperandLayout);
+}
+
+bool EncodeInstruction(uint32_t opcode, const uint32_t *operands,
+                       size_t count, std::vector<uint32_t> *words) {
+  if (count + 1 > 0xFFFF) {
+    return false;
+  }
+  const size_t start = words->size();
+  words->push_back(((count + 1) << 16) | (opcode & 0xFFFF));
+  words->insert(words->end(), operands, operands + count);
+  if (!ForEachOperand(words->data() + start, GetInstructionLayout(opcode),
+                      [](const OperandSpan &) {})) {
+    words->resize(start);
+    return false;
+  }
+  return true;
+}
+
+bool ReencodeModule(const uint32_t *module, size_t count,
+                    std::vector<uint32_t> *words) {
+  words->clear();
+  words->reserve(count);
+  if (count < kModuleHeaderWordCount) {
+    return false;
+  }
+  words->insert(words->end(), module, module + kModuleHeaderWordCount);
+
+  std::vector<uint32_t> operands;
+  bool valid = true;
+  const bool complete = ForEachInstruction(
+      module, count, [&](const uint32_t *inst,
+                         const InstructionLayout *layout) {
+        if (!valid) {
+          return;
+        }
+        operands.clear();
+        valid = ForEachOperand(inst, layout,
+                               [&operands, inst](const OperandSpan &operand) {
+                                 operands.insert(
+                                     operands.end(), inst + operand.mOffset,
+                                     inst + operand.mOffset +
+                                         operand.mWordCount);
+                               }) &&
+                EncodeInstruction(inst[0] & 0xFFFF, operands.data(),
+                                  operands.size(), words);
+      });
+  return complete && valid;
+}
+
+} // namespace spirit
+} // namespace android
@@ -0,0 +1,189 @@
+/*
+ * Copyright 2017, The Android Open Source Project
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef LAYOUT_H
+#define LAYOUT_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+#include <vector>
+
+#include "operand_kinds_generated.h"
+
+namespace android {
+namespace spirit {
+
+// Table-driven encoding and decoding of SPIR-V instructions.
+//
+// The layout of the operands of each opcode is generated from the grammar
+// into constant tables. The generic loops below split the words of an
+// instruction into its operands from those tables, without creating an
+// Instruction object, which is what tools that only look at or rewrite words
+// need.
+
+enum class Quantifier : uint8_t {
+  One,
+  Optional,
+  ZeroOrMore,
+};
+
+// Word offset of an operand that follows a variable number of words
+constexpr uint16_t kVariableOffset = 0xFFFF;
+
+// Number of words of the header of a module
+constexpr size_t kModuleHeaderWordCount = 5;
+
+struct OperandKindInfo {
+  uint8_t mWordCount; // 0 for a literal string
+  uint8_t mIdRefMask; // bit i set if word i of the operand refers to an id
+  bool mIsResult;
+};
+
+struct OperandLayout {
+  OperandKind mKind;
+  Quantifier mQuantifier;
+  uint16_t mOffset; // from the first word of the instruction
+};
+
+struct InstructionLayout {
+  uint16_t mOpCode;
+  uint16_t mMinWordCount;
+  uint16_t mNumOperands;
+  const OperandLayout *mOperands;
+};
+
+// An operand of an encoded instruction
+struct OperandSpan {
+  OperandKind mKind;
+  uint16_t mOffset; // from the first word of the instruction
+  uint16_t mWordCount;
+};
+
+// Returns the layout of an opcode, or nullptr for an opcode not in the grammar
+const InstructionLayout *GetInstructionLayout(uint32_t opcode);
+
+const OperandKindInfo &GetOperandKindInfo(OperandKind kind);
+
+// Returns the size in bytes of the layout tables
+size_t GetLayoutTablesSize();
+
+// Returns the number of words of the literal string at words, or 0 if it is
+// not terminated within count words
+inline uint16_t StringWordCount(const uint32_t *words, size_t count) {
+  for (size_t i = 0; i < count; i++) {
+    if ((words[i] & 0xFF000000) == 0) {
+      return i + 1;
+    }
+  }
+  return 0;
+}
+
+// Calls f(const OperandSpan &) for each operand of the instruction at inst,
+// in order. The words past the operands of the layout are reported one by one
+// as ExtraOperand, and so are all the operands of an opcode with no layout.
+// Returns false if the operands do not fit in the word count of the
+// instruction.
+template <typename F>
+bool ForEachOperand(const uint32_t *inst, const InstructionLayout *layout,
+                    F &&f) {
+  const uint16_t wordCount = inst[0] >> 16;
+  if (wordCount == 0) {
+    return false;
+  }
+  uint16_t offset = 1;
+  const uint16_t numOperands = layout ? layout->mNumOperands : 0;
+  for (uint16_t i = 0; i < numOperands; i++) {
+    const OperandLayout &operand = layout->mOperands[i];
+    const uint16_t size = GetOperandKindInfo(operand.mKind).mWordCount;
+    do {
+      if (offset >= wordCount) {
+        if (operand.mQuantifier == Quantifier::One) {
+          return false;
+        }
+        break;
+      }
+      uint16_t n = size;
+      if (n == 0) {
+        n = StringWordCount(inst + offset, wordCount - offset);
+        if (n == 0) {
+          return false;
+        }
+      }
+      if (offset + n > wordCount) {
+        return false;
+      }
+      f(OperandSpan{operand.mKind, offset, n});
+      offset += n;
+    } while (operand.mQuantifier == Quantifier::ZeroOrMore);
+  }
+  for (; offset < wordCount; offset++) {
+    f(OperandSpan{OperandKind::ExtraOperand, offset, 1});
+  }
+  return true;
+}
+
+// Calls f(const uint32_t *inst, const InstructionLayout *layout) for each
+// instruction of a module, the layout being nullptr for an opcode not in the
+// grammar. Returns false if the module is truncated.
+template <typename F>
+bool ForEachInstruction(const uint32_t *words, size_t count, F &&f) {
+  if (count < kModuleHeaderWordCount) {
+    return false;
+  }
+  size_t i = kModuleHeaderWordCount;
+  while (i < count) {
+    const uint16_t wordCount = words[i] >> 16;
+    if (wordCount == 0 || i + wordCount > count) {
+      return false;
+    }
+    f(words + i, GetInstructionLayout(words[i] & 0xFFFF));
+    i += wordCount;
+  }
+  return true;
+}
+
+// Calls f(uint32_t id) for each id referred to by the instruction at inst,
+// including the ids in composite operands, but not its result id.
+// Returns false if the instruction is malformed.
+template <typename F>
+bool ForEachIdRefWord(const uint32_t *inst, const InstructionLayout *layout,
+                      F &&f) {
+  return ForEachOperand(inst, layout, [inst, &f](const OperandSpan &operand) {
+    const uint8_t mask = GetOperandKindInfo(operand.mKind).mIdRefMask;
+    for (uint16_t i = 0; i < operand.mWordCount; i++) {
+      if (mask & (1 << i)) {
+        f(inst[operand.mOffset + i]);
+      }
+    }
+  });
+}
+
+// Appends an instruction to words, from its opcode and the words of its
+// operands, which are checked against the layout of the opcode.
+// Returns false, leaving words unchanged, if they do not match the layout.
+bool EncodeInstruction(uint32_t opcode, const uint32_t *operands,
+                       size_t count, std::vector<uint32_t> *words);
+
+// Decodes each instruction of a module and encodes it again into words,
+// through the layout tables. Returns false if the module is malformed.
+bool ReencodeModule(const uint32_t *module, size_t count,
+                    std::vector<uint32_t> *words);
+
+} // namespace spirit
+} // namespace android
+
+#endif // LAYOUT_H
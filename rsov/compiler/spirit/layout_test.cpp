@@ -0,0 +1,171 @@
+/*
+ * Copyright 2017, The Android Open Source Project
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "layout.h"
+
+#include "file_utils.h"
+#include "instructions.h"
+#include "module.h"
+#include "test_utils.h"
+#include "gtest/gtest.h"
+
+#include <algorithm>
+#include <chrono>
+#include <iostream>
+#include <memory>
+
+namespace android {
+namespace spirit {
+
+class LayoutTest : public ::testing::Test {
+protected:
+  virtual void SetUp() {
+    for (const char *testFile : {"greyscale.spv", "greyscale2.spv",
+                                 "greyscale3.spv", "invert.spv"}) {
+      mWords.push_back(readWords(testFile));
+    }
+  }
+
+  std::vector<std::vector<uint32_t>> mWords;
+
+private:
+  std::vector<uint32_t> readWords(const char *testFile) {
+    static const std::string testDataPath(
+        "frameworks/rs/rsov/compiler/spirit/test_data/");
+    const std::string &fullPath = getAbsolutePath(testDataPath + testFile);
+    return readFile<uint32_t>(fullPath);
+  }
+};
+
+TEST_F(LayoutTest, testLayout) {
+  const InstructionLayout *layout = GetInstructionLayout(OpEntryPoint);
+  ASSERT_NE(nullptr, layout);
+  EXPECT_EQ(OpEntryPoint, layout->mOpCode);
+  EXPECT_EQ(4, layout->mMinWordCount);
+  ASSERT_EQ(4, layout->mNumOperands);
+  EXPECT_EQ(OperandKind::ExecutionModel, layout->mOperands[0].mKind);
+  EXPECT_EQ(1, layout->mOperands[0].mOffset);
+  EXPECT_EQ(OperandKind::LiteralString, layout->mOperands[2].mKind);
+  EXPECT_EQ(3, layout->mOperands[2].mOffset);
+  EXPECT_EQ(Quantifier::ZeroOrMore, layout->mOperands[3].mQuantifier);
+  EXPECT_EQ(kVariableOffset, layout->mOperands[3].mOffset);
+
+  EXPECT_EQ(nullptr, GetInstructionLayout(0xFFFF));
+}
+
+TEST_F(LayoutTest, testEncodeInstruction) {
+  std::vector<uint32_t> words;
+  // OpName %1 "ab"
+  const uint32_t operands[] = {1, 0x00006261};
+  EXPECT_TRUE(EncodeInstruction(OpName, operands, 2, &words));
+  ASSERT_EQ(3U, words.size());
+  EXPECT_EQ((3U << 16) | OpName, words[0]);
+
+  // The string is missing
+  EXPECT_FALSE(EncodeInstruction(OpName, operands, 1, &words));
+  // The string is not terminated
+  const uint32_t unterminated[] = {1, 0x64636261};
+  EXPECT_FALSE(EncodeInstruction(OpName, unterminated, 2, &words));
+  EXPECT_EQ(3U, words.size());
+}
+
+TEST_F(LayoutTest, testReencode) {
+  for (const auto &words : mWords) {
+    std::vector<uint32_t> outwords;
+    EXPECT_TRUE(ReencodeModule(words.data(), words.size(), &outwords));
+    EXPECT_TRUE(words == outwords);
+  }
+}
+
+TEST_F(LayoutTest, testIdRefsMatchInstructions) {
+  for (const auto &words : mWords) {
+    std::vector<std::vector<uint32_t>> tableIds;
+    ASSERT_TRUE(ForEachInstruction(
+        words.data(), words.size(),
+        [&tableIds](const uint32_t *inst, const InstructionLayout *layout) {
+          tableIds.emplace_back();
+          EXPECT_TRUE(ForEachIdRefWord(
+              inst, layout,
+              [&tableIds](uint32_t id) { tableIds.back().push_back(id); }));
+        }));
+
+    std::unique_ptr<Module> m(Deserialize<Module>(words));
+    ASSERT_NE(nullptr, m);
+
+    std::vector<std::vector<uint32_t>> classIds;
+    std::unique_ptr<IVisitor> v(
+        CreateInstructionVisitor([&classIds](Instruction *inst) -> void {
+          classIds.emplace_back();
+          for (const IdRef *ref : inst->getAllIdRefs()) {
+            classIds.back().push_back(ref->mId);
+          }
+        }));
+    v->visit(m.get());
+
+    // The instructions are visited in the order of the module, except for the
+    // OpEntryPoint and OpExecutionMode instructions, so compare the sorted
+    // lists of ids
+    std::sort(tableIds.begin(), tableIds.end());
+    std::sort(classIds.begin(), classIds.end());
+    EXPECT_TRUE(tableIds == classIds);
+  }
+}
+
+// Compares the throughput of a round trip through the Instruction classes to
+// that of a round trip through the layout tables. Only the size of the tables
+// is reported: that of the code of either path depends on the inlining of the
+// build, and is compared on the linked library, e.g. by summing the sizes nm
+// reports for the Serialize, DeserializeInternal, getWordCount and
+// getAllIdRefs methods of the Inst classes and for the functions of layout.o.
+TEST_F(LayoutTest, benchmarkRoundTrip) {
+  constexpr int kIterations = 200;
+  using Clock = std::chrono::steady_clock;
+
+  size_t totalWords = 0;
+  for (const auto &words : mWords) {
+    totalWords += words.size();
+  }
+
+  auto start = Clock::now();
+  for (int i = 0; i < kIterations; i++) {
+    for (const auto &words : mWords) {
+      std::unique_ptr<Module> m(Deserialize<Module>(words));
+      ASSERT_NE(nullptr, m);
+      EXPECT_EQ(words.size(), Serialize<Module>(m.get()).size());
+    }
+  }
+  const std::chrono::duration<double> classTime = Clock::now() - start;
+
+  start = Clock::now();
+  std::vector<uint32_t> outwords;
+  for (int i = 0; i < kIterations; i++) {
+    for (const auto &words : mWords) {
+      ASSERT_TRUE(ReencodeModule(words.data(), words.size(), &outwords));
+      EXPECT_EQ(words.size(), outwords.size());
+    }
+  }
+  const std::chrono::duration<double> tableTime = Clock::now() - start;
+
+  const double megaWords = totalWords * kIterations / 1e6;
+  std::cout << "Instruction classes: " << megaWords / classTime.count()
+            << " Mwords/s" << std::endl;
+  std::cout << "Layout tables:       " << megaWords / tableTime.count()
+            << " Mwords/s, " << GetLayoutTablesSize() << " bytes of tables"
+            << std::endl;
+}
+
+} // namespace spirit
+} // namespace android
@@ -37,23 +37,35 @@ Module *Module::getCurrentModule() {
 }
 
 Module::Module()
-    : mNextId(1), mCapabilitiesDeleter(mCapabilities),
+    : mArena(new Arena()), mNextId(1), mCapabilitiesDeleter(mCapabilities),
       mExtensionsDeleter(mExtensions), mExtInstImportsDeleter(mExtInstImports),
       mEntryPointInstsDeleter(mEntryPointInsts),
       mExecutionModesDeleter(mExecutionModes),
       mEntryPointsDeleter(mEntryPoints),
       mFunctionDefinitionsDeleter(mFunctionDefinitions) {
   mInstance = this;
+  Arena::setCurrent(mArena);
 }
 
 Module::Module(Builder *b)
-    : Entity(b), mNextId(1), mCapabilitiesDeleter(mCapabilities),
+    : Entity(b), mArena(new Arena()), mNextId(1),
+      mCapabilitiesDeleter(mCapabilities),
       mExtensionsDeleter(mExtensions), mExtInstImportsDeleter(mExtInstImports),
       mEntryPointInstsDeleter(mEntryPointInsts),
       mExecutionModesDeleter(mExecutionModes),
       mEntryPointsDeleter(mEntryPoints),
       mFunctionDefinitionsDeleter(mFunctionDefinitions) {
   mInstance = this;
+  Arena::setCurrent(mArena);
+}
+
+Module::~Module() {
+  if (mInstance == this) {
+    mInstance = nullptr;
+  }
+  // The instructions of the module are deleted after this, and the arena
+  // with the last of them
+  mArena->release();
 }
 
 bool Module::resolveIds() {
@@ -72,18 +84,16 @@ bool Module::resolveIds() {
   int err = 0;
   std::unique_ptr<IVisitor> v(
       CreateInstructionVisitor([&table, &err](Instruction *inst) {
-        for (auto ref : inst->getAllIdRefs()) {
-          if (ref) {
-            auto it = table.find(ref->mId);
-            if (it != table.end()) {
-              ref->mInstruction = it->second;
-            } else {
-              std::cout << "Found no instruction for id " << ref->mId
-                        << std::endl;
-              err++;
-            }
+        inst->forEachIdRef([&table, &err](const IdRef &ref) {
+          auto it = table.find(ref.mId);
+          if (it != table.end()) {
+            ref.mInstruction = it->second;
+          } else {
+            std::cout << "Found no instruction for id " << ref.mId
+                      << std::endl;
+            err++;
           }
-        }
+        });
       }));
   v->visit(this);
   return err == 0;
@@ -175,6 +185,14 @@ void Module::SerializeHeader(OutputWordStream &OS) const {
 }
 
 void Module::Serialize(OutputWordStream &OS) const {
+  // Compute, and cache, the word count of every instruction first, so that
+  // the output is allocated once
+  size_t count = kHeaderWordCount;
+  std::unique_ptr<IVisitor> v(CreateInstructionVisitor(
+      [&count](Instruction *inst) { count += inst->getWordCount(); }));
+  v->visit(const_cast<Module *>(this));
+  OS.reserve(count);
+
   SerializeHeader(OS);
   Entity::Serialize(OS);
 }
@@ -471,7 +489,7 @@ EntryPointDefinition::applyExecutionMode(ExecutionModeInst *mode) {
 
 EntryPointDefinition *EntryPointDefinition::addToInterface(VariableInst *var) {
   mInterface.push_back(var);
-  mEntryPointInst->mOperand4.push_back(var);
+  mEntryPointInst->addOperand4(var);
   return this;
 }
 
@@ -714,7 +732,7 @@ GlobalSection::getConstantComposite(TypeVectorInst *type,
       [=]() -> ConstantCompositeInst * {
         ConstantCompositeInst *c = mBuilder->MakeConstantComposite(type);
         for (size_t i = 0; i < width; i++) {
-          c->mOperand1.push_back(components[i]);
+          c->addOperand1(components[i]);
         }
         return c;
       },
@@ -829,7 +847,7 @@ TypeStructInst *GlobalSection::getStructType(Instruction *fieldType[],
                                              int numField) {
   TypeStructInst *structTy = mBuilder->MakeTypeStruct();
   for (int i = 0; i < numField; i++) {
-    structTy->mOperand1.push_back(fieldType[i]);
+    structTy->addOperand1(fieldType[i]);
   }
   mGlobalDefs.push_back(structTy);
   return structTy;
@@ -854,7 +872,7 @@ TypeFunctionInst *GlobalSection::getFunctionType(Instruction *retType,
       [=]() -> TypeFunctionInst * {
         TypeFunctionInst *funcTy = mBuilder->MakeTypeFunction(retType);
         for (size_t i = 0; i < numArg; i++) {
-          funcTy->mOperand2.push_back(argType[i]);
+          funcTy->addOperand2(argType[i]);
         }
         return funcTy;
       },
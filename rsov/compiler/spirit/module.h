@@ -67,7 +67,10 @@ public:
 
   Module(Builder *b);
 
-  virtual ~Module() {}
+  virtual ~Module();
+
+  // The arena the instructions of the module are allocated from
+  Arena *getArena() const { return mArena; }
 
   bool DeserializeInternal(InputWordStream &IS) override;
 
@@ -216,7 +219,10 @@ public:
   void consolidateAnnotations();
 
 private:
+  static constexpr size_t kHeaderWordCount = 5;
+
   static Module *mInstance;
+  Arena *mArena;
   uint32_t mNextId;
   std::map<uint32_t, Instruction *> mIdTable;
 
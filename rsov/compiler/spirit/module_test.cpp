@@ -41,12 +41,15 @@ protected:
   std::vector<uint32_t> mWordsGreyscale2;
   std::vector<uint32_t> mWordsInvert;
 
-private:
-  std::vector<uint32_t> readWords(const char *testFile) {
+  std::string getTestDataPath(const char *testFile) {
     static const std::string testDataPath(
         "frameworks/rs/rsov/compiler/spirit/test_data/");
-    const std::string &fullPath = getAbsolutePath(testDataPath + testFile);
-    return readFile<uint32_t>(fullPath);
+    return getAbsolutePath(testDataPath + testFile);
+  }
+
+private:
+  std::vector<uint32_t> readWords(const char *testFile) {
+    return readFile<uint32_t>(getTestDataPath(testFile));
   }
 };
 
@@ -125,6 +128,28 @@ TEST_F(ModuleTest, testDeserialization2) {
   EXPECT_TRUE(mWordsInvert == outwords);
 }
 
+TEST_F(ModuleTest, testDeserializationFromFile) {
+  // The file is mapped and read in place
+  std::unique_ptr<Module> m(
+      Deserialize<Module>(getTestDataPath("greyscale.spv").c_str()));
+  ASSERT_NE(nullptr, m);
+
+  EXPECT_TRUE(mWordsGreyscale == Serialize<Module>(m.get()));
+}
+
+TEST_F(ModuleTest, testDeserializationByteSwapped) {
+  std::vector<uint32_t> words(mWordsGreyscale);
+  for (auto &word : words) {
+    word = __builtin_bswap32(word);
+  }
+
+  std::unique_ptr<Module> m(Deserialize<Module>(words));
+  ASSERT_NE(nullptr, m);
+
+  EXPECT_EQ(2, countEntity<FunctionDefinition>(m.get()));
+  EXPECT_TRUE(mWordsGreyscale == Serialize<Module>(m.get()));
+}
+
 TEST_F(ModuleTest, testSerialization1) {
   Module *m = Deserialize<Module>(mWordsGreyscale);
   ASSERT_NE(nullptr, m);
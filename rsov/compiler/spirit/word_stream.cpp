@@ -38,7 +38,15 @@ InputWordStream *InputWordStream::Create(const std::vector<uint8_t> &bytes) {
   return InputWordStream::Create(words);
 }
 
+InputWordStream *InputWordStream::Create(const uint32_t *words, size_t count) {
+  return new WordViewStream(words, count);
+}
+
 InputWordStream *InputWordStream::Create(const char *filePath) {
+  if (InputWordStream *IS = WordViewStream::Map(filePath)) {
+    return IS;
+  }
+  // Not a regular file that can be mapped, e.g. a pipe
   return InputWordStream::Create(readFile<uint32_t>(filePath));
 }
 
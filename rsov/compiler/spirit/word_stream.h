@@ -37,6 +37,9 @@ public:
   static InputWordStream *Create(std::vector<uint32_t> &&words);
   static InputWordStream *Create(const std::vector<uint32_t> &words);
   static InputWordStream *Create(const std::vector<uint8_t> &bytes);
+  // Reads the words in place. They must outlive the stream.
+  static InputWordStream *Create(const uint32_t *words, size_t count);
+  // Maps the file into memory and reads it in place
   static InputWordStream *Create(const char *fileName);
 
   virtual ~InputWordStream() {}
@@ -45,7 +48,10 @@ public:
   virtual uint32_t operator*() = 0;
 
   virtual InputWordStream &operator>>(uint32_t *RHS) = 0;
-  virtual InputWordStream &operator>>(LiteralContextDependentNumber *num) = 0;
+  virtual InputWordStream &operator>>(LiteralContextDependentNumber *num) {
+    // TODO: check context in the instruction class to decide the actual size.
+    return *this >> (uint32_t *)(&num->intValue);
+  }
   virtual InputWordStream &operator>>(std::string *str) = 0;
 
   InputWordStream &operator>>(int32_t *RHS) { return *this >> (uint32_t *)RHS; }
@@ -93,6 +99,9 @@ public:
 
   virtual std::vector<uint32_t> getWords() = 0;
 
+  // Makes room for numWords words in total, e.g. for a whole module
+  virtual void reserve(size_t numWords) = 0;
+
   virtual OutputWordStream &operator<<(const uint32_t RHS) = 0;
   virtual OutputWordStream &
   operator<<(const LiteralContextDependentNumber &RHS) = 0;
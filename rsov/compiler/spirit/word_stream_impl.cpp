@@ -16,6 +16,12 @@
 
 #include "word_stream_impl.h"
 
+#include <fcntl.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
 namespace android {
 namespace spirit {
 
@@ -28,22 +34,10 @@ WordStreamImpl::WordStreamImpl(std::vector<uint32_t> &&words)
     : mWords(words), mIter(mWords.begin()) {}
 
 WordStreamImpl &WordStreamImpl::operator<<(const std::string &str) {
-  const size_t len = str.length();
-  const uint32_t *begin = (uint32_t *)str.c_str();
-  const uint32_t *end = begin + (len / 4);
-  mWords.insert(mWords.end(), begin, end);
-
-  uint32_t lastWord = *end;
-  uint32_t mask = 0xFF;
-  bool clear = false;
-  for (int i = 0; i < 4; i++, mask <<= 8) {
-    if (clear) {
-      lastWord &= ~mask;
-    } else {
-      clear = ((lastWord & mask) == 0);
-    }
-  }
-  mWords.push_back(lastWord);
+  // The string is padded with zeros, the first of which terminates it
+  const size_t start = mWords.size();
+  mWords.resize(start + str.length() / 4 + 1, 0);
+  memcpy(&mWords[start], str.data(), str.length());
   return *this;
 }
 
@@ -55,5 +49,70 @@ WordStreamImpl &WordStreamImpl::operator>>(std::string *str) {
   return *this;
 }
 
+namespace {
+
+constexpr uint32_t kMagicNumber = 0x07230203;
+
+} // anonymous namespace
+
+WordViewStream::WordViewStream(const uint32_t *words, size_t count)
+    : mMapping(nullptr), mMappingSize(0), mIter(words), mEnd(words + count),
+      mByteSwapped(count > 0 && words[0] == __builtin_bswap32(kMagicNumber)) {
+}
+
+WordViewStream *WordViewStream::Map(const char *filePath) {
+  int fd = open(filePath, O_RDONLY);
+  if (fd < 0) {
+    return nullptr;
+  }
+  struct stat st;
+  if (fstat(fd, &st) != 0 || !S_ISREG(st.st_mode) || st.st_size == 0) {
+    close(fd);
+    return nullptr;
+  }
+  const size_t size = st.st_size;
+  void *mapping = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+  close(fd);
+  if (mapping == MAP_FAILED) {
+    return nullptr;
+  }
+  WordViewStream *ret = new WordViewStream((const uint32_t *)mapping,
+                                           size / sizeof(uint32_t));
+  ret->mMapping = mapping;
+  ret->mMappingSize = size;
+  return ret;
+}
+
+WordViewStream::~WordViewStream() {
+  if (mMapping) {
+    munmap(mMapping, mMappingSize);
+  }
+}
+
+WordViewStream &WordViewStream::operator>>(std::string *str) {
+  const uint32_t *begin = mIter;
+  while (mIter != mEnd && (read(*mIter++) & 0xFF000000)) {
+  }
+  if (!mByteSwapped) {
+    // The string is made straight from the words, up to its terminating zero
+    const char *s = (const char *)begin;
+    str->assign(s, strnlen(s, (mIter - begin) * sizeof(uint32_t)));
+    return *this;
+  }
+  // The bytes of a string are in the order of a little endian word
+  str->clear();
+  for (const uint32_t *w = begin; w != mIter; w++) {
+    const uint32_t word = read(*w);
+    for (int i = 0; i < 4; i++) {
+      const char c = (word >> (8 * i)) & 0xFF;
+      if (c == 0) {
+        return *this;
+      }
+      str->push_back(c);
+    }
+  }
+  return *this;
+}
+
 } // namespace spirit
 } // namespace android
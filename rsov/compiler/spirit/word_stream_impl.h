@@ -41,15 +41,12 @@ public:
     return *this;
   }
 
-  WordStreamImpl &operator>>(LiteralContextDependentNumber *RHS) override {
-    // TODO: check context in the instruction class to decide the actual size.
-    return *this >> (uint32_t *)(&RHS->intValue);
-  }
-
   WordStreamImpl &operator>>(std::string *str) override;
 
   std::vector<uint32_t> getWords() override { return mWords; }
 
+  void reserve(size_t numWords) override { mWords.reserve(numWords); }
+
   WordStreamImpl &operator<<(const uint32_t RHS) override {
     mWords.push_back(RHS);
     return *this;
@@ -70,6 +67,46 @@ private:
   std::vector<uint32_t>::const_iterator mIter;
 };
 
+// Input stream reading words in place, either from memory owned by the caller
+// or from a file mapped into memory, without copying them.
+//
+// A module whose magic number is byte swapped is read with the bytes of each
+// word swapped back.
+class WordViewStream : public InputWordStream {
+public:
+  // The words must outlive the stream
+  WordViewStream(const uint32_t *words, size_t count);
+
+  // Returns nullptr if the file cannot be mapped
+  static WordViewStream *Map(const char *filePath);
+
+  ~WordViewStream() override;
+
+  bool empty() const override { return mIter == mEnd; }
+
+  uint32_t operator*() override { return read(*mIter); }
+
+  WordViewStream &operator>>(uint32_t *RHS) override {
+    *RHS = read(*mIter++);
+    return *this;
+  }
+
+  WordViewStream &operator>>(std::string *str) override;
+
+  bool isByteSwapped() const { return mByteSwapped; }
+
+private:
+  uint32_t read(uint32_t word) const {
+    return mByteSwapped ? __builtin_bswap32(word) : word;
+  }
+
+  void *mMapping;
+  size_t mMappingSize;
+  const uint32_t *mIter;
+  const uint32_t *mEnd;
+  bool mByteSwapped;
+};
+
 } // namespace spirit
 } // namespace android
 
@@ -16,6 +16,7 @@
 
 #include "word_stream.h"
 
+#include "word_stream_impl.h"
 #include "gtest/gtest.h"
 
 #include <vector>
@@ -67,5 +68,44 @@ TEST(WordStreamTest, testStringInput2) {
   EXPECT_STREQ("GLSL.std.450", s.c_str());
 }
 
+TEST(WordStreamTest, testStringInPlace) {
+  alignas(uint32_t) uint8_t bytes[] = {0x03, 0x02, 0x23, 0x07, 0x41, 0x42,
+                                       0x43, 0x44, 0x45, 0x46, 0x47, 0x00,
+                                       0x2a, 0x00, 0x00, 0x00};
+  std::unique_ptr<InputWordStream> IS(
+      InputWordStream::Create((const uint32_t *)bytes, sizeof(bytes) / 4));
+  uint32_t magic, word;
+  std::string s;
+  *IS >> &magic >> &s >> &word;
+  EXPECT_EQ(0x07230203U, magic);
+  EXPECT_STREQ("ABCDEFG", s.c_str());
+  EXPECT_EQ(42U, word);
+  EXPECT_TRUE(IS->empty());
+}
+
+TEST(WordStreamTest, testStringByteSwapped) {
+  // The same words as above, each with its bytes swapped
+  alignas(uint32_t) uint8_t bytes[] = {0x07, 0x23, 0x02, 0x03, 0x44, 0x43,
+                                       0x42, 0x41, 0x00, 0x47, 0x46, 0x45,
+                                       0x00, 0x00, 0x00, 0x2a};
+  WordViewStream IS((const uint32_t *)bytes, sizeof(bytes) / 4);
+  EXPECT_TRUE(IS.isByteSwapped());
+  uint32_t magic, word;
+  std::string s;
+  IS >> &magic >> &s >> &word;
+  EXPECT_EQ(0x07230203U, magic);
+  EXPECT_STREQ("ABCDEFG", s.c_str());
+  EXPECT_EQ(42U, word);
+}
+
+TEST(WordStreamTest, testStringUnterminated) {
+  alignas(uint32_t) uint8_t bytes[] = {0x41, 0x42, 0x43, 0x44};
+  WordViewStream IS((const uint32_t *)bytes, sizeof(bytes) / 4);
+  std::string s;
+  IS >> &s;
+  EXPECT_STREQ("ABCD", s.c_str());
+  EXPECT_TRUE(IS.empty());
+}
+
 } // namespace spirit
 } // namespace android
@@ -76,6 +76,11 @@ class Config(object):
         '''The path to the file where junit results.xml will be written.'''
         return os.path.join(os.getcwd(), 'results.xml')
 
+    @property
+    def bundle_index_path(self):
+        '''The path to the file where the index of the test apps is cached.'''
+        return os.path.join(os.getcwd(), 'LLDBTestsuiteIndex.json')
+
     @property
     def lldb_path(self):
         '''The path to lldb executable on the host.'''
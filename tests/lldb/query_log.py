@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Print the records of the test suite log for a test, method or phase.
+
+The records are read from the ranges listed by the index written next to the
+log, so that the log is not scanned. Archived logs of the previous runs,
+LLDBTestsuiteLog.<date>-<time>.txt.gz, can be queried the same way.
+'''
+import argparse
+import sys
+
+from config import Config
+from tests.harness.util_log_index import query, summarise
+
+
+def _parse_args():
+    '''Parse the command line arguments.
+
+    Returns:
+        A namespace object with the options given on the command line.
+    '''
+    parser = argparse.ArgumentParser(
+        description='Print the records of the test suite log for a test, '
+                    'method or phase.')
+    parser.add_argument('--log', '-l',
+                        help='The path to the log or to an archived log.',
+                        default=Config().log_file_path)
+    parser.add_argument('--test', '-t',
+                        help='The name of the test file, e.g. '
+                             'test_breakpoint_fileline.py.')
+    parser.add_argument('--bundle-type', '-b',
+                        help='The type of the target (java|jni|cpp).',
+                        choices=['java', 'jni', 'cpp'])
+    parser.add_argument('--method', '-m',
+                        help='The name of the test method.')
+    parser.add_argument('--phase', '-p',
+                        help='The phase of the test.',
+                        choices=['setup', 'pre_run', 'run', 'post_run',
+                                 'teardown'])
+    parser.add_argument('--list',
+                        help='List the tests, methods and phases of the log, '
+                             'with the size of their records.',
+                        action='store_true')
+    return parser.parse_args()
+
+
+def main():
+    '''Entry point of the log query script.'''
+    args = _parse_args()
+    if args.list:
+        for key, size in summarise(args.log):
+            print('{0:>10} {1}'.format(
+                size, ' '.join(str(value) for value in key
+                               if value is not None) or '-'))
+        return
+    for text in query(args.log, test=args.test, bundle_type=args.bundle_type,
+                      method=args.method, phase=args.phase):
+        sys.stdout.write(text)
+
+
+if __name__ == '__main__':
+    main()
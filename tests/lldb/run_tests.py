@@ -22,8 +22,11 @@ import os
 import signal
 import subprocess
 import sys
+import tempfile
 import time
 import collections
+import json
+import shutil
 import xml.etree.ElementTree as ET
 
 from config import Config
@@ -32,7 +35,10 @@ from tests.harness.exception import TestSuiteException, FailFastException
 from tests.harness import UtilAndroid
 from tests.harness import UtilBundle
 from tests.harness import util_log
+from tests.harness import util_trace
+from tests.harness.util_log_index import archive_log
 from tests.harness.util_functions import load_py_module
+from tests.harness.util_profile import SORT_KEYS, merge_profiles
 from tests.harness.decorators import deprecated
 
 # For some reason pylint is not able to understand the class returned by
@@ -101,6 +107,63 @@ def _parse_args():
                         action='store_true',
                         default=False,
                         help='Exit the test suite immediately on the first failure.')
+    parser.add_argument('--keep-ndk-cache',
+                        action='store_true',
+                        default=False,
+                        help='Keep the compiled NDK scripts cached on the '
+                             'device between tests, rather than deleting them '
+                             'before each test.',
+                        dest='keep_ndk_cache')
+    parser.add_argument('--benchmark-script-cache',
+                        action='store_true',
+                        default=False,
+                        help='Instead of running the tests, measure the time '
+                             'from launching each target to its first kernel '
+                             'breakpoint with a cold and a warm script cache.',
+                        dest='benchmark_script_cache')
+    parser.add_argument('--split-sessions',
+                        type=int,
+                        metavar='N',
+                        default=None,
+                        help='Split each test into at most N sessions, each '
+                             'running an independent group of its test '
+                             'methods after replaying only the setup they '
+                             'declare needing. The sessions run one after '
+                             'the other, so that a method which fails or '
+                             'hangs does not stop the other groups from '
+                             'running; this is slower than running each test '
+                             'at once, as every session launches the target '
+                             'again.',
+                        dest='split_sessions')
+    parser.add_argument('--phase-timeout',
+                        metavar='PHASE=SECONDS',
+                        action='append',
+                        default=[],
+                        help='Time the given phase of each test (setup, '
+                             'pre_run, run, post_run or teardown) must '
+                             'complete in, on top of the timeout of each '
+                             'command. May be repeated.',
+                        dest='phase_timeouts')
+    parser.add_argument('--profile',
+                        action='store_true',
+                        default=False,
+                        help='Profile each test with cProfile, time every lldb '
+                             'command and test method, and write a report '
+                             'merging them next to the results file.',
+                        dest='profile')
+    parser.add_argument('--profile-sort',
+                        choices=SORT_KEYS,
+                        default='total',
+                        help='How to sort the lldb commands in the profile '
+                             'report.',
+                        dest='profile_sort')
+    parser.add_argument('--trace',
+                        action='store_true',
+                        default=False,
+                        help='Record the timeline of the driver and of each '
+                             'test, and write it next to the results file '
+                             'in the Chrome trace event format.',
+                        dest='trace')
     parser.add_argument('--run-emu',
                         action='store_true',
                         default=None,
@@ -202,6 +265,9 @@ class State(object):
         self.results_file_path = _choice(args.results_file_path,
                                          config.results_file_path)
 
+        self.bundle_index_path = _choice(args.bundle_index_path,
+                                         config.bundle_index_path)
+
         self.lldb_path = _choice(args.lldb_path, config.lldb_path)
         self.print_to_stdout = args.print_to_stdout
         self.verbose = _choice(args.verbose, config.verbose)
@@ -211,6 +277,19 @@ class State(object):
         self.wimpy = args.wimpy
         self.bundle_types = args.bundle_types if not self.wimpy else ['java']
         self.fail_fast = args.fail_fast
+        self.keep_ndk_cache = args.keep_ndk_cache
+        self.benchmark_script_cache = args.benchmark_script_cache
+        self.split_sessions = args.split_sessions
+        self.phase_timeouts = args.phase_timeouts
+        self.profile_sort = args.profile_sort
+        self.profile_dir = None
+        if args.profile:
+            self.profile_dir = os.path.splitext(
+                os.path.abspath(self.results_file_path))[0] + '_profile'
+        self.trace_dir = None
+        if args.trace:
+            self.trace_dir = os.path.splitext(
+                os.path.abspath(self.results_file_path))[0] + '_trace'
 
         # validate the param "verbose"
         if not isinstance(self.verbose, bool):
@@ -221,16 +300,23 @@ class State(object):
         self.results = dict()
         self.single_test = args.test
 
+        # compress the log of the previous run, with its index
+        archive_log(self.log_file_path)
+
         # initialise the logging facility
         log_level = logging.INFO if not self.verbose else logging.DEBUG
         util_log.initialise("driver",
                             print_to_stdout=self.print_to_stdout,
                             level=log_level,
                             file_mode='w', # open for write
-                            file_path=self.log_file_path
+                            file_path=self.log_file_path,
+                            indexed=True
                             )
         log = util_log.get_logger()
 
+        # receive the records of the test runners, to write them from here
+        self.log_server = util_log.start_server()
+
         if self.run_emu and not self.emu_cmd:
             log.TestSuiteException('Need to specify --emu-cmd (or specify a'
                 ' value in the config file) if using --run-emu.')
@@ -238,6 +324,19 @@ class State(object):
         # create a results file
         self.results_file = open(self.results_file_path, 'w')
 
+        # start each profile from scratch
+        if self.profile_dir:
+            if os.path.isdir(self.profile_dir):
+                shutil.rmtree(self.profile_dir)
+            os.makedirs(self.profile_dir)
+
+        # record the timeline of the driver, the test runners adding theirs
+        if self.trace_dir:
+            if os.path.isdir(self.trace_dir):
+                shutil.rmtree(self.trace_dir)
+            os.makedirs(self.trace_dir)
+            util_trace.start(self.trace_dir, 'driver')
+
         # create an android helper object
         self.android = UtilAndroid(self.adb_path,
                                    self.lldb_server_path_device,
@@ -246,7 +345,8 @@ class State(object):
 
         # create a test bundle
         self.bundle = UtilBundle(self.android,
-                                 self.aosp_product_path)
+                                 self.aosp_product_path,
+                                 self.bundle_index_path)
         assert self.bundle
 
         # save the no pushing option
@@ -465,13 +565,53 @@ def _restart_emulator(state):
     _launch_emulator(state)
 
 
-def _run_test(state, name, bundle_type):
-    '''Execute a single test case.
+def _runner_params(state, name, bundle_type, device_port, log_file_path,
+                   print_to_stdout):
+    '''Build the command line of the test runner for a test case.
+
+    Args:
+        state: Test suite state collection, instance of State.
+        name: String file name of the test.
+        bundle_type: string for the installed app type (cpp|jni|java)
+        device_port: Integer, the port of lldb-server on the device.
+        log_file_path: String, the file the test runner logs to.
+        print_to_stdout: Boolean, whether the test runner logs to stdout.
+
+    Returns:
+        The list of the arguments of the command line.
+    '''
+    run_tests_dir = os.path.dirname(os.path.realpath(__file__))
+    run_test_path = os.path.join(run_tests_dir, 'tests', 'run_test.py')
+
+    return map(str, [
+        sys.executable,
+        run_test_path,
+        name,
+        log_file_path,
+        state.adb_path,
+        state.lldb_server_path_device,
+        state.aosp_product_path,
+        device_port,
+        state.android.get_device_id(),
+        print_to_stdout,
+        state.verbose,
+        state.wimpy,
+        state.timeout,
+        bundle_type
+    ])
+
+
+def _spawn_test(state, name, bundle_type, extra_args=()):
+    '''Execute a single test case in a child process.
 
     Args:
         state: Test suite state collection, instance of State.
         name: String file name of the test to execute.
         bundle_type: string for the installed app type (cpp|jni|java)
+        extra_args: List of optional arguments to give to the test runner.
+
+    Returns:
+        The return code of the test runner.
 
     Raises:
         AssertionError: When assertion fails.
@@ -490,10 +630,7 @@ def _run_test(state, name, bundle_type):
     log = util_log.get_logger()
     sys.stdout.write('Running {0}\r'.format(name))
     sys.stdout.flush()
-    log.info('Running {0}'.format(name))
-
-    run_tests_dir = os.path.dirname(os.path.realpath(__file__))
-    run_test_path = os.path.join(run_tests_dir, 'tests', 'run_test.py')
+    log.info('Running %s', name)
 
     # Forward port for lldb-server on the device to our host
     hport = int(state.host_port) + state.port_mod
@@ -501,29 +638,106 @@ def _run_test(state, name, bundle_type):
     state.android.forward_port(hport, dport)
     state.port_mod += 1
 
-    log.debug('Giving up control to {0}...'.format(name))
-
-    params = map(str, [
-        sys.executable,
-        run_test_path,
-        name,
-        state.log_file_path,
-        state.adb_path,
-        state.lldb_server_path_device,
-        state.aosp_product_path,
-        dport,
-        state.android.get_device_id(),
-        state.print_to_stdout,
-        state.verbose,
-        state.wimpy,
-        state.timeout,
-        bundle_type
-    ])
-
-    return_code = subprocess.call(params)
+    log.debug('Giving up control to %s...', name)
+
+    params = _runner_params(state, name, bundle_type, dport,
+                            state.log_file_path, state.print_to_stdout)
+    session = state.log_server.new_session()
+    params.extend(['--log-server', state.log_server.address,
+                   '--log-session', session])
+    params.extend(['--bundle-index', state.bundle_index_path])
+    if state.keep_ndk_cache:
+        params.append('--keep-ndk-cache')
+    for phase_timeout in state.phase_timeouts:
+        params.extend(['--phase-timeout', phase_timeout])
+    if state.profile_dir:
+        params.extend(['--profile', state.profile_dir])
+    if state.trace_dir:
+        params.extend(['--trace', state.trace_dir])
+    params.extend(extra_args)
+
+    with util_trace.span('spawn ' + name, 'driver', bundle_type=bundle_type):
+        return_code = subprocess.call(params)
     state.test_count += 1
     state.android.remove_port_forwarding()
-    log.seek_to_end()
+    # write the records of the test runner before those of the driver to come
+    state.log_server.wait_session(session)
+    return return_code
+
+
+def _plan_sessions(state, name, bundle_type):
+    '''Ask the test runner how the methods of a test split into sessions.
+
+    Args:
+        state: Test suite state collection, instance of State.
+        name: String file name of the test.
+        bundle_type: string for the installed app type (cpp|jni|java)
+
+    Returns:
+        A list of sessions, each being the list of the test methods to run. It
+        is empty if the test could not be planned.
+    '''
+    file_desc, plan_path = tempfile.mkstemp(suffix='.json')
+    os.close(file_desc)
+    # The runner only inspects the test methods: it neither connects to the
+    # device nor counts as a run of the test, and its log is not kept
+    params = _runner_params(state, name, bundle_type, state.device_port,
+                            os.devnull, False)
+    params.extend(['--plan-sessions', plan_path,
+                   '--max-sessions', str(state.split_sessions)])
+    try:
+        return_code = subprocess.call(params)
+        if return_code != util_constants.RC_TEST_OK:
+            return []
+        with open(plan_path) as plan_file:
+            return [[str(method) for method in session]
+                    for session in json.load(plan_file)]
+    finally:
+        os.remove(plan_path)
+
+
+def _run_sessions(state, name, bundle_type):
+    '''Execute a test case, split into sessions if requested.
+
+    Args:
+        state: Test suite state collection, instance of State.
+        name: String file name of the test to execute.
+        bundle_type: string for the installed app type (cpp|jni|java)
+
+    Returns:
+        The return code of the first session that did not pass, or that of
+        the last session.
+    '''
+    sessions = _plan_sessions(state, name, bundle_type) \
+        if state.split_sessions else []
+    if len(sessions) < 2:
+        return _spawn_test(state, name, bundle_type)
+
+    log = util_log.get_logger()
+    return_code = util_constants.RC_TEST_OK
+    for index, session in enumerate(sessions):
+        log.info('Running %s session %d of %d: %s', name, index + 1,
+                 len(sessions), ', '.join(session))
+        code = _spawn_test(state, name, bundle_type,
+                           ['--tests', ','.join(session)])
+        if return_code == util_constants.RC_TEST_OK:
+            return_code = code
+    return return_code
+
+
+def _run_test(state, name, bundle_type):
+    '''Execute a single test case and record its result.
+
+    Args:
+        state: Test suite state collection, instance of State.
+        name: String file name of the test to execute.
+        bundle_type: string for the installed app type (cpp|jni|java)
+
+    Raises:
+        AssertionError: When assertion fails.
+    '''
+    log = util_log.get_logger()
+    return_code = _run_sessions(state, name, bundle_type)
 
     # report in sys.stdout the result
     success = return_code == util_constants.RC_TEST_OK
@@ -552,6 +766,89 @@ def _run_test(state, name, bundle_type):
     log.info('Current pass rate: %s of %s executed.', passes, len(state.results))
 
 
+def _run_cache_benchmark(state):
+    '''Time the launch of the targets with a cold and a warm script cache.
+
+    The benchmark is run twice for each bundle type: first after deleting the
+    script cache of the target, so that its scripts are compiled from scratch,
+    then again keeping the cache populated by the first run.
+
+    Args:
+        state: Test suite state collection, instance of State.
+
+    Returns:
+        The number of benchmark runs that failed.
+    '''
+    log = util_log.get_logger()
+    name = 'bench_script_cache.py'
+    results_path = os.path.splitext(state.results_file_path)[0] + '_bench.json'
+    if os.path.exists(results_path):
+        os.remove(results_path)
+
+    failures = 0
+    for bundle_type in state.bundle_types:
+        for mode, args in (('cold', ['--cold-start']),
+                           ('warm', ['--keep-ndk-cache'])):
+            return_code = _spawn_test(state, name, bundle_type,
+                                      args + ['--benchmark-results',
+                                              results_path])
+            if return_code != util_constants.RC_TEST_OK:
+                log.log_and_print('{0} ({1}, {2} cache): failed'
+                                  .format(name, bundle_type, mode),
+                                  logging.ERROR)
+                failures += 1
+
+    timings = collections.defaultdict(dict)
+    if os.path.exists(results_path):
+        with open(results_path) as results_file:
+            for line in results_file:
+                record = json.loads(line)
+                mode = 'cold' if record['cold_start'] else 'warm'
+                timings[record['bundle_type']][mode] = record['seconds']
+
+    log.log_and_print('Launch to first kernel breakpoint (seconds):')
+    log.log_and_print('{0:>8} {1:>8} {2:>8} {3:>8}'
+                      .format('bundle', 'cold', 'warm', 'saved'))
+    for bundle_type in state.bundle_types:
+        cold = timings[bundle_type].get('cold')
+        warm = timings[bundle_type].get('warm')
+        saved = cold - warm if cold is not None and warm is not None else None
+        log.log_and_print('{0:>8} {1:>8} {2:>8} {3:>8}'.format(
+            bundle_type,
+            *['-' if value is None else '%.3f' % value
+              for value in (cold, warm, saved)]))
+
+    return failures
+
+
+def _write_profile_report(state):
+    '''Merge the profiles of the tests and write the report.
+
+    Args:
+        state: Test suite state collection, instance of State.
+    '''
+    report = merge_profiles(state.profile_dir, state.profile_sort)
+    report_path = os.path.join(state.profile_dir, 'report.txt')
+    with open(report_path, 'w') as report_file:
+        report_file.write('\n'.join(report) + '\n')
+    log = util_log.get_logger()
+    log.log_and_print('Profile report written to {0}'.format(report_path))
+
+
+def _write_trace(state):
+    '''Merge the timelines of the driver and of the tests into one trace.
+
+    Args:
+        state: Test suite state collection, instance of State.
+    '''
+    util_trace.stop()
+    trace_path = state.trace_dir + '.json'
+    count = util_trace.merge_traces(state.trace_dir, trace_path)
+    log = util_log.get_logger()
+    log.log_and_print('Trace of {0} events written to {1}'.format(
+        count, trace_path))
+
+
 def _check_lldbserver_exists(state):
     '''Check lldb-server exists on the target device and it is executable.
 
@@ -612,6 +909,9 @@ def _suite_pre_run(state):
             android.validate_device()
             log.log_and_print('Located device ' + android.device)
 
+        # discover the test apps and the state of their artifacts
+        bundle.update_index()
+
         if state.noinstall and not state.single_test:
             bundle.check_apps_installed(state.wimpy)
 
@@ -772,6 +1072,7 @@ def _deduce_python_path(state):
 def main():
     '''The lldb-renderscript test suite entry point.'''
     log = None
+    state = None
 
     try:
         # parse the command line
@@ -794,6 +1095,8 @@ def main():
         if state.install_only:
             log.log_and_print('Test applications installed. Terminating due to '
                               '--install-only option')
+        elif state.benchmark_script_cache:
+            quit(0 if _run_cache_benchmark(state) == 0 else 1)
         else:
             # run the tests
             for bundle_type in state.bundle_types:
@@ -801,6 +1104,8 @@ def main():
                 for item in tests:
                     _run_test(state, item, bundle_type)
                 # post run step
+            if state.profile_dir:
+                _write_profile_report(state)
             quit(0 if _suite_post_run(state) == 0 else 1)
 
     except AssertionError:
@@ -822,14 +1127,20 @@ def main():
         quit(2)
 
     finally:
+        if state and state.trace_dir:
+            _write_trace(state)
         _kill_emulator()
-        logging.shutdown()
+        # write the records still queued, the logging module closing the
+        # other handlers at exit
+        util_log.shutdown()
 
 def signal_handler(_, _unused):
     '''Signal handler for SIGINT, caused by the user typing Ctrl-C.'''
     # pylint: disable=unused-argument
     # pylint: disable=protected-access
     print('Ctrl+C!')
+    # write the records still queued, as the exit skips the exit handlers
+    util_log.shutdown()
     os._exit(1)
 
 
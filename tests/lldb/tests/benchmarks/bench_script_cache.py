@@ -0,0 +1,59 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Module that contains the benchmark BenchScriptCache.'''
+
+from __future__ import absolute_import
+
+import time
+
+from harness.test_base_remote import TestBaseRemote
+from harness.decorators import (
+    ordered_test,
+    cpp_only_test
+)
+
+
+class BenchScriptCache(TestBaseRemote):
+    '''Measures the time from launching the target to its first kernel.
+
+    Run once with the script cache deleted and once with it populated, the
+    difference between the two timings is the cost of compiling the scripts
+    of the target as opposed to loading them from the cache.'''
+
+    bundle_target = {
+        'java': 'JavaDebugWaitAttach',
+        'jni': 'JNIDebugWaitAttach',
+        'cpp': 'CppDebugWaitAttach'
+    }
+
+    @ordered_test(0)
+    def test_launch_to_first_kernel_breakpoint(self):
+        self.try_command('language renderscript kernel breakpoint all enable',
+                         ['Breakpoints will be set on all kernels'])
+
+        self.try_command('process continue',
+                         ['resuming',
+                          'stopped',
+                          'stop reason = breakpoint'])
+
+        self.measurements['launch_to_first_kernel_breakpoint'] = (
+            time.time() - self.launch_time)
+
+    @ordered_test('last')
+    @cpp_only_test()
+    def test_cpp_cleanup(self):
+        self.try_command('breakpoint disable', ['breakpoints disabled'])
+
+        self.try_command('process continue', ['exited with status = 0'])
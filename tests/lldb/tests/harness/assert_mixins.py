@@ -27,6 +27,41 @@ NOTE: These are strictly clean mixins for `TestBase`. All classes here should
 strictly inherit only from `object`
 """
 
+import os
+
+from .util_allocation_file import AllocationFile, compare
+from .util_rs_output import (
+    parse_allocation_dump,
+    parse_allocation_list,
+    parse_kernel_coordinate,
+    parse_status
+)
+
+
+class RuntimeAssertionsMixin(object):
+    def assert_runtime_status(self, hooks=()):
+        '''Check that lldb discovered the RenderScript runtime.
+
+        Args:
+            hooks: Names of the runtime functions that must be hooked.
+
+        Raises:
+            TestFail: The runtime library or driver was not discovered, no
+                runtime function is hooked, or one of the functions is not
+                hooked.
+        '''
+        status = parse_status(self.try_command('language renderscript status'))
+        if not status.library_discovered:
+            raise self.TestFail('The runtime library was not discovered')
+        if not status.driver_discovered:
+            raise self.TestFail('The runtime driver was not discovered')
+        if not status.functions_hooked:
+            raise self.TestFail('No runtime functions hooked')
+        missing = [hook for hook in hooks if hook not in status.hooks]
+        if missing:
+            raise self.TestFail('Runtime functions not hooked: {0}'
+                                .format(', '.join(missing)))
+
 
 class CoordinateAssertionsMixin(object):
     def assert_coord_bp_set(
@@ -96,7 +131,147 @@ class CoordinateAssertionsMixin(object):
                 ]
             )
 
+        self.assert_kernel_coordinate(x, y or 0, z or 0)
+
+    def assert_kernel_coordinate(self, x, y=0, z=0):
+        '''Check the coordinate the kernel is currently stopped at.
+
+        Args:
+            (x, y, z): The expected coordinate.
+
+        Raises:
+            TestFail: lldb reported a different coordinate, or none at all.
+        '''
+        output = self.try_command('language renderscript kernel coordinate')
+        coord = parse_kernel_coordinate(output)
+        if coord != (x, y, z):
+            raise self.TestFail('Expected kernel coordinate {0}, got {1}'
+                                .format((x, y, z), coord))
+
+
+class AllocationAssertionsMixin(object):
+    def assert_allocation_dump(self, alloc_id, expected):
+        '''Check the contents of an allocation against the expected values.
+
+        Args:
+            alloc_id: Integer id of the allocation to dump.
+            expected: Dictionary from (x, y, z) coordinate to the expected
+                value of the element, as returned by
+                `util_rs_output.parse_element`: a number for scalars, a tuple
+                of numbers for vectors and the text printed by lldb otherwise.
+
+        Raises:
+            TestFail: One of the elements is missing or has a different value.
+        '''
+        output = self.try_command(
+            'language renderscript allocation dump %d' % alloc_id)
+        elements = parse_allocation_dump(output)
+        for coord in sorted(expected):
+            if coord not in elements:
+                raise self.TestFail('Element {0} of allocation {1} not found '
+                                    'in the dump'.format(coord, alloc_id))
+            if elements[coord] != expected[coord]:
+                raise self.TestFail(
+                    'Element {0} of allocation {1} is {2!r}, expected {3!r}'
+                    .format(coord, alloc_id, elements[coord], expected[coord]))
+
+    def assert_allocation_contents(self, alloc_id, expected):
+        '''Check the contents of an allocation by saving it to a file.
+
+        The binary file written by lldb is compared with the expected values
+        as a whole, which is much faster than parsing a textual dump for large
+        allocations.
+
+        Args:
+            alloc_id: Integer id of the allocation to check.
+            expected: The expected values in the order of the dump, i.e. x
+                varying fastest: a NumPy array, or a sequence of numbers for
+                scalars or of tuples for vectors.
+
+        Raises:
+            TestFail: The contents of the allocation differ.
+        '''
+        path = self.get_tmp_file_path()
         self.try_command(
-            'language renderscript kernel coordinate',
-            '(%d, %d, %d)' % (x, y or 0, z or 0)
-        )
+            'language renderscript allocation save %d %s' % (alloc_id, path),
+            ["Allocation written to file '%s'" % path])
+        try:
+            with AllocationFile(path) as allocation:
+                difference = compare(allocation, expected)
+        finally:
+            os.remove(path)
+        if difference:
+            raise self.TestFail('Allocation {0}: {1}'.format(alloc_id,
+                                                             difference))
+
+    def list_allocations(self, alloc_id=None):
+        '''Get the details lldb reports for the allocations.
+
+        Args:
+            alloc_id: Integer id of the only allocation to list, or None to
+                list all of them.
+
+        Returns:
+            An OrderedDict from allocation id to
+            `util_rs_output.Allocation` record.
+        '''
+        cmd = 'language renderscript allocation list'
+        if alloc_id is not None:
+            cmd += ' -i %d' % alloc_id
+        return parse_allocation_list(self.try_command(cmd))
+
+    def assert_allocation_details(
+            self, alloc_id, dims, data_type, data_kind, allocations=None
+        ):
+        '''Check the details lldb reports for an allocation.
+
+        The context, address and data pointer of the allocation must be known
+        and non null.
+
+        Args:
+            alloc_id: Integer id of the allocation.
+            dims: The expected (x, y, z) dimensions.
+            data_type: String, the expected element type, e.g. "uchar4".
+            data_kind: String, the expected element kind, e.g. "User".
+            allocations: The allocations previously returned by
+                `list_allocations`. If None, only this allocation is listed.
+
+        Raises:
+            TestFail: The allocation is not listed or its details differ.
+        '''
+        if allocations is None:
+            allocations = self.list_allocations(alloc_id)
+
+        alloc = allocations.get(alloc_id)
+        if alloc is None:
+            raise self.TestFail('Allocation {0} is not listed'
+                                .format(alloc_id))
+        if not (alloc.context and alloc.address and alloc.data_pointer):
+            raise self.TestFail('Allocation {0} has a null or unknown '
+                                'pointer: {1}'.format(alloc_id, alloc))
+        if (alloc.dims, alloc.data_type, alloc.data_kind) != (
+                tuple(dims), data_type, data_kind):
+            raise self.TestFail(
+                'Allocation {0} is {1}, expected dims={2} data_type={3} '
+                'data_kind={4}'.format(alloc_id, alloc, tuple(dims),
+                                       data_type, data_kind))
+
+    def assert_allocation_list(self, expected):
+        '''Check the details lldb reports for several allocations.
+
+        All the allocations are listed with a single command.
+
+        Args:
+            expected: Dictionary from allocation id to the expected
+                (dims, data_type, data_kind), see `assert_allocation_details`.
+                Other allocations may be listed too.
+
+        Raises:
+            TestFail: One of the allocations is not listed or its details
+                differ.
+        '''
+        allocations = self.list_allocations()
+        for alloc_id in sorted(expected):
+            dims, data_type, data_kind = expected[alloc_id]
+            self.assert_allocation_details(alloc_id, dims, data_type,
+                                           data_kind, allocations)
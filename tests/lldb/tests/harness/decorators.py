@@ -93,6 +93,45 @@ class ordered_test(object):
         return func
 
 
+class provides_state(object):
+    '''
+    Declare the named setup states a test method establishes in the debug
+    session, for the methods declaring them with `requires_state`:
+
+    >>> class MyTestClass(TestBaseRemote):
+    ...     @ordered_test(0)
+    ...     @provides_state('kernel_breakpoint_hit')
+    ...     def test_setup(self):
+    ...         ...
+    ...
+    ...     @requires_state('kernel_breakpoint_hit')
+    ...     def test_inspect_kernel(self):
+    ...         ...
+
+    See harness.util_test_graph for how the dependencies are used.
+    '''
+    def __init__(self, *states):
+        self._states = states
+
+    def __call__(self, func):
+        func.test_provides = getattr(func, 'test_provides', ()) + self._states
+        return func
+
+
+class requires_state(object):
+    '''
+    Declare the named setup states a test method needs. The method then only
+    depends on the methods providing these states, instead of every method
+    running before it. See `provides_state`.
+    '''
+    def __init__(self, *states):
+        self._states = states
+
+    def __call__(self, func):
+        func.test_requires = getattr(func, 'test_requires', ()) + self._states
+        return func
+
+
 class deprecated(object):
     """
     method or function decorator used to warn of pending feature removal:
@@ -16,16 +16,27 @@
 
 from __future__ import absolute_import
 
+import collections
 import logging
 import os
 import re
+import sys
 import tempfile
+import time
 import inspect
 import traceback
 
 from .exception import DisconnectedException, TestSuiteException
 
 from . import util_log
+from . import util_trace
+from .util_matcher import Matcher, compile_pattern
+from .util_profile import command_verb
+from .util_test_graph import TestGraph, sort_key
+
+# Where the process stopped, as reported by continue_until
+StopInfo = collections.namedtuple(
+    'StopInfo', ['reason', 'module', 'function', 'thread', 'frame'])
 
 
 class TestBase(object):
@@ -46,10 +57,16 @@ class TestBase(object):
         # overwritten by test_base_remote.
         # pylint: disable=unused-argument
         self._lldb = None # handle to the lldb module
+        self._dbg = None # instance of the SBDebugger running this test
         self._ci = None # instance of the lldb command interpreter for this test
         self._timer = timer # timer instance, to check whether the test froze
         self.app_type = app_type # The type of bundle that is being executed
         self.wimpy = wimpy
+        self.launch_time = None # time the target was launched, set by runner
+        self.measurements = {} # timings recorded by benchmarks, in seconds
+        self._matcher = Matcher() # checks the output of the lldb commands
+        self.profile = None # util_profile.Profile, set by runner to profile
+        self.selected_tests = None # names of the test methods to run, or all
 
     def setup(self, android):
         '''Set up environment for the test.
@@ -74,17 +91,11 @@ class TestBase(object):
         '''
         pass
 
-    def run(self, dbg, remote_pid, lldb):
-        '''Execute the actual test suite.
-
-        Args:
-            dbg: The instance of the SBDebugger that is used to test commands.
-            remote_pid: The integer that is the process id of the binary that
-                        the debugger is attached to.
-            lldb: A handle to the lldb module.
+    def get_test_methods(self):
+        '''Get the test methods to run, honouring the wimpy mode.
 
         Returns:
-            A list of (test, failure) tuples.
+            A list of bound methods.
         '''
         log = util_log.get_logger()
 
@@ -97,22 +108,65 @@ class TestBase(object):
                 return False
             return True
 
-        test_methods = [
+        return [
             method for name, method in inspect.getmembers(self, predicate)
             if name.startswith('test_')
         ]
+
+    def plan_sessions(self, max_sessions=None):
+        '''Split the test methods into sessions that can run separately.
+
+        Args:
+            max_sessions: Integer, the maximum number of sessions. If None,
+                          there is one session per independent branch.
+
+        Returns:
+            A list of sessions, each being the list of the names of the
+            methods to run, see util_test_graph.TestGraph.sessions.
+        '''
+        return TestGraph(self.get_test_methods()).sessions(max_sessions)
+
+    def run(self, dbg, remote_pid, lldb):
+        '''Execute the actual test suite.
+
+        Args:
+            dbg: The instance of the SBDebugger that is used to test commands.
+            remote_pid: The integer that is the process id of the binary that
+                        the debugger is attached to.
+            lldb: A handle to the lldb module.
+
+        Returns:
+            A list of (test, failure) tuples.
+        '''
+        log = util_log.get_logger()
+
+        test_methods = self.get_test_methods()
+        graph = TestGraph(test_methods)
+        if self.selected_tests is not None:
+            selected = set(graph.session(self.selected_tests))
+            test_methods = [method for method in test_methods
+                            if method.__name__ in selected]
         log.debug("Found the following tests %r", test_methods)
         test_errors = []
 
-        for test in sorted(
-            test_methods,
-            key=lambda item: getattr(item, 'test_order', float('Inf'))
-        ):
+        for test in sorted(test_methods, key=sort_key):
+            start = time.time()
+            matching = self._matcher.elapsed
             try:
+                util_log.set_method(test.__name__)
                 log.info("running test %r", test.__name__)
-                result = test()
+                with util_trace.span(test.__name__, 'test'):
+                    result = test()
             except (self.TestFail, TestSuiteException) as e:
                 test_errors.append((method, e))
+            finally:
+                util_log.set_method(None)
+                elapsed = time.time() - start
+                matching = self._matcher.elapsed - matching
+                log.info("test %r took %.3fs (%.3fs matching output)",
+                         test.__name__, elapsed, matching)
+                if self.profile:
+                    self.profile.add_test(test.__name__, elapsed, matching)
 
         return test_errors
 
@@ -152,6 +206,118 @@ class TestBase(object):
             raise self.TestFail('Frame language not RenderScript, instead {0}'
                                 .format(lang))
 
+    def _stop_info(self, process):
+        '''Describe where a stopped process is stopped.
+
+        The first thread with a stop reason is selected, as lldb would do.
+
+        Args:
+            process: The stopped SBProcess.
+
+        Returns:
+            A StopInfo for the frame 0 of the thread that stopped.
+        '''
+        lldb = self._lldb
+        thread = process.GetSelectedThread()
+        for candidate in process:
+            if candidate.GetStopReason() not in (lldb.eStopReasonNone,
+                                                 lldb.eStopReasonInvalid):
+                thread = candidate
+                process.SetSelectedThread(thread)
+                break
+
+        frame = thread.GetFrameAtIndex(0)
+        return StopInfo(reason=thread.GetStopReason(),
+                        module=frame.GetModule().GetFileSpec().GetFilename(),
+                        function=frame.GetFunctionName(),
+                        thread=thread,
+                        frame=frame)
+
+    def _wait_for_stop(self, listener, process):
+        '''Wait for the process to stop, using the events it broadcasts.
+
+        There is no timeout, a frozen process is caught by the test timer.
+
+        Args:
+            listener: SBListener registered for the state changes of process.
+            process: The running SBProcess.
+
+        Raises:
+            TestFail: The process exited, crashed or was detached.
+        '''
+        lldb = self._lldb
+        event = lldb.SBEvent()
+        while True:
+            if not listener.WaitForEvent(1, event):
+                continue
+            if not lldb.SBProcess.EventIsProcessEvent(event):
+                continue
+            state = lldb.SBProcess.GetStateFromEvent(event)
+            if state == lldb.eStateStopped:
+                if not lldb.SBProcess.GetRestartedFromEvent(event):
+                    return
+            elif state in (lldb.eStateExited, lldb.eStateCrashed,
+                           lldb.eStateDetached):
+                raise self.TestFail(
+                    'The process ended while waiting for a stop: {0}'
+                    .format(lldb.SBDebugger.StateAsCString(state)))
+
+    def continue_until(self, predicate, max_stops):
+        '''Continue the process until it stops where the predicate accepts.
+
+        The debugger is switched to asynchronous mode and the stops are
+        received as process events, so no command output has to be formatted
+        and parsed at each stop.
+
+        Args:
+            predicate: Function taking the StopInfo of a stop and returning
+                       True to stop continuing. It may raise TestFail if the
+                       process stopped where it should not have.
+            max_stops: Integer, the maximum number of times to continue.
+
+        Raises:
+            TestFail: The process could not be continued or it ended.
+
+        Returns:
+            The StopInfo accepted by the predicate, or None if it accepted
+            none of the max_stops stops.
+        '''
+        assert self._lldb
+        assert self._dbg
+        assert self._ci
+
+        lldb = self._lldb
+        log = util_log.get_logger()
+        process = self._ci.GetProcess()
+
+        listener = lldb.SBListener('continue_until')
+        broadcaster = process.GetBroadcaster()
+        broadcaster.AddListener(listener,
+                                lldb.SBProcess.eBroadcastBitStateChanged)
+        self._dbg.SetAsync(True)
+        try:
+            for _ in range(max_stops):
+                log.info('[Command] process continue (async)')
+                if self._timer:
+                    self._timer.reset()
+
+                with util_trace.span('process continue', 'lldb'):
+                    error = process.Continue()
+                    if error.Fail():
+                        raise self.TestFail(
+                            'Unable to continue the process: {0}'
+                            .format(error.GetCString()))
+                    self._wait_for_stop(listener, process)
+
+                stop = self._stop_info(process)
+                log.debug('[Stop] %s`%s', stop.module, stop.function)
+                if predicate(stop):
+                    return stop
+        finally:
+            self._dbg.SetAsync(False)
+            broadcaster.RemoveListener(listener)
+        return None
+
     def do_command(self, cmd):
         '''Run an lldb command and return the output.
 
@@ -167,14 +333,18 @@ class TestBase(object):
         log = util_log.get_logger()
         res = self._lldb.SBCommandReturnObject()
 
-        log.info('[Command] {0}'.format(cmd))
+        log.info('[Command] %s', cmd)
 
         # before issuing the command, restart the current timer to check
         # whether the command is going to freeze the test
         if self._timer:
             self._timer.reset()
 
-        self._ci.HandleCommand(cmd, res)
+        start = time.time()
+        with util_trace.span(command_verb(cmd), 'lldb', cmd=cmd):
+            self._ci.HandleCommand(cmd, res)
+        if self.profile:
+            self.profile.add_command(cmd, time.time() - start)
 
         if not res.Succeeded():
             error = res.GetError()
@@ -183,7 +353,7 @@ class TestBase(object):
                                 .format(cmd, error if error else '<N/a>'))
 
         output = res.GetOutput() or ''
-        log.debug('[Output] {0}'.format(output.rstrip()))
+        log.debug('[Output] %s', output.rstrip())
 
         return output
 
@@ -206,43 +376,214 @@ class TestBase(object):
         '''
         assert self._lldb
         assert self._ci
-        log = util_log.get_logger()
         output = ''
         try:
             output = self.do_command(cmd)
+            self._check_output(output, expected, expected_regex)
+        except self.TestFail as exception:
+            self._report_failure(output, exception)
+            raise  # pass through
+
+        return output
+
+    def do_commands(self, cmds):
+        '''Run a sequence of lldb commands in a single call to lldb.
 
-            if 'lost connection' in output:
-                raise DisconnectedException('Lost connection to lldb-server.')
+        The commands are written to a file, which is run with `command source`
+        echoing each command, so that the output of every command can be told
+        apart. The sourced commands print to the output stream of the
+        debugger rather than to the result of `command source`, so that stream
+        is redirected to a file for the duration of the call. The timer is
+        reset once for the whole sequence.
 
-            # check the expected strings
-            if expected:
-                self._match_literals(output, expected)
+        Args:
+            cmds: A list of strings, the lldb commands to run.
+
+        Raises:
+            TestFail: One of the lldb commands failed. The commands after it
+                      were not run.
+            TestSuiteException: The output of each command could not be
+                                recovered from the output of the sequence.
+
+        Returns:
+            A list with the output of each command.
+        '''
+        assert self._lldb
+        assert self._ci
+
+        if not cmds:
+            return []
+
+        log = util_log.get_logger()
+        res = self._lldb.SBCommandReturnObject()
+
+        for cmd in cmds:
+            log.info('[Command] %s', cmd)
+
+        path = self.get_tmp_file_path()
+        with open(path, 'w') as file_desc:
+            file_desc.write('\n'.join(cmds) + '\n')
+        out_path = self.get_tmp_file_path()
+
+        if self._timer:
+            self._timer.reset()
+
+        dbg = self._ci.GetDebugger()
+        start = time.time()
+        try:
+            with open(out_path, 'w+') as out_file:
+                old_out = dbg.GetOutputFileHandle()
+                dbg.SetOutputFileHandle(out_file, False)
+                try:
+                    with util_trace.span('command source', 'lldb', cmds=cmds):
+                        self._ci.HandleCommand(
+                            'command source -e true -s false -c false ' + path,
+                            res)
+                finally:
+                    dbg.SetOutputFileHandle(
+                        old_out if old_out is not None else sys.stdout, False)
+                out_file.flush()
+                out_file.seek(0)
+                text = out_file.read()
+        finally:
+            os.remove(path)
+            if os.path.exists(out_path):
+                os.remove(out_path)
+        if self.profile:
+            self.profile.add_command('command source', time.time() - start)
+
+        outputs = self._split_outputs(text + (res.GetOutput() or ''), cmds)
+        for output in outputs:
+            log.debug('[Output] %s', output.rstrip())
+
+        if not res.Succeeded():
+            # the failed command is the last one that was echoed
+            cmd = cmds[len(outputs) - 1] if outputs else cmds[0]
+            error = res.GetError()
+            raise self.TestFail('The command "{0}" failed with the error: {1}'
+                                .format(cmd, error if error else '<N/a>'))
+
+        if len(outputs) != len(cmds):
+            raise TestSuiteException(
+                'Only {0} of {1} commands were echoed by command source'
+                .format(len(outputs), len(cmds)))
+        return outputs
+
+    def _split_outputs(self, text, cmds):
+        '''Split the output of `command source` into that of each command.
+
+        Args:
+            text: String, the output of `command source -e true`.
+            cmds: The list of commands that were sourced.
+
+        Returns:
+            A list with the output of each command that was echoed.
+        '''
+        prompt = re.escape(self._ci.GetDebugger().GetPrompt().strip())
+        headers = []
+        pos = 0
+        for cmd in cmds:
+            header = compile_pattern(r'(?m)^{0}\s*{1}[ \t]*\n'.format(
+                prompt, re.escape(cmd)))
+            match = header.search(text, pos)
+            if not match:
+                break
+            headers.append(match)
+            pos = match.end()
 
-            # check the regexp patterns
-            if expected_regex:
-                self._match_regexp_patterns(output, expected_regex)
+        outputs = []
+        for index, match in enumerate(headers):
+            end = (headers[index + 1].start() if index + 1 < len(headers)
+                   else len(text))
+            outputs.append(text[match.end():end])
+        return outputs
 
+    def try_commands(self, cmds):
+        '''Run a sequence of lldb commands and match their expected responses.
+
+        The commands are sent to lldb together, see do_commands, and the
+        output of each of them is matched against its own expectations.
+
+        Args:
+            cmds: A list whose items are either the string of an lldb command,
+                  or a tuple (cmd, expected, expected_regex) with the same
+                  meaning as the arguments of try_command.
+
+        Raises:
+            TestFail: One of the commands failed or one of the expected strings
+                      was not found in the output of its command.
+
+        Returns:
+            A list with the raw output of each command.
+        '''
+        assert self._lldb
+        assert self._ci
+        cmds = [(cmd, None, None) if isinstance(cmd, str)
+                else tuple(cmd) + (None,) * (3 - len(cmd))
+                for cmd in cmds]
+        outputs = []
+        output = ''
+        try:
+            outputs = self.do_commands([cmd for cmd, _, _ in cmds])
+            for (cmd, expected, expected_regex), output in zip(cmds, outputs):
+                self._check_output(output, expected, expected_regex)
         except self.TestFail as exception:
-            # if the command failed, ensure the output retrieved from the
-            # command is printed even in verbose mode
-            if log.getEffectiveLevel() > logging.DEBUG:
-                log.error('[Output] {0}'.format(output.rstrip() if output
-                                                else '<empty>'))
-
-            # print the back trace, it should help to identify the error in
-            # the test
-            backtrace = ['[Back trace]']
-            for (filename, line, function, text) in \
-                    traceback.extract_stack()[:-1]:
-                backtrace.append('  [{0} line: {2} fn: {1}] {3}'.format(
-                            filename, function, line, text
-                    )
-                )
-            log.error('\n'.join(backtrace))
-            log.error('[TEST ERROR] {0}'.format(exception.message))
+            self._report_failure(output, exception)
             raise  # pass through
 
-        return output
+        return outputs
+
+    def _check_output(self, output, expected, expected_regex):
+        '''Match the output of a command against its expected response.
+
+        Args:
+            output: String, the output of the command.
+            expected: A list of strings that should be present in the output.
+            expected_regex: A list of regular expressions that should match
+                            the output.
+
+        Raises:
+            DisconnectedException: The connection to lldb-server was lost.
+            TestFail: One of the expected strings were not found.
+        '''
+        if 'lost connection' in output:
+            raise DisconnectedException('Lost connection to lldb-server.')
+
+        # check the expected strings
+        if expected:
+            self._match_literals(output, expected)
+
+        # check the regexp patterns
+        if expected_regex:
+            self._match_regexp_patterns(output, expected_regex)
+
+    @staticmethod
+    def _report_failure(output, exception):
+        '''Log the output and the back trace of a failed command.
+
+        Args:
+            output: String, the output of the command.
+            exception: The TestFail raised for the command.
+        '''
+        log = util_log.get_logger()
+
+        # if the command failed, ensure the output retrieved from the
+        # command is printed even in verbose mode
+        if log.getEffectiveLevel() > logging.DEBUG:
+            log.error('[Output] {0}'.format(output.rstrip() if output
+                                            else '<empty>'))
+
+        # print the back trace, it should help to identify the error in
+        # the test
+        backtrace = ['[Back trace]']
+        for (filename, line, function, text) in \
+                traceback.extract_stack()[:-2]:
+            backtrace.append('  [{0} line: {2} fn: {1}] {3}'.format(
+                        filename, function, line, text
+                )
+            )
+        log.error('\n'.join(backtrace))
+        log.error('[TEST ERROR] {0}'.format(exception.message))
 
     def _match_literals(self, text, literals):
         '''Checks the text against the array of literals.
@@ -257,10 +598,10 @@ class TestBase(object):
         Throws: self.TestFail: if it cannot match one of the literals in
                 the output.
         '''
-        for string in literals:
-            if string not in text:
-                raise self.TestFail('Cannot find "{0}" in the output'
-                                    .format(string))
+        missing = self._matcher.missing_literals(text, literals)
+        if missing:
+            raise self.TestFail('Cannot find "{0}" in the output'
+                                .format(missing[0]))
 
     def _match_regexp_patterns(self, text, patterns):
         '''Checks the text against the array of regular expression patterns.
@@ -278,15 +619,13 @@ class TestBase(object):
         '''
         log = util_log.get_logger()
 
-        for regex in patterns:
-            match = re.search(regex, text)
-            if not match:
+        matches = self._matcher.search_all(text, patterns)
+        for regex, match in zip(patterns, matches):
+            if match is None:
                 raise self.TestFail('Cannot match the regexp "{0}" in '
                                     'the output'.format(regex))
             else:
-                msg = 'Found match to regex {0}: {1}'.format(regex,
-                                     match.group())
-                log.debug(msg)
+                log.debug('Found match to regex %s: %s', regex, match)
 
     @staticmethod
     def get_tmp_file_path():
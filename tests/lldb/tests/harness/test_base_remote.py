@@ -21,6 +21,7 @@ import re
 
 from .test_base import TestBase
 from . import util_log
+from .util_trace import traced
 
 
 class TestBaseRemote(TestBase):
@@ -79,6 +80,7 @@ class TestBaseRemote(TestBase):
         if self._platform:
             self._platform.DisconnectRemote()
 
+    @traced('lldb')
     def _connect_to_platform(self, lldb_module, dbg, remote_pid):
         '''Connect to an lldb platform that has been started elsewhere.
 
@@ -160,6 +162,7 @@ class TestBaseRemote(TestBase):
         assert lldb
 
         self._lldb = lldb
+        self._dbg = dbg
 
         self.assert_true(self._connect_to_platform(lldb, dbg, remote_pid))
         self._ci = dbg.GetCommandInterpreter()
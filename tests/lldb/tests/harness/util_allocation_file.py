@@ -0,0 +1,290 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Module that contains the class AllocationFile, a reader for the binary
+files written by `language renderscript allocation save`.
+
+A file starts with a header holding the "RSAD" magic, the dimensions of the
+allocation and the size of all the headers, followed by a tree of headers
+describing the element type and finally by the raw contents of the
+allocation. The file is memory mapped and, if NumPy is installed, its contents
+are exposed as a structured array without copying them. Otherwise they are
+decoded element by element with the struct module.
+'''
+
+from __future__ import absolute_import
+
+import collections
+import mmap
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .exception import TestSuiteException
+
+# struct FileHeader { uint8_t ident[4]; uint32_t dims[3]; uint16_t hdr_size; }
+_FILE_HEADER = struct.Struct('<4s3IH2x')
+
+# struct ElementHeader { uint16_t type; uint32_t kind; uint32_t element_size;
+#                        uint16_t vector_size; uint32_t array_size; }
+_ELEMENT_HEADER = struct.Struct('<H2xIIH2xI')
+
+# Offsets of the child element headers, terminated by a zero
+_CHILD_OFFSET = struct.Struct('<I')
+
+_MAGIC = b'RSAD'
+
+# Deepest nesting of the element headers accepted, far above that of the
+# structs of a script
+_MAX_NESTING = 32
+
+# RenderScript DataType enum to the struct/NumPy code of a scalar of that type
+_TYPE_CODES = {
+    1: 'e',   # RS_TYPE_FLOAT_16
+    2: 'f',   # RS_TYPE_FLOAT_32
+    3: 'd',   # RS_TYPE_FLOAT_64
+    4: 'b',   # RS_TYPE_SIGNED_8
+    5: 'h',   # RS_TYPE_SIGNED_16
+    6: 'i',   # RS_TYPE_SIGNED_32
+    7: 'q',   # RS_TYPE_SIGNED_64
+    8: 'B',   # RS_TYPE_UNSIGNED_8
+    9: 'H',   # RS_TYPE_UNSIGNED_16
+    10: 'I',  # RS_TYPE_UNSIGNED_32
+    11: 'Q',  # RS_TYPE_UNSIGNED_64
+    12: '?',  # RS_TYPE_BOOLEAN
+}
+
+ElementHeader = collections.namedtuple(
+    'ElementHeader',
+    ['data_type', 'data_kind', 'element_size', 'vector_size', 'array_size',
+     'children'])
+
+
+def have_numpy():
+    '''Check whether NumPy can be used to decode allocation files.'''
+    return numpy is not None
+
+
+def _parse_element_header(buf, base, offset, parents=()):
+    '''Parse an element header and, recursively, those of its children.
+
+    Args:
+        buf: The buffer holding the file.
+        base: Integer, the offset in the buffer of the first element header,
+              which the offsets of the headers are relative to.
+        offset: Integer, the offset of the element header.
+        parents: Tuple of the offsets of the headers containing this one.
+
+    Returns:
+        An ElementHeader.
+
+    Raises:
+        TestSuiteException: A header is out of the buffer, contains itself or
+                            is nested too deeply.
+    '''
+    if offset in parents:
+        raise TestSuiteException('element header at %d contains itself'
+                                 % offset)
+    if len(parents) >= _MAX_NESTING:
+        raise TestSuiteException('element header at %d is nested more than '
+                                 '%d times' % (offset, _MAX_NESTING))
+    position = base + offset
+    if position + _ELEMENT_HEADER.size > len(buf):
+        raise TestSuiteException('element header at %d is out of the file'
+                                 % offset)
+    data_type, data_kind, element_size, vector_size, array_size = \
+        _ELEMENT_HEADER.unpack_from(buf, position)
+    children = []
+    position += _ELEMENT_HEADER.size
+    while True:
+        if position + _CHILD_OFFSET.size > len(buf):
+            raise TestSuiteException('children of the element header at %d '
+                                     'are out of the file' % offset)
+        (child_offset,) = _CHILD_OFFSET.unpack_from(buf, position)
+        if not child_offset:
+            break
+        children.append(_parse_element_header(buf, base, child_offset,
+                                              parents + (offset,)))
+        position += _CHILD_OFFSET.size
+    return ElementHeader(data_type, data_kind, element_size, vector_size,
+                         array_size, children)
+
+
+class AllocationFile(object):
+    '''The contents of an allocation saved to a file by lldb.'''
+
+    def __init__(self, path):
+        '''Map the file and parse its headers.
+
+        Args:
+            path: String, the path to the file.
+
+        Raises:
+            TestSuiteException: The file is not a valid allocation file, or
+                                its element type is not supported.
+        '''
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except (ValueError, mmap.error):
+            self._file.close()
+            raise TestSuiteException('Allocation file %s is empty' % path)
+
+        if len(self._map) < _FILE_HEADER.size + _ELEMENT_HEADER.size:
+            self.close()
+            raise TestSuiteException('Allocation file %s is truncated' % path)
+
+        magic, dim_x, dim_y, dim_z, self._hdr_size = \
+            _FILE_HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self.close()
+            raise TestSuiteException('%s is not an allocation file' % path)
+
+        self.dims = (dim_x, dim_y, dim_z)
+        try:
+            self.element = _parse_element_header(self._map, _FILE_HEADER.size,
+                                                 0)
+        except TestSuiteException as error:
+            self.close()
+            raise TestSuiteException('Allocation file %s: %s' % (path, error))
+        if self.element.children or self.element.data_type not in _TYPE_CODES:
+            self.close()
+            raise TestSuiteException(
+                'Allocation file %s: only allocations of scalars or vectors '
+                'are supported, not %s' % (path, self.element))
+
+        # Unused dimensions are reported as zero
+        self.count = max(dim_x, 1) * max(dim_y, 1) * max(dim_z, 1)
+        needed = self._hdr_size + self.count * self.element.element_size
+        if len(self._map) < needed:
+            self.close()
+            raise TestSuiteException(
+                'Allocation file %s is truncated: %d bytes instead of %d' % (
+                    path, len(self._map), needed))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''Unmap and close the file.'''
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @property
+    def _scalar_code(self):
+        '''The struct/NumPy code of one component of an element.'''
+        return '<' + _TYPE_CODES[self.element.data_type]
+
+    def dtype(self):
+        '''Get the NumPy structured type of one element of the allocation.
+
+        Elements have a single field, "value", which is an array for vectors.
+        Padding, e.g. that of the vectors of three components, is skipped.
+
+        Returns:
+            The numpy.dtype of an element.
+        '''
+        vec_size = self.element.vector_size
+        fmt = (self._scalar_code if vec_size <= 1
+               else (self._scalar_code, (vec_size,)))
+        return numpy.dtype({'names': ['value'],
+                            'formats': [fmt],
+                            'offsets': [0],
+                            'itemsize': self.element.element_size})
+
+    def to_array(self):
+        '''Get the contents of the allocation as a NumPy structured array.
+
+        The array is a view on the mapped file, so it is only valid until the
+        file is closed.
+
+        Returns:
+            A one dimensional array of dtype(), with the elements in the order
+            of `allocation dump`, i.e. x varying fastest.
+
+        Raises:
+            TestSuiteException: NumPy is not installed.
+        '''
+        if numpy is None:
+            raise TestSuiteException('NumPy is required to get allocation '
+                                     'contents as an array')
+        return numpy.frombuffer(self._map, dtype=self.dtype(),
+                                count=self.count, offset=self._hdr_size)
+
+    def values(self):
+        '''Decode the contents of the allocation without NumPy.
+
+        Returns:
+            A list with, for each element in the order of `allocation dump`,
+            its value for scalars or a tuple of its components for vectors.
+        '''
+        vec_size = max(self.element.vector_size, 1)
+        fmt = struct.Struct(self._scalar_code[0] +
+                            self._scalar_code[1:] * vec_size)
+        stride = self.element.element_size
+        values = [fmt.unpack_from(self._map, self._hdr_size + index * stride)
+                  for index in range(self.count)]
+        if vec_size == 1:
+            return [value[0] for value in values]
+        return values
+
+
+def compare(allocation, expected):
+    '''Compare the contents of an allocation with the expected values.
+
+    Args:
+        allocation: The AllocationFile to check.
+        expected: The expected values in the order of `allocation dump`:
+                  either a NumPy array, or a sequence of numbers for scalars
+                  or of tuples for vectors.
+
+    Returns:
+        None if they are equal, else a string describing the first
+        difference.
+    '''
+    if numpy is not None:
+        actual = allocation.to_array()['value']
+        expected = numpy.asarray(expected)
+        if expected.size != actual.size:
+            return 'Allocation has %d values, expected %d' % (actual.size,
+                                                              expected.size)
+        expected = expected.reshape(actual.shape)
+        differ = actual != expected
+        if differ.ndim > 1:
+            differ = differ.any(axis=tuple(range(1, differ.ndim)))
+        if not differ.any():
+            return None
+        index = int(numpy.flatnonzero(differ)[0])
+        return 'Element %d is %s, expected %s' % (
+            index, actual[index].tolist(), expected[index].tolist())
+
+    actual = allocation.values()
+    expected = [tuple(value) if isinstance(value, (list, tuple)) else value
+                for value in expected]
+    if len(actual) != len(expected):
+        return 'Allocation has %d elements, expected %d' % (len(actual),
+                                                            len(expected))
+    for index, (got, want) in enumerate(zip(actual, expected)):
+        if got != want:
+            return 'Element %d is %s, expected %s' % (index, got, want)
+    return None
@@ -0,0 +1,117 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Tests of the reader of the files of `language renderscript allocation save`.
+
+Usage, from the tests folder: python -m harness.util_allocation_file_test
+'''
+
+from __future__ import absolute_import
+
+import os
+import struct
+import tempfile
+import unittest
+
+from . import util_allocation_file
+from .exception import TestSuiteException
+from .util_allocation_file import AllocationFile, ElementHeader
+
+_FLOAT_32 = 2
+_SIGNED_32 = 6
+_NONE = 0
+_KIND_USER = 0
+
+
+def _element_header(data_type, element_size, vector_size, child_offsets=()):
+    '''Encode an element header followed by the offsets of its children.'''
+    return (struct.pack('<H2xIIH2xI', data_type, _KIND_USER, element_size,
+                        vector_size, 1) +
+            struct.pack('<%dI' % (len(child_offsets) + 1),
+                        *(tuple(child_offsets) + (0,))))
+
+
+def _file_bytes(element_headers, contents, dims=(4, 0, 0)):
+    '''Encode an allocation file, as lldb writes it.'''
+    hdr_size = util_allocation_file._FILE_HEADER.size + len(element_headers)
+    return (struct.pack('<4s3IH2x', b'RSAD', dims[0], dims[1], dims[2],
+                        hdr_size) + element_headers + contents)
+
+
+# struct { float4 position; struct { int id; } tag; }, the offsets of the
+# children being relative to the first element header, as in lldb:
+# - 0: the struct, of two children, 20 + 3 * 4 bytes;
+# - 32: the float4, 20 + 4 bytes;
+# - 56: the inner struct, of one child, 20 + 2 * 4 bytes;
+# - 84: the int.
+_STRUCT_HEADERS = (_element_header(_NONE, 20, 1, [32, 56]) +
+                   _element_header(_FLOAT_32, 16, 4) +
+                   _element_header(_NONE, 4, 1, [84]) +
+                   _element_header(_SIGNED_32, 4, 1))
+
+
+class AllocationFileTest(unittest.TestCase):
+    '''Parsing of the headers of allocation files.'''
+
+    def setUp(self):
+        file_desc, self.path = tempfile.mkstemp(suffix='.rsad')
+        os.close(file_desc)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def _write(self, data):
+        with open(self.path, 'wb') as out_file:
+            out_file.write(data)
+
+    def test_scalars(self):
+        self._write(_file_bytes(_element_header(_SIGNED_32, 4, 1),
+                                struct.pack('<4i', 1, -2, 3, -4)))
+        with AllocationFile(self.path) as allocation:
+            self.assertEqual((4, 0, 0), allocation.dims)
+            self.assertEqual([1, -2, 3, -4], allocation.values())
+
+    def test_struct_headers(self):
+        element_base = util_allocation_file._FILE_HEADER.size
+        data = _file_bytes(_STRUCT_HEADERS, b'\0' * 20 * 4)
+        element = util_allocation_file._parse_element_header(
+            data, element_base, 0)
+        self.assertEqual(ElementHeader(
+            _NONE, _KIND_USER, 20, 1, 1, [
+                ElementHeader(_FLOAT_32, _KIND_USER, 16, 4, 1, []),
+                ElementHeader(_NONE, _KIND_USER, 4, 1, 1, [
+                    ElementHeader(_SIGNED_32, _KIND_USER, 4, 1, 1, [])])]),
+            element)
+
+    def test_struct_rejected(self):
+        self._write(_file_bytes(_STRUCT_HEADERS, b'\0' * 20 * 4))
+        with self.assertRaises(TestSuiteException):
+            AllocationFile(self.path)
+
+    def test_cyclic_headers_rejected(self):
+        headers = (_element_header(_NONE, 4, 1, [28]) +
+                   _element_header(_NONE, 4, 1, [28]))
+        self._write(_file_bytes(headers, b'\0' * 4 * 4))
+        with self.assertRaises(TestSuiteException):
+            AllocationFile(self.path)
+
+    def test_headers_out_of_file_rejected(self):
+        headers = _element_header(_NONE, 4, 1, [1000])
+        self._write(_file_bytes(headers, b'\0' * 4 * 4))
+        with self.assertRaises(TestSuiteException):
+            AllocationFile(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
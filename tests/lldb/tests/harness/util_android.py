@@ -31,6 +31,7 @@ except ImportError:
 
 from .exception import TestSuiteException
 from . import util_log
+from .util_trace import traced
 
 
 class UtilAndroid(object):
@@ -186,6 +187,7 @@ class UtilAndroid(object):
         self._log.log(level, 'RC: {0}, Output: {1}'.format(return_code,
                                                            message))
 
+    @traced('adb')
     def check_adb_alive(self):
         '''Ping the device and raise an exception in case of timeout.
 
@@ -247,6 +249,7 @@ class UtilAndroid(object):
         '''
         return self.adb('shell "{0}"'.format(cmd), async, True, timeout)
 
+    @traced('adb')
     def find_app_pid(self, process_name):
         '''Find the process ID of a process with a given name.
 
@@ -279,7 +282,7 @@ class UtilAndroid(object):
 
         try:
             pid = int(pids[0])
-            self._log.info('App pid found: {0}'.format(pids[0]))
+            self._log.info('App pid found: %s', pids[0])
             return pid
         except ValueError:
             return None
@@ -301,7 +304,7 @@ class UtilAndroid(object):
         '''
         out = self.adb('version', False, False)
         if out and 'Android' in out and 'version' in out:
-            self._log.info('adb found: {0}'.format(out))
+            self._log.info('adb found: %s', out)
             return None
         raise TestSuiteException('unable to validate adb')
 
@@ -540,6 +543,7 @@ class UtilAndroid(object):
 
         return True
 
+    @traced('adb')
     def launch_lldb_platform(self, port):
         '''Launch lldb server and attach to target app.
 
@@ -551,6 +555,7 @@ class UtilAndroid(object):
         self.shell(cmd, True)
         time.sleep(5)
 
+    @traced('adb')
     def forward_port(self, local, remote):
         '''Use adb to forward a device port onto the local machine.
 
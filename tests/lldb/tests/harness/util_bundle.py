@@ -22,38 +22,18 @@ import time
 from . import util_constants
 from . import util_log
 from .exception import TestSuiteException
+from .util_registry import BundleRegistry
+from .util_trace import traced
 
 
 class UtilBundle(object):
     '''Represents the collection of RS binaries that are debugged.'''
 
-    # Map of binary name to package name of all Java apps debugged
-    _tests_apk = {
-        'JavaInfiniteLoop': 'com.android.rs.infiniteloop',
-        'JavaDebugWaitAttach': 'com.android.rs.waitattachdebug',
-        'JavaNoDebugWaitAttach': 'com.android.rs.waitattachnodebug',
-        'BranchingFunCalls': 'com.android.rs.branchingfuncalls',
-        'KernelVariables': 'com.android.rs.kernelvariables',
-        'Allocations': 'com.android.rs.allocations',
-        'MultipleRSFiles': 'com.android.rs.multiplersfiles',
-        'SingleSource': 'com.android.rs.singlesource',
-        'ScriptGroup': 'com.android.rs.scriptgroup',
-        'Reduction': 'com.android.rs.lldbreductiontest',
-    }
-
-    _tests_jni = {
-        'JNIInfiniteLoop': 'com.android.rs.jniinfiniteloop',
-        'JNIDebugWaitAttach': 'com.android.rs.jnidebugwaitattach',
-        'JNINoDebugWaitAttach': 'com.android.rs.jninodebugwaitattach',
-        'JNIBranchingFunCalls': 'com.android.rs.jnibranchingfuncalls',
-        'JNIKernelVariables': 'com.android.rs.jnikernelvariables',
-        'JNIAllocations': 'com.android.rs.jniallocations',
-        'JNIMultipleRSFiles': 'com.android.rs.jnimultiplersfiles'
-    }
-
-    _tests_ndk = {'CppInfiniteLoop', 'CppNoDebugWaitAttach',
-                  'CppDebugWaitAttach', 'CppBranchingFunCalls',
-                  'CppKernelVariables', 'CppAllocations', 'CppMultipleRSFiles'}
+    # Directory that the NDK test binaries pass to `rs->init()`
+    _ndk_cache_dir = '/data/rscache'
+
+    # Absolute path on the device of the script cache of a Java/JNI app
+    _apk_cache_dir = '/data/data/{0}/cache/com.android.renderscript.cache'
 
     _missing_path_msg = (
         'No product path has been provided. If using `lunch` ensure '
@@ -62,11 +42,57 @@ class UtilBundle(object):
         'on the command line (`--aosp-product-path`)'
     )
 
-    def __init__(self, android, aosp_product_path):
+    def __init__(self, android, aosp_product_path, index_path=None):
         assert android
         self._android = android # Link to the android module
         self._aosp_product_path = aosp_product_path
         self._log = util_log.get_logger()
+        # Index of the test apps, discovered from the test suite makefiles
+        self._registry = BundleRegistry(index_path)
+        self._load_apps()
+
+    def _load_apps(self):
+        '''Refresh the maps of apps from the registry.'''
+        # Map of binary name to package name of all Java apps debugged
+        self._tests_apk = dict((name, app['package']) for name, app
+                               in self._registry.apps('java').items())
+        # Map of binary name to package name of all JNI apps debugged
+        self._tests_jni = dict((name, app['package']) for name, app
+                               in self._registry.apps('jni').items())
+        # Set of the NDK binaries debugged
+        self._tests_ndk = set(self._registry.apps('cpp'))
+
+    def update_index(self):
+        '''Rediscover the test apps and record the state of their artifacts.
+
+        The artifacts built in the product folder are hashed again only if
+        they changed since the index was last updated.
+        '''
+        self._registry.update(self._aosp_product_path)
+        self._load_apps()
+        for name, app in sorted(self._registry.apps().items()):
+            self._log.debug('Found %s app %s: %s (%s bytes, sha1 %s)',
+                            app['app_type'], name, app['artifact'],
+                            app['size'], app['sha1'])
+
+    def _artifact_path(self, app):
+        '''Get the path to the artifact an app is built into.
+
+        Args:
+            app: A string that is the name of the apk or ndk binary.
+
+        Returns:
+            A string that is the path to the artifact in the product folder.
+
+        Raises:
+            TestSuiteException: No product path has been provided or the app
+                                is unknown.
+        '''
+        product_folder = self._aosp_product_path
+        if not product_folder:
+            raise TestSuiteException(self._missing_path_msg)
+        return os.path.join(product_folder,
+                            self._registry.get(app)['artifact'])
 
     def is_apk(self, name):
         '''Checks if a binary of a given name is an apk.
@@ -175,7 +201,7 @@ class UtilBundle(object):
         Raises:
             TestSuiteException: The apk could not be installed.
         '''
-        self._log.info('pushing {0}'.format(app))
+        self._log.info('pushing %s', app)
 
         self._android.stop_app(package)
 
@@ -185,13 +211,7 @@ class UtilBundle(object):
 
         flags = ''
 
-        product_folder = self._aosp_product_path
-        if not product_folder:
-            raise TestSuiteException(self._missing_path_msg)
-
-        app_folder = os.path.join(product_folder, 'data/app')
-
-        cmd = 'install {0} {1}/{2}/{2}.apk'.format(flags, app_folder, app)
+        cmd = 'install {0} {1}'.format(flags, self._artifact_path(app))
         output = self._android.adb(cmd, False, True,
                                    util_constants.PUSH_TIMEOUT)
         if ('Success' not in output) or ("can't find" in output):
@@ -216,18 +236,12 @@ class UtilBundle(object):
             TestSuiteException: A binary could not be pushed to the device or
                                 a previous process could not be killed.
         '''
-        product_folder = self._aosp_product_path
-        if not product_folder:
-            raise TestSuiteException(self._missing_path_msg)
-
-        bin_folder = os.path.join(product_folder, 'system/bin')
-
         for app in self._tests_ndk:
-            self._log.info('pushing {0}'.format(app))
+            self._log.info('pushing %s', app)
 
             self._android.kill_all_processes(app)
 
-            cmd = 'push %s/%s /data' % (bin_folder, app)
+            cmd = 'push %s /data' % self._artifact_path(app)
             output = self._android.adb(cmd, False, True,
                                        util_constants.PUSH_TIMEOUT)
             if ('failed to copy' in output or
@@ -245,18 +259,16 @@ class UtilBundle(object):
         Raises:
             TestSuiteException: An apk could not be installed.
         '''
-        product_folder = self._aosp_product_path
-        if not product_folder:
+        if not self._aosp_product_path:
             raise TestSuiteException(self._missing_path_msg)
 
-        app_folder = os.path.join(product_folder, 'system/lib')
-
         # Ensure the system/lib directory is writable
         self._android.make_device_writeable()
 
         for app, package in self._tests_jni.items():
             self._install_apk(app, package)
 
+    @traced('bundle')
     def delete_ndk_cache(self):
         '''Deletes NDK cached scripts from the device.
 
@@ -265,7 +277,28 @@ class UtilBundle(object):
 
         For all out tests this is set to '/data/rscache'.
         '''
-        self._android.shell('rm -r /data/rscache')
+        self._android.shell('rm -r ' + self._ndk_cache_dir)
+
+    def delete_script_cache(self, app_name):
+        '''Deletes the compiled scripts cached for a given app.
+
+        NDK binaries share the cache folder given to `rs->init()`, while
+        Java and JNI apps keep their compiled scripts in the cache folder of
+        their own package. Deleting it forces the next launch of the app to
+        compile its scripts from scratch.
+
+        Args:
+            app_name: The string that is the name of the APK or NDK executable.
+
+        Raises:
+            TestSuiteException: The app name is not in the list of apks or ndk
+                                binaries.
+        '''
+        if app_name in self._tests_ndk:
+            cache_dir = self._ndk_cache_dir
+        else:
+            cache_dir = self._apk_cache_dir.format(self.get_package(app_name))
+        self._android.shell('rm -r ' + cache_dir)
 
     def get_package(self, app_name):
         '''From a given apk name get the name of its package.
@@ -284,11 +317,12 @@ class UtilBundle(object):
         elif app_name in self._tests_jni:
             return self._tests_jni[app_name]
         else:
-            msg = ('unknown app %s. (Do you need to add an '
-                  'entry to bundle.py :: test_apps_?)' % app_name)
+            msg = ('unknown app %s. (Does it have an Android.mk and an '
+                   'AndroidManifest.xml under tests/lldb/{java,jni}?)'
+                   % app_name)
             raise TestSuiteException(msg)
-        return self._tests_apk[app_name]
 
+    @traced('bundle', 'bundle.launch')
     def launch(self, app_name):
         '''Launch an apk/ndk app on a remote device.
 
@@ -309,7 +343,8 @@ class UtilBundle(object):
 
             self._android.kill_all_processes(process_name)
 
-            success = self._android.launch_app(process_name, 'MainActivity')
+            success = self._android.launch_app(
+                process_name, self._registry.get(app_name)['activity'])
         elif app_name in self._tests_ndk:
             process_name = app_name
             self._android.kill_all_processes(process_name)
@@ -319,7 +354,8 @@ class UtilBundle(object):
 
             self._android.kill_process(package)
 
-            success = self._android.launch_app(package, 'MainActivity')
+            success = self._android.launch_app(
+                package, self._registry.get(app_name)['activity'])
             if not success:
                 self._log.log_and_print(app_name +
                     ' is not installed. Try removing the --no-install option?')
@@ -18,6 +18,7 @@ methods.'''
 from __future__ import absolute_import
 
 from . import util_constants
+from .util_trace import traced
 
 try:
     import lldb
@@ -31,6 +32,7 @@ class UtilLLDB(object):
     '''Provides utility methods to interface with lldb's python bindings.'''
 
     @staticmethod
+    @traced('lldb', 'UtilLLDB.start')
     def start():
         '''Initialise the lldb debugger framework.'''
         lldb.SBDebugger_Initialize()
@@ -46,9 +48,15 @@ class UtilLLDB(object):
         lldb.SBDebugger_Terminate()
 
     @staticmethod
-    def create_debugger():
+    def create_debugger(async_mode=False):
         '''Create an lldb debugger instance.
 
+        Args:
+            async_mode: Boolean, whether the commands return as soon as the
+                        process is resumed instead of waiting for it to stop.
+                        Tests can switch to asynchronous mode only while they
+                        wait for stop events, see TestBase.continue_until.
+
         Returns:
             The SBDebugger instance that was created.
 
@@ -57,7 +65,7 @@ class UtilLLDB(object):
         '''
         assert lldb
         inst = lldb.SBDebugger_Create()
-        inst.SetAsync(False)
+        inst.SetAsync(async_mode)
         return inst
 
     @staticmethod
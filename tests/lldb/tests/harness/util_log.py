@@ -19,19 +19,261 @@ from __future__ import absolute_import
 It provides the function to initialise the logging facility and retrieve an
 instance of the logger class. It also contains the definition of the internal
 logger class.
+
+Emitting a record only puts it on a queue: a single listener thread per
+process formats and writes the records, so that logging does not slow down the
+thread emitting them. The test runners do not write to the log file: their
+listener ships the records as JSON lines, with the test, bundle type and phase
+they were emitted in, through a socket to the driver, which writes the records
+of all the processes to the log file from its own listener.
 '''
 from __future__ import print_function
 
-import io
-import sys
+import atexit
+import json
 import logging
+import socket
+import sys
+import threading
+import time
+import uuid
+
+from .util_log_index import IndexedFileHandler
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
 
 INITIALISED = False
 NAMESPACE = 'RS_LLDB_TESTSUITE'
 
+# Format of the records in the log file
+_FORMAT = '%(asctime)s [%(identifier)s] [%(levelname)s] %(message)s'
+
+# Attributes shipped with each record from a test runner to the driver
+_RECORD_FIELDS = ('created', 'msecs', 'levelno', 'levelname', 'identifier',
+                  'test', 'bundle_type', 'method', 'phase', 'exc_text')
+
+# Attributes added to each record from the context it was emitted in
+_CONTEXT = {
+    'identifier': None,
+    'test': None,
+    'bundle_type': None,
+    'method': None,
+    'phase': None,
+}
+
+# Seconds to wait for the records still queued when the logging shuts down
+_SHUTDOWN_TIMEOUT = 5
+
+# The listener of this process and the server of the driver
+_LISTENER = None
+_SERVER = None
+
+
+class QueueHandler(logging.Handler):
+    '''Handler putting the records on a queue, for a listener to handle them.
+
+    The message of a record is only formatted by the listener. Its exception,
+    if any, is formatted straight away, as the traceback may not outlive the
+    handling of the exception.
+    '''
+
+    def __init__(self, record_queue):
+        logging.Handler.__init__(self)
+        self.queue = record_queue
+        self._exc_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        '''Add the context of the process to a record.'''
+        for name, value in _CONTEXT.items():
+            if getattr(record, name, None) is None:
+                setattr(record, name, value)
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(
+                record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+
+class QueueListener(object):
+    '''Thread handling the records of a queue with a handler.'''
+
+    _SENTINEL = None
+
+    def __init__(self, record_queue, handler):
+        self.queue = record_queue
+        self.handler = handler
+        self._thread = None
+
+    def start(self):
+        '''Start handling the records in a daemon thread.'''
+        self._thread = threading.Thread(target=self._monitor,
+                                        name='log-listener')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _monitor(self):
+        while True:
+            record = self.queue.get()
+            if record is self._SENTINEL:
+                break
+            self.handler.handle(record)
+
+    def stop(self, timeout=_SHUTDOWN_TIMEOUT):
+        '''Handle the records still queued and stop the thread.
+
+        Args:
+            timeout: Float, the number of seconds to wait for the records
+                     still queued to be handled.
+        '''
+        if self._thread is None:
+            return
+        self.queue.put(self._SENTINEL)
+        self._thread.join(timeout)
+        self._thread = None
+        self.handler.flush()
+
+
+class JsonLinesHandler(logging.Handler):
+    '''Handler writing the records as JSON lines to a stream.'''
+
+    def __init__(self, stream):
+        logging.Handler.__init__(self)
+        self.stream = stream
+
+    def emit(self, record):
+        try:
+            fields = dict((name, getattr(record, name, None))
+                          for name in _RECORD_FIELDS)
+            fields['message'] = record.getMessage()
+            self.stream.write(json.dumps(fields) + '\n')
+            self.stream.flush()
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            logging.Handler.close(self)
+
+
+class LogServer(object):
+    '''Receiver, in the driver, of the records of the test runners.
+
+    Each test runner connects to the server and sends its records as JSON
+    lines, after a first line naming its session. The records are put on the
+    queue of the driver, in the order they were emitted.
+    '''
+
+    def __init__(self, record_queue):
+        self._queue = record_queue
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(8)
+        self._closed_sessions = set()
+        self._cond = threading.Condition()
+
+        thread = threading.Thread(target=self._accept, name='log-server')
+        thread.daemon = True
+        thread.start()
+
+    @property
+    def address(self):
+        '''The address test runners connect to, as "host:port".'''
+        return '%s:%d' % self._socket.getsockname()
+
+    @staticmethod
+    def new_session():
+        '''Get a token identifying the records of one test runner.'''
+        return uuid.uuid4().hex
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._socket.accept()
+            except socket.error:
+                return
+            thread = threading.Thread(target=self._receive, args=(conn,),
+                                      name='log-receiver')
+            thread.daemon = True
+            thread.start()
+
+    def _receive(self, conn):
+        '''Queue the records sent through a connection until it is closed.'''
+        session = None
+        stream = conn.makefile('r')
+        try:
+            for line in stream:
+                fields = json.loads(line)
+                if session is None:
+                    session = fields.get('session')
+                    continue
+                fields['msg'] = fields.pop('message')
+                fields['name'] = NAMESPACE
+                self._queue.put(logging.makeLogRecord(fields))
+        except (socket.error, ValueError):
+            pass
+        finally:
+            stream.close()
+            conn.close()
+            with self._cond:
+                self._closed_sessions.add(session)
+                self._cond.notify_all()
+
+    def wait_session(self, session, timeout=_SHUTDOWN_TIMEOUT):
+        '''Wait until all the records of a test runner have been queued.
+
+        Args:
+            session: String, the token the test runner was given.
+            timeout: Float, the maximum number of seconds to wait, e.g. if the
+                     test runner died before connecting.
+        '''
+        deadline = time.time() + timeout
+        with self._cond:
+            while session not in self._closed_sessions:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._closed_sessions.discard(session)
+
+    def close(self):
+        '''Stop accepting connections.'''
+        self._socket.close()
+
+
+def _connect(address, session):
+    '''Connect to the log server of the driver.
+
+    Args:
+        address: String, the address of the server as "host:port".
+        session: String, the token identifying this test runner.
+
+    Returns:
+        A stream writing to the server.
+    '''
+    host, port = address.rsplit(':', 1)
+    conn = socket.create_connection((host, int(port)))
+    stream = conn.makefile('w')
+    conn.close()  # the stream keeps the connection open
+    stream.write(json.dumps({'session': session}) + '\n')
+    return stream
+
+
 def initialise(identifier, level=logging.INFO, print_to_stdout=False,
-               file_path=None, file_mode='a'):
+               file_path=None, file_mode='a', server_address=None,
+               session=None, test=None, bundle_type=None, indexed=False):
     '''Initialise the logging facility for the test suite.
 
     This function should be invoked only once, at the start of the program, and
@@ -50,6 +292,16 @@ def initialise(identifier, level=logging.INFO, print_to_stdout=False,
         file_mode: String, the mode to open the text file. Valid modes are
                    those recognised by the standard Python `open' function.
                    This option is only meaningful when print_to_stdout = False.
+        server_address: String, the "host:port" address of the log server of
+                        the driver. If given, the records are sent to it
+                        instead of being written by this process.
+        session: String, the token the driver gave this process, required
+                 with server_address.
+        test: String, the name of the test file the records are about.
+        bundle_type: String, the type of the target (java|jni|cpp) the
+                     records are about.
+        indexed: Boolean, whether to write the index of the text file next
+                 to it, see util_log_index.
 
     Raises:
         RuntimeError: If the logging has already been initialised
@@ -57,7 +309,7 @@ def initialise(identifier, level=logging.INFO, print_to_stdout=False,
                     print_to_stdout=False
     '''
     # pylint: disable=global-statement
-    global INITIALISED
+    global INITIALISED, _LISTENER
     if INITIALISED:
         raise RuntimeError('Already initialised')
 
@@ -75,35 +327,94 @@ def initialise(identifier, level=logging.INFO, print_to_stdout=False,
     # restore the previous class
     logging.setLoggerClass(old_logger_class)
 
-    # handler
-    if print_to_stdout:
+    # handler, run by the listener
+    if server_address:
+        handler_default = JsonLinesHandler(_connect(server_address, session))
+    elif print_to_stdout:
         handler_default = logging.StreamHandler(sys.stdout)
     else:
         if file_path is None:
             raise ValueError('Missing mandatory argument "file_path"')
 
-        handler_default = logging.FileHandler(file_path, file_mode)
+        if indexed:
+            handler_default = IndexedFileHandler(file_path, file_mode)
+        else:
+            handler_default = logging.FileHandler(file_path, file_mode)
 
     # Do not filter records in the handler because of the level
     handler_default.setLevel(logging.NOTSET)
 
     # format the message
-    handler_default.setFormatter(
-        logging.Formatter(
-            '%(asctime)s [{0}] [%(levelname)s] %(message)s'
-                .format(identifier)
-    ))
+    handler_default.setFormatter(logging.Formatter(_FORMAT))
 
-    log.addHandler(handler_default)
+    _CONTEXT.update(identifier=identifier, test=test, bundle_type=bundle_type)
+
+    record_queue = queue.Queue()
+    _LISTENER = QueueListener(record_queue, handler_default)
+    _LISTENER.start()
+    log.addHandler(QueueHandler(record_queue))
+    atexit.register(shutdown)
 
     INITIALISED = True
 
 
+def set_phase(phase):
+    '''Set the phase of the test run the next records are emitted in.
+
+    Args:
+        phase: String, e.g. "pre_run", "run" or "post_run".
+    '''
+    _CONTEXT['phase'] = phase
+
+
+def set_method(method):
+    '''Set the test method the next records are emitted by.
+
+    Args:
+        method: String, the name of the test method, None outside of them.
+    '''
+    _CONTEXT['method'] = method
+
+
+def start_server():
+    '''Start receiving the records of the test runners, in the driver.
+
+    Returns:
+        The LogServer.
+
+    Raises:
+        RuntimeError: If the logging facility has not been initialised.
+    '''
+    # pylint: disable=global-statement
+    global _SERVER
+    if not INITIALISED:
+        raise RuntimeError('Logging facility not initialised')
+    if _SERVER is None:
+        _SERVER = LogServer(_LISTENER.queue)
+    return _SERVER
+
+
+def shutdown():
+    '''Write the records still queued and stop the listener.
+
+    It is called at exit, and should be called before a hard exit.
+    '''
+    # pylint: disable=global-statement
+    global _LISTENER, _SERVER
+    if _SERVER is not None:
+        _SERVER.close()
+        _SERVER = None
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER.handler.close()
+        _LISTENER = None
+
+
 class RsLogger(logging.getLoggerClass()):
     '''Internal logging class.
 
-    This is an internal class to enhance the logging facility with the methods
-    "log_and_print" and "seek_to_end".
+    This is an internal class to enhance the logging facility with the method
+    "log_and_print".
     '''
     # pylint: disable=too-many-public-methods
 
@@ -117,13 +428,6 @@ class RsLogger(logging.getLoggerClass()):
         print(msg)
         self.log(level, msg)
 
-    def seek_to_end(self):
-        '''Reset the cursor position to the end for all handlers that are
-        Text File managers.'''
-        for hndlr in self.handlers:
-            if isinstance(hndlr, logging.FileHandler):
-                hndlr.stream.seek(0, io.SEEK_END)
-
 
 def get_logger():
     '''Retrieves the Logger instance related to the testsuite.
@@ -0,0 +1,241 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Index of the log file, to read the records of a test without scanning it.
+
+While the driver writes the log, it writes next to it a sidecar index: for
+each run of consecutive records of the same test, bundle type, test method
+and phase, the range of bytes they span in the log. An index entry is a JSON
+line such as
+    {"test": "test_breakpoint_fileline.py", "bundle_type": "java",
+     "method": "test_breakpoint", "phase": "run", "start": 1024, "end": 2048}
+
+When a new run starts, the log of the previous run is archived: each range
+of its index is compressed into a gzip member of its own, so that the archive
+is still a valid gzip file and any range can be decompressed on its own, from
+the offsets the index of the archive keeps.
+'''
+
+from __future__ import absolute_import
+
+import glob
+import gzip
+import io
+import json
+import logging
+import os
+import time
+import zlib
+
+# Fields of the records the log is indexed by
+INDEX_KEYS = ('test', 'bundle_type', 'method', 'phase')
+
+# Extension of the sidecar index of a log
+_INDEX_EXT = '.idx'
+
+# Number of archived runs kept next to the log
+MAX_ARCHIVES = 5
+
+
+def index_path(log_path):
+    '''Get the path to the sidecar index of a log file or archive.'''
+    return log_path + _INDEX_EXT
+
+
+class IndexedFileHandler(logging.FileHandler):
+    '''Handler writing records to a log file and indexing them.
+
+    It must only be used from a single thread, e.g. the log listener.
+    '''
+
+    def __init__(self, filename, mode='a'):
+        logging.FileHandler.__init__(self, filename, mode)
+        self.stream.seek(0, io.SEEK_END)
+        self._index = open(index_path(filename), mode)
+        self._key = None
+        self._start = self.stream.tell()
+
+    def _close_range(self, end):
+        '''Write the index entry of the current range, if it is not empty.'''
+        if self._key is None or end <= self._start:
+            return
+        entry = dict(zip(INDEX_KEYS, self._key))
+        entry.update(start=self._start, end=end)
+        self._index.write(json.dumps(entry, sort_keys=True) + '\n')
+
+    def emit(self, record):
+        key = tuple(getattr(record, name, None) for name in INDEX_KEYS)
+        if key != self._key and self.stream is not None:
+            offset = self.stream.tell()
+            self._close_range(offset)
+            self._key = key
+            self._start = offset
+        logging.FileHandler.emit(self, record)
+
+    def flush(self):
+        logging.FileHandler.flush(self)
+        if not self._index.closed:
+            self._index.flush()
+
+    def close(self):
+        self.acquire()
+        try:
+            if self.stream is not None and not self._index.closed:
+                self.stream.flush()
+                self._close_range(self.stream.tell())
+                self._key = None
+            self._index.close()
+        finally:
+            self.release()
+        logging.FileHandler.close(self)
+
+
+def read_index(log_path):
+    '''Read the index of a log file or archive.
+
+    Args:
+        log_path: String, the path to the log file or archive.
+
+    Returns:
+        A list of index entries, dictionaries, in the order of the log.
+    '''
+    try:
+        with open(index_path(log_path)) as index_file:
+            return [json.loads(line) for line in index_file if line.strip()]
+    except IOError:
+        return []
+
+
+def _matches(entry, filters):
+    return all(value is None or entry.get(name) == value
+               for name, value in filters.items())
+
+
+def query(log_path, **filters):
+    '''Read the records of a log matching the given test, method, etc.
+
+    Args:
+        log_path: String, the path to the log file or archive (.gz).
+        filters: Values of the fields of INDEX_KEYS to select, a field whose
+                 value is None or that is not given matching any value.
+
+    Returns:
+        A generator of the text of the matching ranges of the log, in order.
+
+    Raises:
+        ValueError: A filter is not one of INDEX_KEYS.
+    '''
+    unknown = set(filters) - set(INDEX_KEYS)
+    if unknown:
+        raise ValueError('Unknown fields: %s' % ', '.join(sorted(unknown)))
+    compressed = log_path.endswith('.gz')
+    entries = [entry for entry in read_index(log_path)
+               if _matches(entry, filters)]
+    with open(log_path, 'rb') as log_file:
+        for entry in entries:
+            log_file.seek(entry['start'])
+            data = log_file.read(entry['end'] - entry['start'])
+            if compressed:
+                data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+            yield data.decode('utf-8', 'replace')
+
+
+def summarise(log_path):
+    '''Get how many bytes of log each test, method and phase has.
+
+    Args:
+        log_path: String, the path to the log file or archive.
+
+    Returns:
+        A list of (key, size) tuples, key being the tuple of the values of
+        INDEX_KEYS, in the order the keys first appear in the log. The size is
+        that of the compressed ranges for an archive.
+    '''
+    sizes = {}
+    order = []
+    for entry in read_index(log_path):
+        key = tuple(entry.get(name) for name in INDEX_KEYS)
+        if key not in sizes:
+            sizes[key] = 0
+            order.append(key)
+        sizes[key] += entry['end'] - entry['start']
+    return [(key, sizes[key]) for key in order]
+
+
+def _compress_member(data):
+    '''Compress bytes into a gzip member.'''
+    stream = io.BytesIO()
+    with gzip.GzipFile(fileobj=stream, mode='wb') as member:
+        member.write(data)
+    return stream.getvalue()
+
+
+def archive_log(log_path, max_archives=MAX_ARCHIVES):
+    '''Compress the log of the previous run, keeping its index usable.
+
+    The log and its index are replaced by an archive named after the time the
+    log was last written, e.g. LLDBTestsuiteLog.20161010-101010.txt.gz, and
+    its index. Only the max_archives most recent archives are kept.
+
+    Args:
+        log_path: String, the path to the log file.
+        max_archives: Integer, the number of archives to keep, at least 1.
+
+    Returns:
+        The path to the archive, None if there was no log to archive.
+    '''
+    if not os.path.isfile(log_path):
+        return None
+
+    root, ext = os.path.splitext(log_path)
+    stamp = time.strftime('%Y%m%d-%H%M%S',
+                          time.localtime(os.path.getmtime(log_path)))
+    archive_path = '{0}.{1}{2}.gz'.format(root, stamp, ext)
+
+    size = os.path.getsize(log_path)
+    entries = [entry for entry in read_index(log_path)
+               if entry['end'] <= size]
+    # the bytes no entry covers, e.g. those of an older log, keep no key
+    ranges = []
+    offset = 0
+    for entry in entries:
+        if entry['start'] > offset:
+            ranges.append(({}, offset, entry['start']))
+        ranges.append((entry, entry['start'], entry['end']))
+        offset = entry['end']
+    if offset < size:
+        ranges.append(({}, offset, size))
+
+    with open(log_path, 'rb') as log_file, \
+            open(archive_path, 'wb') as archive, \
+            open(index_path(archive_path), 'w') as archive_index:
+        for entry, start, end in ranges:
+            log_file.seek(start)
+            member = _compress_member(log_file.read(end - start))
+            archived = dict((name, entry.get(name)) for name in INDEX_KEYS)
+            archived.update(start=archive.tell(),
+                            end=archive.tell() + len(member))
+            archive.write(member)
+            archive_index.write(json.dumps(archived, sort_keys=True) + '\n')
+
+    os.remove(log_path)
+    if os.path.exists(index_path(log_path)):
+        os.remove(index_path(log_path))
+
+    archives = sorted(glob.glob('{0}.*{1}.gz'.format(root, ext)))
+    for old in archives[:-max_archives]:
+        os.remove(old)
+        if os.path.exists(index_path(old)):
+            os.remove(index_path(old))
+    return archive_path
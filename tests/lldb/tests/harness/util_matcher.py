@@ -0,0 +1,199 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Module that contains the class Matcher, to verify lldb command output.
+
+The expected strings and regular expressions of a command are checked against
+its output in as few scans as possible: each group of literals and each group
+of regular expressions is combined into a single compiled alternation, which
+is run once over the output. Whatever the combined scan did not find, e.g.
+because two expected matches overlap, is then looked up on its own, so the
+result is the same as searching for each of them separately.
+'''
+
+from __future__ import absolute_import
+
+import collections
+import re
+import time
+
+# Regular expressions that can not be embedded in an alternation, because
+# they refer to their own groups or set global flags.
+_RE_NOT_COMBINABLE = re.compile(r'\\[1-9]|\(\?P=|\(\?[aiLmsux]+\)')
+
+# Python 2 supports at most 100 groups per regular expression
+_MAX_ALTERNATIVES = 90
+
+# Below this number of literals, one `in` test per literal is faster than a
+# combined scan.
+_MIN_COMBINED_LITERALS = 8
+
+
+class PatternCache(object):
+    '''Least recently used cache of compiled regular expressions.'''
+
+    def __init__(self, max_size=1024):
+        '''Initialise the cache.
+
+        Args:
+            max_size: Integer, number of compiled patterns to keep.
+        '''
+        self._max_size = max_size
+        self._patterns = collections.OrderedDict()
+
+    def compile(self, pattern):
+        '''Get the compiled form of a regular expression.
+
+        Args:
+            pattern: String, the regular expression.
+
+        Returns:
+            The compiled regular expression object.
+        '''
+        try:
+            compiled = self._patterns.pop(pattern)
+        except KeyError:
+            compiled = re.compile(pattern)
+            if len(self._patterns) >= self._max_size:
+                self._patterns.popitem(last=False)
+        self._patterns[pattern] = compiled
+        return compiled
+
+    def __len__(self):
+        return len(self._patterns)
+
+
+# Shared by all the matchers of a process
+_PATTERN_CACHE = PatternCache()
+
+
+def compile_pattern(pattern):
+    '''Compile a regular expression through the shared pattern cache.
+
+    Args:
+        pattern: String, the regular expression.
+
+    Returns:
+        The compiled regular expression object.
+    '''
+    return _PATTERN_CACHE.compile(pattern)
+
+
+class Matcher(object):
+    '''Matches expected literals and regular expressions against a text.
+
+    The time spent matching is accumulated in the attribute `elapsed`.
+    '''
+
+    def __init__(self, cache=None):
+        '''Initialise the matcher.
+
+        Args:
+            cache: PatternCache to use, by default the one shared by all the
+                   matchers.
+        '''
+        self._cache = cache or _PATTERN_CACHE
+        self.elapsed = 0.0
+
+    def _combined(self, alternatives):
+        '''Compile the alternation of the given regular expressions.
+
+        Each alternative is wrapped in a group named after its index.
+
+        Args:
+            alternatives: Sequence of (index, regular expression) tuples.
+
+        Returns:
+            The compiled alternation, or None if it can not be compiled.
+        '''
+        combined = '|'.join('(?P<_m%d>%s)' % (index, regex)
+                            for index, regex in alternatives)
+        try:
+            return self._cache.compile(combined)
+        except (re.error, AssertionError, OverflowError):
+            # e.g. too many named groups
+            return None
+
+    def _scan(self, text, alternatives):
+        '''Run the alternation of the given regular expressions over a text.
+
+        Args:
+            text: String, the text to scan.
+            alternatives: Sequence of (index, regular expression) tuples.
+
+        Returns:
+            A dictionary from index to the text matched by that alternative.
+        '''
+        found = {}
+        if len(alternatives) < 2:
+            return found
+        for first in range(0, len(alternatives), _MAX_ALTERNATIVES):
+            combined = self._combined(
+                alternatives[first:first + _MAX_ALTERNATIVES])
+            if combined is None:
+                continue
+            for match in combined.finditer(text):
+                name = match.lastgroup
+                if name is not None and name.startswith('_m'):
+                    found.setdefault(int(name[2:]), match.group(name))
+        return found
+
+    def missing_literals(self, text, literals):
+        '''Find which of the given strings are not in a text.
+
+        Args:
+            text: String, the text to search.
+            literals: Sequence of strings to find in the text.
+
+        Returns:
+            The list of the strings that were not found, in the given order.
+        '''
+        start = time.time()
+        literals = list(literals)
+        found = {}
+        if len(literals) >= _MIN_COMBINED_LITERALS:
+            found = self._scan(text, [(index, re.escape(literal))
+                                      for index, literal in enumerate(literals)
+                                      if literal])
+        missing = [literal for index, literal in enumerate(literals)
+                   if index not in found and literal not in text]
+        self.elapsed += time.time() - start
+        return missing
+
+    def search_all(self, text, patterns):
+        '''Search a text for each of the given regular expressions.
+
+        Args:
+            text: String, the text to search.
+            patterns: Sequence of strings, each being a regular expression.
+
+        Returns:
+            A list with, for each regular expression, the text it matched or
+            None if it did not match.
+        '''
+        start = time.time()
+        patterns = list(patterns)
+        found = self._scan(text, [(index, regex)
+                                  for index, regex in enumerate(patterns)
+                                  if regex
+                                  and not _RE_NOT_COMBINABLE.search(regex)])
+        results = []
+        for index, regex in enumerate(patterns):
+            if index in found:
+                results.append(found[index])
+                continue
+            match = self._cache.compile(regex).search(text)
+            results.append(match.group() if match else None)
+        self.elapsed += time.time() - start
+        return results
@@ -0,0 +1,214 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Module that contains the class Profile, which records where the time of a
+test goes, and the functions merging the profiles of all the tests.
+
+When the test suite is run with --profile, each test runner records the time
+spent in every lldb command, grouped by command verb, and in every test
+method, and writes it to a JSON file next to the cProfile statistics of the
+whole test. The driver then merges the files of all the tests into a report.
+'''
+
+from __future__ import absolute_import
+
+import collections
+import glob
+import json
+import os
+import pstats
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+# Commands whose verb is made of their first two words, e.g. "process continue"
+_TWO_WORD_COMMANDS = frozenset([
+    'breakpoint', 'command', 'frame', 'log', 'memory', 'platform', 'process',
+    'register', 'settings', 'target', 'thread', 'type', 'watchpoint'
+])
+
+# Prefix of the commands whose verb is made of their first four words, e.g.
+# "language renderscript allocation dump"
+_RENDERSCRIPT_PREFIX = ['language', 'renderscript']
+
+# Keys the report of lldb commands can be sorted by
+SORT_KEYS = ('total', 'mean', 'max', 'count')
+
+
+def command_verb(cmd):
+    '''Get the verb of an lldb command, i.e. the command without arguments.
+
+    Args:
+        cmd: String, the lldb command.
+
+    Returns:
+        A string, e.g. "expr", "process continue" or
+        "language renderscript allocation dump".
+    '''
+    words = cmd.split()
+    if not words:
+        return ''
+    if words[:2] == _RENDERSCRIPT_PREFIX:
+        return ' '.join(word for word in words[:4] if not word.startswith('-'))
+    if words[0] in _TWO_WORD_COMMANDS and len(words) > 1 \
+            and words[1].isalpha():
+        return ' '.join(words[:2])
+    return words[0]
+
+
+class Profile(object):
+    '''Time spent by a test in each lldb command verb and test method.'''
+
+    def __init__(self):
+        self.commands = {}
+        self.tests = collections.OrderedDict()
+
+    def add_command(self, cmd, seconds):
+        '''Record the time spent running an lldb command.
+
+        Args:
+            cmd: String, the lldb command.
+            seconds: Float, the time it took.
+        '''
+        verb = command_verb(cmd)
+        stats = self.commands.setdefault(verb, {'count': 0, 'total': 0.0,
+                                                'max': 0.0})
+        stats['count'] += 1
+        stats['total'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+
+    def add_test(self, name, seconds, matching):
+        '''Record the time spent running a test method.
+
+        Args:
+            name: String, the name of the method.
+            seconds: Float, the time it took.
+            matching: Float, the part of it spent matching command output.
+        '''
+        self.tests[name] = {'seconds': seconds, 'matching': matching}
+
+    def save(self, path, test_name, bundle_type):
+        '''Write the profile to a JSON file.
+
+        Args:
+            path: String, the path to the file.
+            test_name: String, the name of the test file.
+            bundle_type: String, the type of the target (java|jni|cpp).
+        '''
+        with open(path, 'w') as file_desc:
+            json.dump({'test': test_name,
+                       'bundle_type': bundle_type,
+                       'commands': self.commands,
+                       'tests': self.tests}, file_desc, indent=2)
+
+
+def profile_paths(profile_dir, test_name, bundle_type, session=None):
+    '''Get the paths to the files profiling a test.
+
+    Args:
+        profile_dir: String, the folder holding the profiles.
+        test_name: String, the name of the test file.
+        bundle_type: String, the type of the target (java|jni|cpp).
+        session: String token of the test runner, which tells apart the
+                 profiles of the sessions a test is split into, or None.
+
+    Returns:
+        A tuple with the path to the JSON profile and to the pstats file.
+    '''
+    base = os.path.join(profile_dir, '{0}-{1}'.format(
+        os.path.splitext(test_name)[0], bundle_type))
+    if session:
+        base += '-' + session
+    return base + '.json', base + '.pstats'
+
+
+def _format_commands(commands, sort_key):
+    '''Format the table of the time spent in each lldb command verb.'''
+    rows = []
+    for verb, stats in commands.items():
+        rows.append((verb, stats['count'], stats['total'],
+                     stats['total'] / stats['count'], stats['max']))
+    index = {'count': 1, 'total': 2, 'mean': 3, 'max': 4}[sort_key]
+    rows.sort(key=lambda row: row[index], reverse=True)
+
+    lines = ['{0:<48} {1:>7} {2:>10} {3:>9} {4:>9}'.format(
+        'lldb command', 'count', 'total (s)', 'mean (s)', 'max (s)')]
+    for row in rows:
+        lines.append('{0:<48} {1:>7} {2:>10.3f} {3:>9.3f} {4:>9.3f}'
+                     .format(*row))
+    return lines
+
+
+def _format_tests(tests):
+    '''Format the table of the time spent in each test method.'''
+    rows = sorted(tests, key=lambda row: row[1], reverse=True)
+    lines = ['{0:<64} {1:>10} {2:>13}'.format(
+        'test method', 'total (s)', 'matching (s)')]
+    for name, seconds, matching in rows:
+        lines.append('{0:<64} {1:>10.3f} {2:>13.3f}'.format(
+            name, seconds, matching))
+    return lines
+
+
+def merge_profiles(profile_dir, sort_key='total', top_functions=30):
+    '''Merge the profiles of all the tests into a report.
+
+    The cProfile statistics of all the tests are also merged into the file
+    all.pstats of the profile folder, which can be explored with the pstats
+    module.
+
+    Args:
+        profile_dir: String, the folder holding the profiles.
+        sort_key: String, one of SORT_KEYS, how to sort the lldb commands.
+        top_functions: Integer, the number of Python functions to list.
+
+    Returns:
+        The report, as a list of lines.
+    '''
+    commands = {}
+    tests = []
+    for path in sorted(glob.glob(os.path.join(profile_dir, '*.json'))):
+        with open(path) as file_desc:
+            profile = json.load(file_desc)
+        for verb, stats in profile['commands'].items():
+            merged = commands.setdefault(verb, {'count': 0, 'total': 0.0,
+                                                'max': 0.0})
+            merged['count'] += stats['count']
+            merged['total'] += stats['total']
+            merged['max'] = max(merged['max'], stats['max'])
+        for method, timing in profile['tests'].items():
+            tests.append(('{0}:{1} ({2})'.format(profile['test'], method,
+                                                 profile['bundle_type']),
+                          timing['seconds'], timing['matching']))
+
+    report = _format_commands(commands, sort_key)
+    report.append('')
+    report.extend(_format_tests(tests))
+
+    stats_paths = [path for path in sorted(
+        glob.glob(os.path.join(profile_dir, '*.pstats')))
+                   if os.path.basename(path) != 'all.pstats']
+    if stats_paths:
+        stream = StringIO()
+        stats = pstats.Stats(stats_paths[0], stream=stream)
+        for path in stats_paths[1:]:
+            stats.add(path)
+        stats.dump_stats(os.path.join(profile_dir, 'all.pstats'))
+        stats.sort_stats('cumulative').print_stats(top_functions)
+        report.append('')
+        report.extend(stream.getvalue().splitlines())
+
+    return report
@@ -0,0 +1,287 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Module that contains the class BundleRegistry, an index of the test apps.
+
+The test apps are discovered from the makefiles and manifests found under the
+java, jni and cpp folders of the test suite. The index records, for each app,
+its type, its package and activity (for apks) and the path, size and hash of
+the artifact built in the product out folder. It is cached on disk so that the
+artifacts are only hashed again when they are rebuilt.
+'''
+
+from __future__ import absolute_import
+
+import hashlib
+import json
+import os
+import re
+
+from .exception import TestSuiteException
+
+# Folders of the test suite holding the sources of each type of app
+APP_TYPES = ('java', 'jni', 'cpp')
+
+# Path to the folder containing the java, jni and cpp folders
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                          '..', '..')
+
+# Bump whenever the layout of the index changes
+_INDEX_VERSION = 1
+
+_RE_PACKAGE_NAME = re.compile(r'^\s*LOCAL_PACKAGE_NAME\s*:=\s*(\S+)', re.M)
+_RE_MODULE = re.compile(r'^\s*LOCAL_MODULE\s*:=\s*(\S+)', re.M)
+_RE_BUILD_EXECUTABLE = re.compile(r'^\s*include\s+\$\(BUILD_EXECUTABLE\)',
+                                  re.M)
+_RE_MANIFEST_PACKAGE = re.compile(r'<manifest[^>]*\spackage="([^"]+)"')
+_RE_MANIFEST_ACTIVITY = re.compile(r'<activity[^>]*\sandroid:name="([^"]+)"')
+
+
+def _read(path):
+    '''Return the content of a text file.'''
+    with open(path) as file_desc:
+        return file_desc.read()
+
+
+def _to_str(value):
+    '''Convert the unicode strings decoded from the json index to str.
+
+    The rest of the harness expects package and app names to be str.
+    '''
+    if isinstance(value, dict):
+        return dict((_to_str(key), _to_str(val)) for key, val in value.items())
+    if isinstance(value, list):
+        return [_to_str(item) for item in value]
+    if not isinstance(value, (str, bytes)) and hasattr(value, 'encode'):
+        return value.encode('utf-8')
+    return value
+
+
+def _hash_file(path):
+    '''Compute the SHA-1 digest of a file, reading it in chunks.
+
+    Args:
+        path: String, path to the file to hash.
+
+    Returns:
+        The hex digest of the file content.
+    '''
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file_desc:
+        for chunk in iter(lambda: file_desc.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _scan_apk(app_dir, app_type):
+    '''Describe the apk built from the given folder.
+
+    Args:
+        app_dir: String, path to the folder of the app.
+        app_type: String, the type of the app (java|jni).
+
+    Returns:
+        A dictionary describing the app, None if the folder does not build an
+        apk.
+    '''
+    makefile = os.path.join(app_dir, 'Android.mk')
+    manifest = os.path.join(app_dir, 'AndroidManifest.xml')
+    if not os.path.isfile(makefile) or not os.path.isfile(manifest):
+        return None
+
+    name = _RE_PACKAGE_NAME.search(_read(makefile))
+    manifest_text = _read(manifest)
+    package = _RE_MANIFEST_PACKAGE.search(manifest_text)
+    if not name or not package:
+        return None
+
+    activity = _RE_MANIFEST_ACTIVITY.search(manifest_text)
+    return {
+        'name': name.group(1),
+        'app_type': app_type,
+        'package': package.group(1),
+        'activity': activity.group(1).lstrip('.') if activity
+                    else 'MainActivity',
+        'artifact': 'data/app/{0}/{0}.apk'.format(name.group(1))
+    }
+
+
+def _scan_ndk(app_dir):
+    '''Describe the NDK executables built from the given folder.
+
+    A single makefile may build more than one executable, each of them being
+    the LOCAL_MODULE preceding an `include $(BUILD_EXECUTABLE)`.
+
+    Args:
+        app_dir: String, path to the folder of the app.
+
+    Returns:
+        A list of dictionaries, each describing an executable.
+    '''
+    makefile = os.path.join(app_dir, 'Android.mk')
+    if not os.path.isfile(makefile):
+        return []
+
+    text = _read(makefile)
+    apps = []
+    for build in _RE_BUILD_EXECUTABLE.finditer(text):
+        modules = _RE_MODULE.findall(text, 0, build.start())
+        if modules:
+            apps.append({
+                'name': modules[-1],
+                'app_type': 'cpp',
+                'package': None,
+                'activity': None,
+                'artifact': 'system/bin/' + modules[-1]
+            })
+    return apps
+
+
+def scan_sources(source_dir=SOURCE_DIR):
+    '''Discover the test apps from the makefiles of the test suite.
+
+    Args:
+        source_dir: String, path to the folder containing the java, jni and cpp
+                    folders.
+
+    Returns:
+        A dictionary mapping the name of each app to its description.
+    '''
+    apps = {}
+    for app_type in APP_TYPES:
+        type_dir = os.path.join(source_dir, app_type)
+        if not os.path.isdir(type_dir):
+            continue
+        for item in sorted(os.listdir(type_dir)):
+            app_dir = os.path.join(type_dir, item)
+            if not os.path.isdir(app_dir):
+                continue
+            if app_type == 'cpp':
+                found = _scan_ndk(app_dir)
+            else:
+                found = [_scan_apk(app_dir, app_type)]
+            for app in found:
+                if app:
+                    app['source'] = os.path.join(app_type, item)
+                    apps[app['name']] = app
+    return apps
+
+
+class BundleRegistry(object):
+    '''Index of the test apps, with the artifacts they are built into.'''
+
+    def __init__(self, index_path=None, source_dir=SOURCE_DIR):
+        '''Load the cached index, or discover the apps if there is none.
+
+        Args:
+            index_path: String, path to the file caching the index. If None,
+                        the index is not cached.
+            source_dir: String, path to the folder containing the java, jni
+                        and cpp folders.
+        '''
+        self._index_path = index_path
+        self._source_dir = source_dir
+        self._apps = self._load()
+        if not self._apps:
+            self._apps = scan_sources(source_dir)
+
+    def _load(self):
+        '''Read the apps from the cached index.
+
+        Returns:
+            A dictionary mapping the name of each app to its description. It is
+            empty if the index does not exist or has an obsolete layout.
+        '''
+        if not self._index_path or not os.path.isfile(self._index_path):
+            return {}
+        try:
+            index = json.loads(_read(self._index_path))
+        except ValueError:
+            return {}
+        if index.get('version') != _INDEX_VERSION:
+            return {}
+        return _to_str(index['apps'])
+
+    def save(self):
+        '''Write the index to its cache file, if any.'''
+        if not self._index_path:
+            return
+        with open(self._index_path, 'w') as file_desc:
+            json.dump({'version': _INDEX_VERSION, 'apps': self._apps},
+                      file_desc, indent=2, sort_keys=True)
+
+    def update(self, product_path):
+        '''Discover the apps again and record the state of their artifacts.
+
+        An artifact is only hashed again when its size or modification time
+        differ from those in the index.
+
+        Args:
+            product_path: String, the path to the "out" folder of the AOSP
+                          repository. If None, the artifacts are not inspected.
+        '''
+        apps = scan_sources(self._source_dir)
+        for name, app in apps.items():
+            cached = self._apps.get(name, {})
+            app['size'] = app['mtime'] = app['sha1'] = None
+            if not product_path:
+                continue
+            path = os.path.join(product_path, app['artifact'])
+            if not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            app['size'] = stat.st_size
+            app['mtime'] = stat.st_mtime
+            if (cached.get('artifact') == app['artifact']
+                    and cached.get('size') == app['size']
+                    and cached.get('mtime') == app['mtime']
+                    and cached.get('sha1')):
+                app['sha1'] = cached['sha1']
+            else:
+                app['sha1'] = _hash_file(path)
+        self._apps = apps
+        self.save()
+
+    def apps(self, app_type=None):
+        '''Get the apps of a given type.
+
+        Args:
+            app_type: String, the type of the apps (java|jni|cpp). If None,
+                      the apps of every type are returned.
+
+        Returns:
+            A dictionary mapping the name of each app to its description.
+        '''
+        return dict((name, app) for name, app in self._apps.items()
+                    if app_type is None or app['app_type'] == app_type)
+
+    def get(self, name):
+        '''Get the description of an app.
+
+        Args:
+            name: String, the name of the app.
+
+        Returns:
+            A dictionary with the keys name, app_type, package, activity,
+            source, artifact and, once updated, size, mtime and sha1.
+
+        Raises:
+            TestSuiteException: There is no app with this name.
+        '''
+        try:
+            return self._apps[name]
+        except KeyError:
+            raise TestSuiteException(
+                'unknown app %s. Is there an Android.mk for it under '
+                'tests/lldb/{java,jni,cpp}?' % name)
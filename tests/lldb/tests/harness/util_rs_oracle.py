@@ -0,0 +1,542 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Host side reference implementation of the RenderScript math builtins.
+
+The functions of rs_math.spec and rs_vector_math.spec are evaluated with NumPy
+on whole batches of inputs, in double precision, and the values computed on
+the device are checked against them within the precision of the function:
+- full precision functions, within the ULP bounds of the OpenCL 1.1 full
+  profile, which the RenderScript runtime follows under rs_fp_full;
+- half_ and fast_ functions, within the precision of a 16 bit float;
+- native_ functions, within the absolute tolerance their spec declares with
+  "test: limited(tolerance)", or else that of a 16 bit float.
+
+The inputs of a function are drawn in the ranges its spec declares with the
+argument options "range(min,max)" and "above(arg)".
+
+NumPy is optional: the suite runs without it, but the numeric checks are then
+skipped.
+'''
+
+from __future__ import absolute_import
+
+import collections
+import math
+import re
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .exception import TestSuiteException
+from .util_rs_spec import signatures
+
+# Spec files the reference implementation covers
+SPEC_FILES = ('rs_math', 'rs_vector_math')
+
+# Number of inputs each function is evaluated on by a sweep
+SWEEP_SIZE = 64
+
+# Bound of the error of the full precision functions, in ULP of the result.
+# The functions not listed are correctly rounded.
+_FULL_ULPS = {
+    'acos': 4, 'acosh': 4, 'acospi': 5, 'asin': 4, 'asinh': 4, 'asinpi': 5,
+    'atan': 5, 'atan2': 6, 'atan2pi': 6, 'atanh': 5, 'atanpi': 5, 'cbrt': 2,
+    'cos': 4, 'cosh': 4, 'cospi': 4, 'degrees': 2, 'distance': 4, 'divide': 3,
+    'dot': 4, 'erf': 16, 'erfc': 16, 'exp': 3, 'exp10': 3, 'exp2': 3,
+    'expm1': 3, 'hypot': 4, 'length': 4, 'lgamma': 16, 'log': 3, 'log10': 3,
+    'log1p': 2, 'log2': 3, 'mad': 4, 'mix': 4, 'normalize': 4, 'pow': 16,
+    'pown': 16, 'powr': 16, 'radians': 2, 'recip': 3, 'rootn': 16, 'rsqrt': 2,
+    'sin': 4, 'sinh': 4, 'sinpi': 4, 'sqrt': 3, 'tan': 5, 'tanh': 5,
+    'tanpi': 6, 'tgamma': 16,
+}
+
+# Bound of the error of the functions computed with 16 bit floats, in ULP of
+# a 32 bit float: a half has 13 bits of mantissa less than a float.
+_HALF_PRECISION_ULPS = 2 ** 13
+
+# Prefixes of the functions trading precision for speed
+_PRECISION_PREFIXES = ('native_', 'half_', 'fast_')
+
+_RE_LIMITED = re.compile(r'^limited\(([^)]+)\)$')
+_RE_RANGE = re.compile(r'^range\(([^,]+),([^)]+)\)$')
+_RE_ABOVE = re.compile(r'^above\((\w+)\)$')
+
+# Types of the results, by name of the C type
+_DTYPES = {'half': 'float16', 'float': 'float32', 'double': 'float64'}
+
+# Types of the arguments a sweep can pass as literals
+_LITERAL_TYPES = frozenset(['float', 'int'])
+
+# How precise the result of a function must be: at most ulps ULP of the
+# result, or at most absolute away from it if absolute is not None.
+Tolerance = collections.namedtuple('Tolerance', ['ulps', 'absolute'])
+
+# A value computed on the device which is not within the tolerance
+Mismatch = collections.namedtuple(
+    'Mismatch', ['index', 'args', 'expected', 'actual'])
+
+# Value lldb prints for each member of the result of a sweep with `expr -f x`
+_RE_SWEEP_MEMBER = re.compile(r'^\s*r(\d+) = (0x[0-9a-fA-F]+)', re.M)
+
+
+def have_numpy():
+    '''Check whether NumPy can be used to compute reference values.'''
+    return numpy is not None
+
+
+def _require_numpy():
+    '''Raise a TestSuiteException if NumPy is not installed.'''
+    if numpy is None:
+        raise TestSuiteException('NumPy is required to compute the reference '
+                                 'values of the RenderScript math builtins')
+
+
+def _vectorize(func):
+    '''Make an elementwise array function of a scalar function of math.
+
+    The values out of the domain of the function give NaN, its poles infinity.
+    '''
+    def scalar(*args):
+        try:
+            return func(*args)
+        except ValueError:
+            return float('nan')
+        except OverflowError:
+            return float('inf')
+    return lambda *args: numpy.frompyfunc(scalar, len(args), 1)(
+        *args).astype(numpy.float64)
+
+
+def _components(vec):
+    '''View a batch of scalars as a batch of vectors of one component.'''
+    return vec[:, numpy.newaxis] if vec.ndim == 1 else vec
+
+
+def _length(vec):
+    vec = _components(vec)
+    return numpy.sqrt(numpy.sum(vec * vec, axis=-1))
+
+
+def _normalize(vec):
+    components = _components(vec)
+    length = _length(components)[..., numpy.newaxis]
+    normalized = numpy.where(length == 0, components,
+                             components / numpy.where(length == 0, 1, length))
+    return normalized.reshape(vec.shape)
+
+
+def _dot(left, right):
+    return numpy.sum(_components(left) * _components(right), axis=-1)
+
+
+def _cross(left, right):
+    result = numpy.zeros_like(left)
+    result[..., :3] = numpy.cross(left[..., :3], right[..., :3])
+    return result
+
+
+def _rootn(value, n):
+    root = numpy.power(numpy.abs(value), 1.0 / numpy.where(n == 0, 1, n))
+    odd = numpy.mod(n, 2) == 1
+    root = numpy.where(value < 0, numpy.where(odd, -root, numpy.nan), root)
+    return numpy.where(n == 0, numpy.nan, root)
+
+
+def _round(value):
+    # C rounds halfway cases away from zero, NumPy to even
+    return numpy.copysign(numpy.floor(numpy.abs(value) + 0.5), value)
+
+
+def _remainder(num, den):
+    return num - den * numpy.rint(num / den)
+
+
+def _logb(value):
+    return numpy.floor(numpy.log2(numpy.abs(value)))
+
+
+def _pi_scaled(func):
+    return lambda *args: func(*args) / numpy.pi
+
+
+def _references():
+    '''Get the reference implementation of each function family.
+
+    The functions take and return float64 arrays, the vectors being arrays
+    whose last axis holds the components, the scalars arrays of one axis.
+    '''
+    pi = numpy.pi
+    return {
+        'acos': numpy.arccos,
+        'acosh': numpy.arccosh,
+        'acospi': _pi_scaled(numpy.arccos),
+        'asin': numpy.arcsin,
+        'asinh': numpy.arcsinh,
+        'asinpi': _pi_scaled(numpy.arcsin),
+        'atan': numpy.arctan,
+        'atan2': numpy.arctan2,
+        'atan2pi': _pi_scaled(numpy.arctan2),
+        'atanh': numpy.arctanh,
+        'atanpi': _pi_scaled(numpy.arctan),
+        'cbrt': numpy.cbrt,
+        'ceil': numpy.ceil,
+        'clamp': lambda value, low, high: numpy.minimum(
+            numpy.maximum(value, low), high),
+        'copysign': numpy.copysign,
+        'cos': numpy.cos,
+        'cosh': numpy.cosh,
+        'cospi': lambda v: numpy.cos(pi * v),
+        'degrees': numpy.degrees,
+        'divide': numpy.divide,
+        'erf': _vectorize(math.erf),
+        'erfc': _vectorize(math.erfc),
+        'exp': numpy.exp,
+        'exp10': lambda v: numpy.power(10.0, v),
+        'exp2': numpy.exp2,
+        'expm1': numpy.expm1,
+        'fabs': numpy.fabs,
+        'fdim': lambda a, b: numpy.where(a > b, a - b, numpy.where(
+            numpy.isnan(a - b), numpy.nan, 0.0)),
+        'floor': numpy.floor,
+        'fma': lambda a, b, c: a * b + c,
+        'fmax': numpy.fmax,
+        'fmin': numpy.fmin,
+        'fmod': numpy.fmod,
+        'hypot': numpy.hypot,
+        'ldexp': lambda mantissa, exponent: numpy.ldexp(
+            mantissa, exponent.astype(numpy.int32)),
+        'lgamma': _vectorize(math.lgamma),
+        'log': numpy.log,
+        'log10': numpy.log10,
+        'log1p': numpy.log1p,
+        'log2': numpy.log2,
+        'logb': _logb,
+        'mad': lambda a, b, c: a * b + c,
+        'max': numpy.fmax,
+        'min': numpy.fmin,
+        'mix': lambda start, stop, fraction: start + (stop - start) * fraction,
+        'pow': numpy.power,
+        'pown': numpy.power,
+        'powr': numpy.power,
+        'radians': numpy.radians,
+        'recip': numpy.reciprocal,
+        'remainder': _remainder,
+        'rint': numpy.rint,
+        'rootn': _rootn,
+        'round': _round,
+        'rsqrt': lambda v: 1.0 / numpy.sqrt(v),
+        'sign': numpy.sign,
+        'sin': numpy.sin,
+        'sinh': numpy.sinh,
+        'sinpi': lambda v: numpy.sin(pi * v),
+        'sqrt': numpy.sqrt,
+        'step': lambda edge, v: numpy.where(v < edge, 0.0, 1.0),
+        'tan': numpy.tan,
+        'tanh': numpy.tanh,
+        'tanpi': lambda v: numpy.tan(pi * v),
+        'tgamma': _vectorize(math.gamma),
+        'trunc': numpy.trunc,
+        # rs_vector_math.spec
+        'cross': _cross,
+        'distance': lambda left, right: _length(left - right),
+        'dot': _dot,
+        'length': _length,
+        'normalize': _normalize,
+    }
+
+
+# The reference implementation, built on first use
+_REFERENCES = None
+
+
+def family(name):
+    '''Get the family of a function, i.e. its name without precision prefix.
+
+    Args:
+        name: String, e.g. "native_exp2".
+
+    Returns:
+        A string, e.g. "exp2".
+    '''
+    for prefix in _PRECISION_PREFIXES:
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+
+def reference(name):
+    '''Get the reference implementation of a function.
+
+    Args:
+        name: String, the name of the function.
+
+    Returns:
+        A function of float64 arrays, None if the function is not covered.
+    '''
+    global _REFERENCES
+    _require_numpy()
+    if _REFERENCES is None:
+        _REFERENCES = _references()
+    return _REFERENCES.get(family(name))
+
+
+def _vector_size(type_name):
+    '''Get the number of components of a type, e.g. 3 for "float3".'''
+    digits = type_name.lstrip('abcdefghijklmnopqrstuvwxyz_')
+    return int(digits) if digits else 1
+
+
+def _scalar_type(type_name):
+    return type_name.rstrip('234')
+
+
+def tolerance(signature):
+    '''Get how precise the result of a function must be.
+
+    Args:
+        signature: The util_rs_spec.Signature of the function.
+
+    Returns:
+        A Tolerance.
+    '''
+    match = _RE_LIMITED.match(signature.test)
+    if signature.name.startswith('native_') and match:
+        return Tolerance(0, float(match.group(1)))
+    if signature.name.startswith(_PRECISION_PREFIXES):
+        return Tolerance(_HALF_PRECISION_ULPS, None)
+    return Tolerance(_FULL_ULPS.get(family(signature.name), 0), None)
+
+
+def covered(signature):
+    '''Check whether the reference implementation covers a function.
+
+    Only the functions of floating point results whose arguments are passed by
+    value are covered.
+    '''
+    if signature.spec not in SPEC_FILES or reference(signature.name) is None:
+        return False
+    if _scalar_type(signature.ret) not in _DTYPES:
+        return False
+    return all(not arg_type.endswith('*') and arg_type != '...'
+               for arg_type, _ in signature.args)
+
+
+def sample_inputs(signature, count=SWEEP_SIZE, seed=0):
+    '''Draw random inputs for a function.
+
+    The floating point inputs are drawn with a log-uniform magnitude and a
+    random sign, unless their argument declares a range, the integer inputs
+    are drawn between -10 and 10.
+
+    Args:
+        signature: The util_rs_spec.Signature of the function.
+        count: Integer, the number of inputs.
+        seed: Integer, the seed of the random draw, so that sweeps can be
+              replayed.
+
+    Returns:
+        A list with, for each argument, an array of count values, or of count
+        vectors for the vector arguments, in the type of the argument.
+    '''
+    _require_numpy()
+    rand = numpy.random.RandomState(seed)
+    limited = signature.test.startswith('limited')
+    names = [name for _, name in signature.args]
+    inputs = [None] * len(signature.args)
+
+    # The arguments other arguments must be above are drawn first
+    order = sorted(range(len(signature.args)),
+                   key=lambda index: bool(_RE_ABOVE.match(
+                       signature.options[index])))
+    for index in order:
+        arg_type = signature.args[index][0].replace('const ', '')
+        shape = (count, _vector_size(arg_type))
+        scalar = _scalar_type(arg_type)
+        option = signature.options[index]
+
+        if scalar not in _DTYPES:
+            values = rand.randint(-10, 11, size=shape)
+            inputs[index] = values.astype(numpy.int32)
+            continue
+
+        match_range = _RE_RANGE.match(option)
+        match_above = _RE_ABOVE.match(option)
+        if match_range:
+            values = rand.uniform(float(match_range.group(1)),
+                                  float(match_range.group(2)), size=shape)
+        elif match_above and match_above.group(1) in names:
+            low = inputs[names.index(match_above.group(1))]
+            values = low + rand.uniform(0, 100, size=shape[:1] + (1,))
+        else:
+            exponent = 3 if limited else 6
+            values = numpy.power(10.0, rand.uniform(-exponent, exponent,
+                                                    size=shape))
+            values *= rand.choice([-1.0, 1.0], size=shape)
+        inputs[index] = values.astype(_DTYPES[scalar])
+
+    if all(_vector_size(arg_type) == 1 for arg_type, _ in signature.args):
+        inputs = [values[:, 0] for values in inputs]
+    return inputs
+
+
+def evaluate(signature, inputs):
+    '''Compute the reference values of a function on a batch of inputs.
+
+    Args:
+        signature: The util_rs_spec.Signature of the function.
+        inputs: List of arrays, as returned by sample_inputs.
+
+    Returns:
+        A float64 array of the results.
+
+    Raises:
+        TestSuiteException: The function is not covered.
+    '''
+    func = reference(signature.name)
+    if func is None:
+        raise TestSuiteException('No reference implementation of %s'
+                                 % signature.name)
+    args = [values.astype(numpy.float64) for values in inputs]
+    with numpy.errstate(all='ignore'):
+        return numpy.asarray(func(*args), dtype=numpy.float64)
+
+
+def check(signature, inputs, actual):
+    '''Check the values computed on the device for a batch of inputs.
+
+    A value is within the tolerance if it is at most the allowed number of
+    ULP away from the reference value, half an ULP at least to allow for the
+    rounding of the exact result. The results must agree on NaN and, for
+    the values the result type can not represent, on infinity.
+
+    Args:
+        signature: The util_rs_spec.Signature of the function.
+        inputs: List of arrays, as returned by sample_inputs.
+        actual: Array of the values computed on the device.
+
+    Returns:
+        The list of Mismatch, empty if all the values are within the
+        tolerance.
+    '''
+    dtype = numpy.dtype(_DTYPES[_scalar_type(signature.ret)])
+    expected = evaluate(signature, inputs)
+    actual = numpy.asarray(actual, dtype=numpy.float64).reshape(
+        expected.shape)
+    bound = tolerance(signature)
+
+    with numpy.errstate(all='ignore'):
+        rounded = expected.astype(dtype).astype(numpy.float64)
+        if bound.absolute is not None:
+            allowed = numpy.full(expected.shape, bound.absolute)
+        else:
+            allowed = max(bound.ulps, 0.5) * numpy.spacing(
+                numpy.abs(rounded).astype(dtype)).astype(numpy.float64)
+        error = numpy.abs(actual - expected)
+        within = error <= allowed
+        both_nan = numpy.isnan(actual) & numpy.isnan(expected)
+        infinite = numpy.isinf(actual) | numpy.isinf(rounded)
+        within = numpy.where(infinite, actual == rounded, within) | both_nan
+
+    if within.ndim > 1:
+        within = within.all(axis=tuple(range(1, within.ndim)))
+    mismatches = []
+    for index in numpy.flatnonzero(~within):
+        mismatches.append(Mismatch(
+            int(index), [values[index].tolist() for values in inputs],
+            expected[index].tolist(), actual[index].tolist()))
+    return mismatches
+
+
+def sweep_signatures(api_level):
+    '''Get the functions a sweep from lldb can evaluate.
+
+    A sweep passes its inputs as literals, so only the scalar functions of
+    float results and float or int arguments are swept.
+
+    Args:
+        api_level: Integer, the API level of the target.
+
+    Returns:
+        A list of util_rs_spec.Signature.
+    '''
+    return [signature for signature in signatures(api_level, SPEC_FILES)
+            if not signature.inline and not signature.internal
+            and signature.ret == 'float'
+            and all(arg_type in _LITERAL_TYPES
+                    for arg_type, _ in signature.args)
+            and covered(signature)]
+
+
+def _literal(arg_type, value):
+    '''Format an input as a C literal of the type of its argument.'''
+    if arg_type != 'float':
+        return '%d' % value
+    # 9 significant digits round trip any float
+    text = '%.9g' % value
+    if '.' not in text and 'e' not in text:
+        text += '.'
+    return text + 'f'
+
+
+def build_sweep_expr(signature, inputs):
+    '''Build a single lldb expression evaluating a function on all inputs.
+
+    The results are the members of a local struct, the result of the
+    expression, which is printed in hexadecimal so that no precision is lost.
+
+    Args:
+        signature: The util_rs_spec.Signature of a function of
+                   sweep_signatures.
+        inputs: List of arrays, as returned by sample_inputs.
+
+    Returns:
+        The string that is the lldb expression.
+    '''
+    calls = []
+    for index in range(len(inputs[0]) if inputs else 1):
+        calls.append('%s(%s)' % (signature.name, ', '.join(
+            _literal(arg_type, values[index])
+            for (arg_type, _), values in zip(signature.args, inputs))))
+    return ('expr -f x -- struct rs_sweep_result { %s }; '
+            'rs_sweep_result rs_sweep = { %s }; rs_sweep' % (
+                ' '.join('%s r%d;' % (signature.ret, index)
+                         for index in range(len(calls))),
+                ', '.join(calls)))
+
+
+def parse_sweep_values(output, count):
+    '''Get the values of the result of a sweep of a float function.
+
+    Args:
+        output: String, the output of the lldb expression.
+        count: Integer, the number of values of the sweep.
+
+    Returns:
+        A list of the count float values.
+
+    Raises:
+        TestSuiteException: The output misses values.
+    '''
+    values = dict((int(index), struct.unpack('<f', struct.pack(
+        '<I', int(bits, 16) & 0xffffffff))[0])
+                  for index, bits in _RE_SWEEP_MEMBER.findall(output))
+    missing = [index for index in range(count) if index not in values]
+    if missing:
+        raise TestSuiteException('The sweep result misses the values %s'
+                                 % missing)
+    return [values[index] for index in range(count)]
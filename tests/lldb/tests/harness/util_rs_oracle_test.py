@@ -0,0 +1,79 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Tests of the host side reference implementation of the math builtins.
+
+Usage, from the tests folder: python -m harness.util_rs_oracle_test
+'''
+
+from __future__ import absolute_import
+
+import unittest
+
+from . import util_rs_oracle
+from .util_rs_spec import Signature
+
+
+def _signature(name, ret, arg_types):
+    '''Make the Signature of a rs_vector_math function.'''
+    names = ('left', 'right', 'third')[:len(arg_types)]
+    return Signature(name, ret, tuple(zip(arg_types, names)),
+                     ('',) * len(arg_types), None, None, False, False, '',
+                     'rs_vector_math')
+
+
+@unittest.skipUnless(util_rs_oracle.have_numpy(), 'NumPy is not installed')
+class GeometricFunctionsTest(unittest.TestCase):
+    '''The geometric functions of scalars and vectors.'''
+
+    SIGNATURES = [
+        _signature('length', 'float', ['float']),
+        _signature('length', 'float', ['float3']),
+        _signature('distance', 'float', ['float', 'float']),
+        _signature('distance', 'float', ['float4', 'float4']),
+        _signature('dot', 'float', ['float', 'float']),
+        _signature('dot', 'float', ['float2', 'float2']),
+        _signature('normalize', 'float', ['float']),
+        _signature('normalize', 'float4', ['float4']),
+    ]
+
+    def test_scalar_results_are_per_input(self):
+        for signature in self.SIGNATURES:
+            if signature.ret != 'float':
+                continue
+            inputs = util_rs_oracle.sample_inputs(signature)
+            expected = util_rs_oracle.evaluate(signature, inputs)
+            self.assertEqual((util_rs_oracle.SWEEP_SIZE,), expected.shape,
+                             signature)
+
+    def test_float_results_match(self):
+        for signature in self.SIGNATURES:
+            inputs = util_rs_oracle.sample_inputs(signature)
+            expected = util_rs_oracle.evaluate(signature, inputs)
+            # The device returns the results flat, rounded to float
+            actual = expected.astype('float32').ravel()
+            self.assertEqual(
+                [], util_rs_oracle.check(signature, inputs, actual), signature)
+
+    def test_wrong_results_mismatch(self):
+        signature = _signature('length', 'float', ['float'])
+        inputs = util_rs_oracle.sample_inputs(signature)
+        actual = util_rs_oracle.evaluate(signature, inputs).astype('float32')
+        actual[3] = -1.0
+        mismatches = util_rs_oracle.check(signature, inputs, actual)
+        self.assertEqual([3], [mismatch.index for mismatch in mismatches])
+
+
+if __name__ == '__main__':
+    unittest.main()
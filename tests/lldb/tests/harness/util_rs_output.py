@@ -0,0 +1,227 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Parsers for the output of the `language renderscript` lldb commands.
+
+Each parser reads the whole output of a command in a single pass over its
+lines and returns typed records, so that tests can compare what lldb reported
+with what they expect instead of searching the raw text for each expected
+string.
+'''
+
+from __future__ import absolute_import
+
+import collections
+import re
+
+from .exception import TestSuiteException
+
+# One allocation of `language renderscript allocation list`
+Allocation = collections.namedtuple(
+    'Allocation',
+    ['id', 'context', 'address', 'data_pointer', 'dims', 'data_type',
+     'data_kind'])
+
+# Output of `language renderscript status`
+RuntimeStatus = collections.namedtuple(
+    'RuntimeStatus',
+    ['library_discovered', 'driver_discovered', 'functions_hooked', 'hooks'])
+
+_RE_ALLOCATION_ID = re.compile(r'^(\d+):$')
+_RE_ALLOCATION_FIELD = re.compile(r'^\s+([A-Za-z ]+):\s*(.*)$')
+_RE_DUMP_ELEMENT = re.compile(r'^\((\d+), (\d+), (\d+)\) = (.*)$')
+_RE_COORDINATE = re.compile(r'Coordinate: \((\d+), (\d+), (\d+)\)')
+_RE_TUPLE = re.compile(r'-?\d+')
+_RE_HOOK = re.compile(r'^\w+$')
+
+
+def _parse_scalar(token):
+    '''Convert a single value printed by lldb into a number, if possible.
+
+    Args:
+        token: String, e.g. "12", "0x0c", "-1.5" or "true".
+
+    Returns:
+        An int or float if the token is numeric, the token itself otherwise.
+    '''
+    try:
+        if token.startswith(('0x', '-0x')):
+            return int(token, 16)
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return token
+
+
+def parse_element(text):
+    '''Convert the value of an allocation element into a Python value.
+
+    Scalars become numbers and vectors, printed as "{1 2 3}", become tuples of
+    numbers. Any other value, e.g. a struct, is returned as the text printed
+    by lldb.
+
+    Args:
+        text: String, the text after the "=" of an element of a dump.
+
+    Returns:
+        The value of the element.
+    '''
+    text = text.strip()
+    if text.startswith('{') and text.endswith('}') and '\n' not in text:
+        return tuple(_parse_scalar(token) for token in text[1:-1].split())
+    if '\n' in text or ' ' in text:
+        return text
+    return _parse_scalar(text)
+
+
+def _parse_tuple(text):
+    '''Parse a tuple of integers such as "(64, 64, 0)".'''
+    return tuple(int(value) for value in _RE_TUPLE.findall(text))
+
+
+def _parse_address(text):
+    '''Parse a hexadecimal address, returning None if it is not known.'''
+    try:
+        return int(text, 16)
+    except ValueError:
+        return None
+
+
+def parse_allocation_list(output):
+    '''Parse the output of `language renderscript allocation list`.
+
+    Args:
+        output: String, the output of the command.
+
+    Returns:
+        An OrderedDict from allocation id to Allocation record.
+    '''
+    allocations = collections.OrderedDict()
+    fields = None
+    alloc_id = None
+
+    def flush():
+        '''Record the allocation whose fields have been read so far.'''
+        if alloc_id is not None:
+            allocations[alloc_id] = Allocation(
+                id=alloc_id,
+                context=_parse_address(fields.get('Context', '')),
+                address=_parse_address(fields.get('Address', '')),
+                data_pointer=_parse_address(fields.get('Data pointer', '')),
+                dims=_parse_tuple(fields.get('Dimensions', '')),
+                data_type=fields.get('Data Type'),
+                data_kind=fields.get('Data Kind'))
+
+    for line in output.splitlines():
+        match = _RE_ALLOCATION_ID.match(line)
+        if match:
+            flush()
+            alloc_id = int(match.group(1))
+            fields = {}
+            continue
+        match = _RE_ALLOCATION_FIELD.match(line)
+        if match and alloc_id is not None:
+            fields[match.group(1)] = match.group(2).strip()
+    flush()
+    return allocations
+
+
+def parse_allocation_dump(output):
+    '''Parse the output of `language renderscript allocation dump`.
+
+    The elements of struct type span several lines, up to a closing brace on
+    a line of its own, and are returned as text.
+
+    Args:
+        output: String, the output of the command.
+
+    Returns:
+        An OrderedDict from (x, y, z) coordinate to element value, see
+        parse_element.
+    '''
+    elements = collections.OrderedDict()
+    coord = None
+    pending = None
+
+    for line in output.splitlines():
+        if pending is not None:
+            pending.append(line)
+            if line.strip() == '}':
+                elements[coord] = '\n'.join(pending)
+                pending = None
+            continue
+        match = _RE_DUMP_ELEMENT.match(line)
+        if not match:
+            continue
+        coord = (int(match.group(1)), int(match.group(2)),
+                 int(match.group(3)))
+        value = match.group(4)
+        if value.rstrip().endswith('{'):
+            pending = [value]
+        else:
+            elements[coord] = parse_element(value)
+    if pending is not None:
+        raise TestSuiteException('Unterminated element at {0} in the '
+                                 'allocation dump'.format(coord))
+    return elements
+
+
+def parse_kernel_coordinate(output):
+    '''Parse the output of `language renderscript kernel coordinate`.
+
+    Args:
+        output: String, the output of the command.
+
+    Returns:
+        The (x, y, z) coordinate the kernel is stopped at, or None if the output
+        does not report a coordinate.
+    '''
+    match = _RE_COORDINATE.search(output)
+    if not match:
+        return None
+    return tuple(int(value) for value in match.groups())
+
+
+def parse_status(output):
+    '''Parse the output of `language renderscript status`.
+
+    Args:
+        output: String, the output of the command.
+
+    Returns:
+        A RuntimeStatus record, whose functions_hooked tells whether the
+        hooked runtime functions are listed and hooks are their names.
+    '''
+    library = driver = functions_hooked = False
+    hooks = []
+    in_hooks = False
+    for line in output.splitlines():
+        text = line.strip()
+        if not text:
+            continue
+        if text.startswith('Runtime Library discovered'):
+            library = True
+        elif text.startswith('Runtime Driver discovered'):
+            driver = True
+        elif text.startswith('Runtime functions hooked'):
+            functions_hooked = in_hooks = True
+        elif in_hooks and _RE_HOOK.match(text):
+            hooks.append(text)
+        else:
+            in_hooks = False
+    return RuntimeStatus(library_discovered=library, driver_discovered=driver,
+                         functions_hooked=functions_hooked, hooks=hooks)
@@ -0,0 +1,396 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Reader of the RenderScript API spec files of frameworks/rs/script_api.
+
+The spec files describe every builtin function with blocks of "tag: value"
+lines, from "function:" to "end:". A block may be a template: its name, return
+type and arguments use "#1", "#2", ... in place of the vector sizes listed by
+its "w:" line and the types listed by its "t:" lines, and it stands for every
+combination of them. This module expands the blocks the way the C++ generator
+of script_api does, and keeps the resulting signatures in an index cached next
+to this module, keyed on the digest of the spec files, so that they are only
+parsed again when they change.
+'''
+
+from __future__ import absolute_import
+
+import collections
+import glob
+import hashlib
+import itertools
+import json
+import os
+import re
+
+from .exception import TestSuiteException
+
+# The folder holding the spec files, in the frameworks/rs tree
+SPEC_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    os.pardir, os.pardir, os.pardir, os.pardir, 'script_api'))
+
+# File caching the index of the signatures, next to this module
+_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'rs_spec.index.json')
+
+# Spec type names to C type names, in the order the generator expands them
+_TYPES = collections.OrderedDict([
+    ('f16', 'half'), ('f32', 'float'), ('f64', 'double'),
+    ('i8', 'char'), ('u8', 'uchar'), ('i16', 'short'), ('u16', 'ushort'),
+    ('i32', 'int'), ('u32', 'uint'), ('i64', 'long'), ('u64', 'ulong'),
+])
+
+# The first API level of RenderScript, which a spec version of 9 stands for
+_MIN_API_LEVEL = 9
+
+# Version of the functions still under development
+UNRELEASED = 0xffffffff
+
+# One expanded function of the spec files. args is a tuple of (type, name)
+# tuples and options holds the test option of each argument, e.g.
+# "range(-1,1)". max_version is 0 if the function is still available and test
+# is how the function is tested, e.g. "scalar" or "limited(0.0005)".
+Signature = collections.namedtuple(
+    'Signature',
+    ['name', 'ret', 'args', 'options', 'min_version', 'max_version', 'inline',
+     'internal', 'test', 'spec'])
+
+# The index, once loaded or built
+_INDEX = None
+
+
+def _entries(path):
+    '''Read the "tag: value" entries of a spec file.
+
+    Lines starting with a space continue the value of the previous entry and
+    lines starting with '#' are comments.
+
+    Args:
+        path: String, the path to the spec file.
+
+    Returns:
+        A list of (tag, value) tuples, the tag of a continuation line being
+        the empty string.
+    '''
+    entries = []
+    with open(path) as spec:
+        for line in spec:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith(' '):
+                entries.append(('', line[1:]))
+                continue
+            tag, _, value = line.partition(':')
+            entries.append((tag, value.strip()))
+    return entries
+
+
+def _blocks(path):
+    '''Split a spec file into the entries of its function blocks.
+
+    Args:
+        path: String, the path to the spec file.
+
+    Returns:
+        A list with, for each "function:" block, the list of its (tag, value)
+        entries, continuation lines excluded.
+    '''
+    blocks = []
+    block = None
+    for tag, value in _entries(path):
+        if tag == 'function':
+            block = []
+            blocks.append(block)
+        elif tag == 'end':
+            block = None
+            continue
+        if block is not None and tag:
+            block.append((tag, value))
+    return blocks
+
+
+def _parse_version(value):
+    '''Parse the value of a "version:" tag.
+
+    Returns:
+        A tuple of the minimum and maximum API levels, 0 standing for any.
+    '''
+    if value.startswith('UNRELEASED'):
+        return UNRELEASED, UNRELEASED
+    levels = [int(level) for level in value.split()[:2]]
+    min_version = levels[0]
+    max_version = levels[1] if len(levels) > 1 else 0
+    if min_version == _MIN_API_LEVEL:
+        min_version = 0
+    return min_version, max_version
+
+
+def _parse_param(value):
+    '''Parse the value of an "arg:" or "ret:" tag.
+
+    The documentation, in double quotes, is dropped. The test option follows
+    the first ", ".
+
+    Returns:
+        A tuple of the unexpanded type, name and test option, the name being
+        empty for a return value and the type "..." for variable arguments.
+    '''
+    doc = value.find(', "')
+    if doc != -1:
+        value = value[:doc]
+    value, _, option = value.partition(', ')
+    value = value.strip()
+    option = option.strip()
+    if value == '...':
+        return '...', '', option
+    type_name, _, name = value.rpartition(' ')
+    if not type_name:
+        return value, '', option
+    if name.startswith('*'):
+        # e.g. "float *floor"
+        type_name += '*' * (len(name) - len(name.lstrip('*')))
+        name = name.lstrip('*')
+    return type_name.strip(), name, option
+
+
+def _replaceables(block):
+    '''Get the values the "#1", "#2", ... of a block are replaced by.
+
+    Returns:
+        A list with, for each of "#1", "#2", ..., the list of its values:
+        the vector size suffixes of the "w:" tag, then the C types of each
+        "t:" tag, in the order the generator uses.
+    '''
+    replaceables = []
+    for tag, value in block:
+        if tag == 'w':
+            replaceables.append([suffix for width, suffix in
+                                 (('1', ''), ('2', '2'), ('3', '3'), ('4', '4'))
+                                 if width in value])
+        elif tag == 't':
+            names = [name.strip() for name in value.split(',')]
+            types = [c_type for spec_type, c_type in _TYPES.items()
+                     if spec_type in names]
+            types.extend(name for name in names if name not in _TYPES)
+            replaceables.append(types)
+    return replaceables
+
+
+def _permutations(replaceables):
+    '''Enumerate the combinations of the replaceables of a block.
+
+    The first replaceable varies fastest, as in the generator.
+
+    Returns:
+        A list of lists, each holding one value per replaceable.
+    '''
+    return [list(reversed(combination))
+            for combination in itertools.product(*reversed(replaceables))]
+
+
+def _expand(text, values):
+    '''Replace "#1", "#2", ... by the given values.'''
+    for index, value in enumerate(values):
+        text = text.replace('#%d' % (index + 1), value)
+    return text
+
+
+def _expand_block(block, spec):
+    '''Expand a function block into the signatures it stands for.
+
+    Args:
+        block: List of the (tag, value) entries of the block.
+        spec: String, the name of the spec file, e.g. "rs_math".
+
+    Returns:
+        A list of Signature.
+    '''
+    tags = dict(block)
+    min_version, max_version = _parse_version(tags.get('version', '9'))
+    ret = _parse_param(tags['ret'])[0] if 'ret' in tags else 'void'
+    params = [_parse_param(value) for tag, value in block if tag == 'arg']
+    inline = 'inline' in tags
+    internal = tags.get('internal') == 'true'
+    test = tags.get('test', 'scalar').strip() or 'scalar'
+
+    signatures = []
+    for values in _permutations(_replaceables(block)):
+        signatures.append(Signature(
+            _expand(tags['function'], values), _expand(ret, values),
+            tuple((_expand(type_name, values), name)
+                  for type_name, name, _ in params),
+            tuple(_expand(option, values) for _, _, option in params),
+            min_version, max_version, inline, internal, test, spec))
+    return signatures
+
+
+def parse_spec(path):
+    '''Read and expand all the functions of a spec file.
+
+    Args:
+        path: String, the path to the spec file.
+
+    Returns:
+        A list of Signature, in the order of the file.
+    '''
+    spec = os.path.splitext(os.path.basename(path))[0]
+    signatures = []
+    for block in _blocks(path):
+        signatures.extend(_expand_block(block, spec))
+    return signatures
+
+
+def _spec_paths(spec_dir):
+    '''Get the paths to the spec files of a folder, sorted.'''
+    return sorted(glob.glob(os.path.join(spec_dir, '*.spec')))
+
+
+def _digest(paths):
+    '''Compute the digest of the spec files and of the source of this module.
+
+    The cached index is only valid for the files it was built from, with the
+    reader it was built by.
+    '''
+    sha = hashlib.sha1()
+    for path in [os.path.splitext(os.path.abspath(__file__))[0] + '.py'] + paths:
+        sha.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as source:
+            sha.update(source.read())
+    return sha.hexdigest()
+
+
+def _load_index(path, digest):
+    '''Read the index cached for the given digest.
+
+    Returns:
+        The list of Signature, None if there is no valid cached index.
+    '''
+    try:
+        with open(path) as index_file:
+            cached = json.load(index_file)
+    except (IOError, OSError, ValueError):
+        return None
+    if digest is not None and cached.get('digest') != digest:
+        return None
+    return [Signature(str(name), str(ret),
+                      tuple((str(arg_type), str(arg_name))
+                            for arg_type, arg_name in args),
+                      tuple(str(option) for option in options),
+                      min_version, max_version, bool(inline), bool(internal),
+                      str(test), str(spec))
+            for name, ret, args, options, min_version, max_version, inline,
+            internal, test, spec in cached['signatures']]
+
+
+def read_index(spec_dir=SPEC_DIR, index_path=_INDEX_PATH):
+    '''Get the signatures of all the functions of the spec files.
+
+    The index is built once and cached in a JSON file, keyed on the digest of
+    the spec files. If the spec files are not available, the cached index is
+    used as is.
+
+    Args:
+        spec_dir: String, the folder holding the spec files.
+        index_path: String, the path to the file caching the index.
+
+    Returns:
+        A list of Signature, in the order of the spec files.
+
+    Raises:
+        TestSuiteException: There are neither spec files nor cached index.
+    '''
+    global _INDEX
+    if _INDEX is not None and spec_dir == SPEC_DIR \
+            and index_path == _INDEX_PATH:
+        return _INDEX
+
+    paths = _spec_paths(spec_dir)
+    if not paths:
+        index = _load_index(index_path, None)
+        if index is None:
+            raise TestSuiteException(
+                'No spec files in %s and no cached index at %s'
+                % (spec_dir, index_path))
+        return index
+
+    digest = _digest(paths)
+    index = _load_index(index_path, digest)
+    if index is None:
+        index = []
+        for path in paths:
+            index.extend(parse_spec(path))
+        try:
+            with open(index_path, 'w') as index_file:
+                json.dump({'digest': digest,
+                           'signatures': [list(signature)
+                                          for signature in index]},
+                          index_file, separators=(',', ':'))
+        except (IOError, OSError):
+            # the cache is only an optimisation, e.g. the tree may be read-only
+            pass
+    if spec_dir == SPEC_DIR and index_path == _INDEX_PATH:
+        _INDEX = index
+    return index
+
+
+def available(signature, api_level):
+    '''Check whether a function is available at an API level.
+
+    Args:
+        signature: The Signature of the function.
+        api_level: Integer, the API level.
+
+    Returns:
+        True if the function can be called by a script targeting that level.
+    '''
+    if signature.min_version > api_level:
+        return False
+    return not signature.max_version or signature.max_version >= api_level
+
+
+def signatures(api_level, specs=None, spec_dir=SPEC_DIR):
+    '''Get the functions available at an API level.
+
+    Args:
+        api_level: Integer, the API level.
+        specs: Iterable of the names of the spec files to read, e.g.
+               "rs_math", all of them if None.
+        spec_dir: String, the folder holding the spec files.
+
+    Returns:
+        A list of Signature, in the order of the spec files.
+    '''
+    specs = None if specs is None else frozenset(specs)
+    return [signature for signature in read_index(spec_dir)
+            if (specs is None or signature.spec in specs)
+            and available(signature, api_level)]
+
+
+_RE_SPACES = re.compile(r'\s+')
+
+
+def format_signature(signature):
+    '''Format a signature as a C declaration.
+
+    Args:
+        signature: The Signature.
+
+    Returns:
+        A string, e.g. "float2 fmax(float2 a, float b);".
+    '''
+    args = ', '.join(_RE_SPACES.sub(' ', ('%s %s' % arg).strip())
+                     for arg in signature.args)
+    return '%s %s(%s);' % (signature.ret, signature.name, args)
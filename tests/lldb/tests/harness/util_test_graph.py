@@ -0,0 +1,176 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Module that contains the class TestGraph, the dependencies between the test
+methods of a test case.
+
+A test method may declare, with the decorators `provides_state` and
+`requires_state`, the named setup states it establishes in the debug session,
+e.g. "a breakpoint at simple.rs:145 was hit", and those it needs. Such a method
+only depends on the methods providing the states it requires. A method that
+declares nothing depends on every method that runs before it, as the order
+of the methods is all that is known about it. The methods ordered 'last' clean
+up the session and run at the end of every session.
+
+From these dependencies the test methods can be split into sessions, each
+replaying only the setup chain that its methods need, so that the independent
+branches of a test case can be run separately.
+'''
+
+from __future__ import absolute_import
+
+from .exception import TestSuiteException
+
+
+def sort_key(method):
+    '''Key sorting test methods in the order they must run.'''
+    return getattr(method, 'test_order', float('Inf'))
+
+
+def _is_final(method):
+    '''Check whether a test method cleans up the session.'''
+    return getattr(method, 'test_order', None) == 'last'
+
+
+def _is_declared(method):
+    '''Check whether a test method declares the setup states it uses.'''
+    return (hasattr(method, 'test_requires')
+            or hasattr(method, 'test_provides'))
+
+
+class TestGraph(object):
+    '''Dependencies between the test methods of a test case.'''
+
+    def __init__(self, methods):
+        '''Build the graph and check the declared setup states.
+
+        Args:
+            methods: The test methods of the test case, functions or bound
+                     methods.
+
+        Raises:
+            TestSuiteException: A setup state is provided by more than one
+                                method, is required but never provided, or is
+                                provided by a method running after the method
+                                requiring it.
+        '''
+        methods = sorted(methods, key=sort_key)
+        self._order = [method.__name__ for method in methods]
+        self._final = [method.__name__ for method in methods
+                       if _is_final(method)]
+        position = dict((name, index) for index, name in enumerate(self._order))
+
+        providers = {}
+        for method in methods:
+            for state in getattr(method, 'test_provides', ()):
+                if state in providers:
+                    raise TestSuiteException(
+                        'setup state %r is provided by both %s and %s' % (
+                            state, providers[state], method.__name__))
+                providers[state] = method.__name__
+
+        self._deps = {}
+        for index, method in enumerate(methods):
+            name = method.__name__
+            if name in self._final:
+                continue
+            if not _is_declared(method):
+                self._deps[name] = [other for other in self._order[:index]
+                                    if other not in self._final]
+                continue
+            deps = []
+            for state in getattr(method, 'test_requires', ()):
+                provider = providers.get(state)
+                if provider is None:
+                    raise TestSuiteException(
+                        '%s requires the setup state %r, which no test '
+                        'provides' % (name, state))
+                if position[provider] >= index:
+                    raise TestSuiteException(
+                        '%s requires the setup state %r, provided by %s '
+                        'which runs after it' % (name, state, provider))
+                deps.append(provider)
+            self._deps[name] = deps
+
+    def prerequisites(self, name):
+        '''Get the methods that must run before a method, directly or not.
+
+        Args:
+            name: String, the name of the test method.
+
+        Returns:
+            A set of method names.
+        '''
+        found = set()
+        pending = list(self._deps.get(name, ()))
+        while pending:
+            dep = pending.pop()
+            if dep not in found:
+                found.add(dep)
+                pending.extend(self._deps[dep])
+        return found
+
+    def session(self, names):
+        '''Get the methods to run for the given methods to run in a session.
+
+        Args:
+            names: Iterable of the names of the test methods wanted.
+
+        Returns:
+            The list of the names of the wanted methods, their prerequisites
+            and the final methods, in the order they must run.
+
+        Raises:
+            TestSuiteException: One of the names is not a test method.
+        '''
+        wanted = set()
+        for name in names:
+            if name not in self._order:
+                raise TestSuiteException('unknown test method %s' % name)
+            wanted.add(name)
+            wanted.update(self.prerequisites(name))
+        wanted.update(self._final)
+        return [name for name in self._order if name in wanted]
+
+    def sessions(self, max_sessions=None):
+        '''Split the test methods into independent sessions.
+
+        The methods no other method depends on are the leaves of the graph.
+        They are shared out, in their running order, between at most
+        max_sessions sessions, each of them then running the setup chain of
+        its leaves.
+
+        Args:
+            max_sessions: Integer, the maximum number of sessions. If None,
+                          there is one session per leaf.
+
+        Returns:
+            A list of sessions, each being the list of the names of the
+            methods to run, in order.
+        '''
+        needed = set()
+        for deps in self._deps.values():
+            needed.update(deps)
+        leaves = [name for name in self._order
+                  if name in self._deps and name not in needed]
+        if not leaves:
+            return [self.session(())] if self._order else []
+
+        count = len(leaves)
+        if max_sessions is not None:
+            count = max(1, min(count, max_sessions))
+        groups = [leaves[len(leaves) * index // count:
+                         len(leaves) * (index + 1) // count]
+                  for index in range(count)]
+        return [self.session(group) for group in groups]
@@ -12,17 +12,33 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-'''Timer utility'''
+'''Timer utility
+
+The Timer is a watchdog: a single thread waits on a condition variable until
+the deadline, and resetting the timer only moves the deadline, so a test
+running thousands of lldb commands does not start thousands of threads.
+'''
 
 from __future__ import absolute_import
 
 import threading
+import time
+
+# A clock the deadlines are measured against, which the wall clock being set
+# does not move. Python 2 has none, the wall clock is used there.
+_monotonic = getattr(time, 'monotonic', time.time)
 
 
 class Timer(object):
-    '''A Timer utility to execute a callback after a certain interval.'''
+    '''A Timer utility to execute a callback after a certain interval.
+
+    The interval counts from the start of the timer or its last reset. Each
+    phase of a test may also have a deadline of its own, counting from the
+    start of the phase, which resetting the timer does not move. The callback
+    is called once the first of the deadlines expires.
+    '''
 
-    def __init__(self, interval, callback):
+    def __init__(self, interval, callback, phase_intervals=None):
         '''Initialise the Timer without starting it.
 
         Args:
@@ -30,6 +46,8 @@ class Timer(object):
                 invoking the callback
             callback: function, it handles the function to call once
                 the timeout expires.
+            phase_intervals: dict, the interval in seconds each phase must
+                complete in, by name of phase, e.g. {'teardown': 60}.
         '''
 
         # validate input parameters
@@ -40,9 +58,13 @@ class Timer(object):
             raise TypeError('Argument "callback" is not a function: '
                              '{0}'.format(type(callback)))
 
-        self._timer = None
         self._callback = callback
         self._interval = interval
+        self._phase_intervals = dict(phase_intervals or {})
+        self._cond = threading.Condition()
+        self._thread = None
+        self._deadline = None
+        self._phase_deadline = None
 
     def _is_running(self):
         '''Checks whether the timer is executing.
@@ -50,7 +72,28 @@ class Timer(object):
         Returns:
             boolean, true if the timer is currently running, false otherwise
         '''
-        return self._timer is not None
+        return self._deadline is not None
+
+    def _next_deadline(self):
+        '''Get the first of the deadlines, with the condition held.'''
+        if self._phase_deadline is None:
+            return self._deadline
+        return min(self._deadline, self._phase_deadline)
+
+    def _watch(self):
+        '''Body of the watchdog thread.'''
+        with self._cond:
+            while self._is_running():
+                remaining = self._next_deadline() - _monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            else:
+                return
+            self._deadline = None
+            self._phase_deadline = None
+            self._thread = None
+        self._callback()
 
     def start(self):
         '''Starts the timer.
@@ -61,11 +104,16 @@ class Timer(object):
         Throws:
             RuntimeError: if the timer is already running
         '''
-        if self._is_running():
-            raise RuntimeError('Timer already running')
-
-        self._timer = threading.Timer(self._interval, self._callback)
-        self._timer.start()
+        with self._cond:
+            if self._is_running():
+                raise RuntimeError('Timer already running')
+            self._deadline = _monotonic() + self._interval
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch,
+                                                name='watchdog')
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
         return self # so that we can perform Timer(...).start()
 
     def stop(self):
@@ -74,19 +122,59 @@ class Timer(object):
         Returns:
             self, the Timer instance
         '''
-
-        if self._is_running():
-            self._timer.cancel()
-            self._timer = None
+        with self._cond:
+            thread = self._thread
+            self._deadline = None
+            self._phase_deadline = None
+            self._thread = None
+            self._cond.notify()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
         return self
 
     def reset(self):
-        '''Restart the timer.
+        '''Restart the interval of the timer, starting the timer if needed.
+
+        The deadline of the current phase is left as is.
 
         Returns:
             self, the Timer instance
         '''
+        with self._cond:
+            if self._is_running():
+                # the watchdog only wakes up at the former deadline, which
+                # is earlier, and then waits again for the new one
+                self._deadline = _monotonic() + self._interval
+                return self
+        return self.start()
+
+    def set_phase(self, phase):
+        '''Start a phase, with the deadline configured for it if any.
 
-        self.stop()
-        self.start()
+        The interval of the timer is also restarted.
+
+        Args:
+            phase: String, the name of the phase, e.g. "run".
+
+        Returns:
+            self, the Timer instance
+        '''
+        self.reset()
+        with self._cond:
+            interval = self._phase_intervals.get(phase)
+            self._phase_deadline = (None if interval is None
+                                    else _monotonic() + interval)
+            self._cond.notify()
         return self
+
+    def remaining(self):
+        '''Get the time left before the timer expires.
+
+        Returns:
+            float, the number of seconds before the first deadline, None if
+            the timer is not running.
+        '''
+        with self._cond:
+            if not self._is_running():
+                return None
+            return max(0.0, self._next_deadline() - _monotonic())
@@ -0,0 +1,176 @@
+# Copyright (C) 2016 The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''Timeline of a run of the test suite, in the Chrome trace event format.
+
+When the test suite is run with --trace, the driver and each test runner
+record a span for every step of a test: checking adb, forwarding the port,
+spawning the runner, launching the target and lldb-server, connecting to the
+platform, each phase and test method, and each lldb command. Each process
+writes its events to a file of its own in the trace folder, one JSON object
+per line, and the driver then merges them into a single file which can be
+loaded in chrome://tracing or https://ui.perfetto.dev.
+
+The events are "complete" events, timestamped in microseconds of the wall
+clock so that those of the different processes line up.
+'''
+
+from __future__ import absolute_import
+
+import functools
+import glob
+import json
+import os
+import threading
+import time
+
+# The file the events of this process are written to, if tracing
+_FILE = None
+
+
+def _now():
+    '''Get the current time, in microseconds.'''
+    return int(time.time() * 1e6)
+
+
+def _write(event):
+    '''Write an event to the trace file of this process.'''
+    event['pid'] = os.getpid()
+    event['tid'] = threading.current_thread().ident
+    _FILE.write(json.dumps(event, separators=(',', ':')) + '\n')
+
+
+def start(trace_dir, process_name):
+    '''Start recording the spans of this process.
+
+    Args:
+        trace_dir: String, the folder holding the trace files.
+        process_name: String, the name shown for this process in the
+                      timeline, e.g. "driver" or "test_step.py(jni)".
+    '''
+    # pylint: disable=global-statement
+    global _FILE
+    path = os.path.join(trace_dir, '{0}.json'.format(os.getpid()))
+    # line buffered, so that the events survive a hard exit on timeout
+    _FILE = open(path, 'w', 1)
+    _write({'name': 'process_name', 'ph': 'M',
+            'args': {'name': process_name}})
+
+
+def stop():
+    '''Stop recording spans.'''
+    # pylint: disable=global-statement
+    global _FILE
+    if _FILE is not None:
+        _FILE.close()
+        _FILE = None
+
+
+def is_tracing():
+    '''Check whether the spans of this process are recorded.'''
+    return _FILE is not None
+
+
+class _Span(object):
+    '''Context manager recording the time its block takes.'''
+
+    def __init__(self, name, category, args):
+        self._event = {'name': name, 'cat': category, 'ph': 'X'}
+        if args:
+            self._event['args'] = args
+
+    def __enter__(self):
+        self._event['ts'] = _now()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if _FILE is None:
+            return
+        self._event['dur'] = _now() - self._event['ts']
+        if exc_type is not None:
+            self._event.setdefault('args', {})['error'] = exc_type.__name__
+        _write(self._event)
+
+
+class _NoSpan(object):
+    '''Context manager doing nothing, when not tracing.'''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, category, **args):
+    '''Record the time the block of a with statement takes.
+
+    Args:
+        name: String, the name of the span, e.g. "bundle.launch".
+        category: String, the kind of span, e.g. "adb" or "lldb".
+        args: Values to show with the span, e.g. the full lldb command.
+
+    Returns:
+        A context manager.
+    '''
+    if _FILE is None:
+        return _NO_SPAN
+    return _Span(name, category, args)
+
+
+def traced(category, name=None):
+    '''Decorator recording a span for each call of a function.
+
+    Args:
+        category: String, the kind of span, e.g. "adb".
+        name: String, the name of the span, the name of the function if None.
+    '''
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            with span(span_name, category):
+                return func(*args, **kwargs)
+        return inner
+    return decorator
+
+
+def merge_traces(trace_dir, path):
+    '''Merge the trace files of all the processes into a single trace.
+
+    Args:
+        trace_dir: String, the folder holding the trace files.
+        path: String, the path to the merged trace, in the JSON object
+              format of the trace event format.
+
+    Returns:
+        The number of events merged.
+    '''
+    events = []
+    for trace_path in sorted(glob.glob(os.path.join(trace_dir, '*.json'))):
+        with open(trace_path) as trace_file:
+            for line in trace_file:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    # the last line of a process killed while writing it
+                    pass
+    with open(path, 'w') as trace_file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'},
+                  trace_file, separators=(',', ':'))
+    return len(events)
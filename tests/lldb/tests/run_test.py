@@ -19,7 +19,11 @@ from __future__ import print_function, absolute_import
 
 import os
 import sys
+import json
+import time
 import atexit
+import contextlib
+import cProfile
 import inspect
 import logging
 import argparse
@@ -28,8 +32,10 @@ import warnings
 import harness
 from harness import util_constants
 from harness import util_log
+from harness import util_trace
 from harness import util_warnings
 from harness.util_functions import load_py_module
+from harness.util_profile import Profile, profile_paths
 from harness.util_lldb import UtilLLDB
 from harness.exception import DisconnectedException
 from harness.exception import TestSuiteException, TestIgnoredException
@@ -63,10 +69,11 @@ def _test_pre_run(state):
     assert state.bundle
 
     log = util_log.get_logger()
-    log.info('running: {0}'.format(state.name))
+    log.info('running: %s', state.name)
 
     # Remove any cached NDK scripts between tests
-    state.bundle.delete_ndk_cache()
+    if not state.keep_ndk_cache:
+        state.bundle.delete_ndk_cache()
 
     # query our test case for the remote target app it needs
     # First try the legacy behaviour
@@ -84,7 +91,11 @@ def _test_pre_run(state):
         # test case doesn't require a remote process to debug
         return True
     else:
+        if state.cold_start:
+            # force the target to compile its scripts from scratch
+            state.bundle.delete_script_cache(target_name)
         # find the pid of our remote test process
+        state.test.launch_time = time.time()
         state.pid = state.bundle.launch(target_name)
         if not state.pid:
             log.error('unable to get pid of target')
@@ -154,7 +165,28 @@ def _test_run(state):
     return True
 
 
-def _initialise_timer(android, interval):
+def _save_measurements(state, file_path):
+    '''Append the timings recorded by a benchmark to a results file.
+
+    Each measurement is written as a single line of JSON, so that the results
+    of successive runs can be collected in the same file.
+
+    Args:
+        state: Test suite state collection, instance of TestState.
+        file_path: String, path to the file where to append the results.
+    '''
+    with open(file_path, 'a') as results_file:
+        for name, seconds in sorted(state.test.measurements.items()):
+            results_file.write(json.dumps({
+                'test': state.name,
+                'bundle_type': state.bundle_type,
+                'cold_start': state.cold_start,
+                'measurement': name,
+                'seconds': seconds
+            }) + '\n')
+
+
+def _initialise_timer(android, interval, phase_intervals=None):
     '''Start a 'timeout' timer, to catch stalled execution.
 
     This function will start a timer that will act as a timeout killing this
@@ -163,6 +195,8 @@ def _initialise_timer(android, interval):
     Args:
         android: current instance of harness.UtilAndroid
         interval: the interval for the timeout, in seconds
+        phase_intervals: dict, the time in seconds the phases of the test,
+                         e.g. "teardown", must complete in, by phase name
 
     Returns:
         The instance of the Timer class that was created.
@@ -175,15 +209,56 @@ def _initialise_timer(android, interval):
         android.reset_all_props()
         # pylint: disable=protected-access
         sys.stdout.flush()
+        # write the records still queued, as the exit skips the exit handlers
+        util_log.shutdown()
         # hard exit to force kill all threads that may block our exit
         os._exit(util_constants.RC_TEST_TIMEOUT)
 
-    timer = Timer(interval, on_timeout)
+    timer = Timer(interval, on_timeout, phase_intervals)
     timer.start()
     atexit.register(Timer.stop, timer)
     return timer
 
 
+def _parse_phase_timeouts(values):
+    '''Parse the values of the --phase-timeout options.
+
+    Args:
+        values: List of strings, e.g. ["teardown=60"].
+
+    Returns:
+        A dict of the timeouts in seconds, by phase name.
+
+    Raises:
+        TestSuiteException: A value is not of the form phase=seconds.
+    '''
+    timeouts = {}
+    for value in values:
+        phase, _, seconds = value.partition('=')
+        try:
+            timeouts[phase] = float(seconds)
+        except ValueError:
+            raise TestSuiteException(
+                'Invalid phase timeout {0}, expected phase=seconds'
+                .format(value))
+    return timeouts
+
+
+def _plan_sessions(args):
+    '''Write how the methods of the test split into sessions.
+
+    Args:
+        args: The parsed command line arguments of the test runner.
+    '''
+    test_module = load_py_module(os.path.join(get_test_dir(args.test_name),
+                                              args.test_name))
+    test_inst = _get_test_case_class(test_module)(
+        args.device_port, args.device, None, args.bundle_type,
+        wimpy=args.wimpy)
+    with open(args.plan_sessions, 'w') as plan_file:
+        json.dump(test_inst.plan_sessions(args.max_sessions), plan_file)
+
+
 def _quit_test(num, timer):
     '''This function will exit making sure the timeout thread is killed.
 
@@ -198,6 +273,21 @@ def _quit_test(num, timer):
     sys.exit(num)
 
 
+@contextlib.contextmanager
+def _phase(state, phase):
+    '''Run a phase of the test, in the log, timer and trace.
+
+    Args:
+        state: The current TestState object.
+        phase: String, the name of the phase, e.g. "run".
+    '''
+    util_log.set_phase(phase)
+    if state.timer:
+        state.timer.set_phase(phase)
+    with util_trace.span(phase, 'phase'):
+        yield
+
+
 def _execute_test(state):
     '''Execute a test suite.
 
@@ -206,18 +296,47 @@ def _execute_test(state):
     '''
     log = util_log.get_logger()
 
-    state.test.setup(state.android)
+    with _phase(state, 'setup'):
+        state.test.setup(state.android)
     try:
-        if not _test_pre_run(state):
-            raise TestSuiteException('test_pre_run() failed')
-        if not _test_run(state):
-            raise TestSuiteException('test_run() failed')
-        _test_post_run(state)
+        with _phase(state, 'pre_run'):
+            if not _test_pre_run(state):
+                raise TestSuiteException('test_pre_run() failed')
+        with _phase(state, 'run'):
+            if not _test_run(state):
+                raise TestSuiteException('test_run() failed')
+        with _phase(state, 'post_run'):
+            _test_post_run(state)
         log.info('Test passed')
+        for name, seconds in sorted(state.test.measurements.items()):
+            log.info('[Benchmark] %s: %.3fs', name, seconds)
 
     finally:
-        state.test.post_run()
-        state.test.teardown(state.android)
+        with _phase(state, 'teardown'):
+            state.test.post_run()
+            state.test.teardown(state.android)
+
+
+def _execute_profiled_test(state, profile_dir, session):
+    '''Execute a test suite under cProfile, timing each lldb command.
+
+    The cProfile statistics and the time spent in each lldb command verb and
+    test method are written to the profile folder, even if the test fails.
+
+    Args:
+        state: The current TestState object.
+        profile_dir: String, the folder where to write the profile.
+        session: String token of this test runner, or None.
+    '''
+    json_path, stats_path = profile_paths(profile_dir, state.name,
+                                          state.bundle_type, session)
+    state.test.profile = Profile()
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(_execute_test, state)
+    finally:
+        profiler.dump_stats(stats_path)
+        state.test.profile.save(json_path, state.name, state.bundle_type)
 
 
 def _get_test_case_class(module):
@@ -287,6 +406,54 @@ def main():
        ('bundle_type', str),
     ):
         parser.add_argument(name, type=formatter)
+    parser.add_argument('--log-server',
+                        metavar='host:port',
+                        help='Send the log records to the log server of the '
+                             'driver instead of writing them to the log '
+                             'file.')
+    parser.add_argument('--log-session',
+                        metavar='token',
+                        help='Token identifying this run to the log server.')
+    parser.add_argument('--bundle-index',
+                        metavar='path',
+                        help='Path to the cached index of the test apps.')
+    parser.add_argument('--keep-ndk-cache',
+                        action='store_true',
+                        help='Do not delete the cached NDK scripts before '
+                             'launching the target.')
+    parser.add_argument('--cold-start',
+                        action='store_true',
+                        help='Delete the script cache of the target before '
+                             'launching it.')
+    parser.add_argument('--profile',
+                        metavar='dir',
+                        help='Profile the test and write the profile to this '
+                             'folder.')
+    parser.add_argument('--tests',
+                        metavar='names',
+                        help='Comma separated names of the test methods to '
+                             'run, with the methods they depend on.')
+    parser.add_argument('--plan-sessions',
+                        metavar='path',
+                        help='Instead of running the test, write to this file '
+                             'how its methods split into sessions.')
+    parser.add_argument('--max-sessions',
+                        type=int,
+                        help='Maximum number of sessions for --plan-sessions.')
+    parser.add_argument('--trace',
+                        metavar='dir',
+                        help='Record the timeline of the test in this '
+                             'folder.')
+    parser.add_argument('--phase-timeout',
+                        metavar='phase=seconds',
+                        action='append',
+                        default=[],
+                        help='Time the given phase of the test must complete '
+                             'in, e.g. teardown=60.')
+    parser.add_argument('--benchmark-results',
+                        metavar='path',
+                        help='Append the timings recorded by the test to this '
+                             'file.')
 
     args = parser.parse_args()
 
@@ -297,17 +464,33 @@ def main():
             print_to_stdout=args.print_to_stdout,
             level=logging.INFO if not args.verbose else logging.DEBUG,
             file_path=args.log_file_path,
-            file_mode='a'
+            file_mode='a',
+            server_address=args.log_server,
+            session=args.log_session,
+            test=args.test_name,
+            bundle_type=args.bundle_type
         )
         log = util_log.get_logger()
         log.debug('Logger initialised')
 
+        if args.trace:
+            util_trace.start(args.trace, '%s(%s)' % (args.test_name,
+                                                     args.bundle_type))
+            atexit.register(util_trace.stop)
+
+        if args.plan_sessions:
+            # Planning only inspects the test methods, so neither lldb nor the
+            # device are needed
+            _plan_sessions(args)
+            _quit_test(util_constants.RC_TEST_OK, None)
+
         android = harness.UtilAndroid(args.adb_path,
                                       args.lldb_server_path_device,
                                       args.device)
 
         # start the timeout counter
-        timer = _initialise_timer(android, args.timeout)
+        timer = _initialise_timer(
+            android, args.timeout, _parse_phase_timeouts(args.phase_timeout))
 
         # startup lldb and register teardown handler
         atexit.register(UtilLLDB.stop)
@@ -337,8 +520,12 @@ def main():
             wimpy=args.wimpy
         )
 
+        if args.tests:
+            test_inst.selected_tests = args.tests.split(',')
+
         # instantiate a test target bundle
-        bundle = harness.UtilBundle(android, args.aosp_product_path)
+        bundle = harness.UtilBundle(android, args.aosp_product_path,
+                                    args.bundle_index)
 
         # execute the test case
         try:
@@ -358,12 +545,22 @@ def main():
                          pid=None,
                          name=args.test_name,
                          device_port=args.device_port,
-                         bundle_type=args.bundle_type
+                         bundle_type=args.bundle_type,
+                         keep_ndk_cache=args.keep_ndk_cache,
+                         cold_start=args.cold_start,
+                         timer=timer
                     )
 
                     util_warnings.redirect_warnings()
 
-                    _execute_test(state)
+                    if args.profile:
+                        _execute_profiled_test(state, args.profile,
+                                               args.log_session)
+                    else:
+                        _execute_test(state)
+
+                    if args.benchmark_results:
+                        _save_measurements(state, args.benchmark_results)
 
                     # tear down the lldb instance
                     UtilLLDB.destroy_debugger(lldb)
@@ -44,32 +44,26 @@ class ReductionMixin(object):
             func_suffixes = [combination[0][:4], combination[1][:4]]
             # just match the first 4 chars of the roles prefix
             funcs_match = 'find_min_user_type_((%s|%s))' % tuple(func_suffixes)
+            funcs_regex = re.compile(funcs_match)
             # now check we stop on both functions for each coordinate in the
             # allocation
-            for x in range(REDUCE_ITERATIONS):
-                output = self.try_command(
-                    'process continue',
-                    expected_regex=[
-                        r'resuming',
-                        r'Process \d+ stopped',
-                        r'frame #0: (0x[0-9a-fA-F]+ )?librs.reduce.so`%s' % funcs_match
-                    ]
-                )
-                for line in output.splitlines():
-                    match = re.search(funcs_match, line)
-                    if match:
-                        try:
-                            func_suffixes.remove(match.group(1))
-                        except ValueError:
-                            # The outconverter may only be called in the final
-                            # step but the accumulator will be called for every
-                            # input index
-                            continue
-                        break
-                if len(func_suffixes) == 0:
-                    # We've popped the functions we're interested in off the list
-                    break
-            else:
+
+            def seen_all_roles(stop):
+                '''Check the stop and whether both functions were hit.'''
+                match = funcs_regex.search(stop.function or '')
+                if (stop.reason != self._lldb.eStopReasonBreakpoint
+                        or stop.module != 'librs.reduce.so' or not match):
+                    raise self.TestFail(
+                        'Stopped in {0}`{1}, expected a breakpoint on {2}'
+                        .format(stop.module, stop.function, funcs_match))
+                # The outconverter may only be called in the final step but
+                # the accumulator will be called for every input index
+                if match.group(1) in func_suffixes:
+                    func_suffixes.remove(match.group(1))
+                # We've popped the functions we're interested in off the list
+                return not func_suffixes
+
+            if not self.continue_until(seen_all_roles, REDUCE_ITERATIONS):
                 raise self.TestFail(
                     "unable to match function roles for " + repr(combination))
 
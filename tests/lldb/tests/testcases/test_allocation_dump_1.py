@@ -18,14 +18,17 @@ from __future__ import absolute_import
 import os
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import AllocationAssertionsMixin
 from harness.decorators import (
     ordered_test,
+    provides_state,
+    requires_state,
     wimpy,
     cpp_only_test,
 )
 
 
-class TestAllocationDump1(TestBaseRemote):
+class TestAllocationDump1(TestBaseRemote, AllocationAssertionsMixin):
     '''Tests printing the contents of allocations.'''
 
     bundle_target = {
@@ -36,6 +39,7 @@ class TestAllocationDump1(TestBaseRemote):
 
     @wimpy
     @ordered_test(0)
+    @provides_state('first_kernel_stopped')
     def test_setup(self):
         self.try_command('language renderscript kernel breakpoint all enable',
                          ['Breakpoints will be set on all kernels'])
@@ -46,6 +50,7 @@ class TestAllocationDump1(TestBaseRemote):
                           'stop reason = breakpoint'])
 
     @wimpy
+    @requires_state('first_kernel_stopped')
     def test_dump_to_file1(self):
         # Test dumping large allocations to file
         output_file_1 = self.get_tmp_file_path()
@@ -58,6 +63,7 @@ class TestAllocationDump1(TestBaseRemote):
         self.assert_true(os.path.isfile(output_file_1))
         os.remove(output_file_1)
 
+    @requires_state('first_kernel_stopped')
     def test_dump_to_file2(self):
         output_file_2 = self.get_tmp_file_path()
 
@@ -69,6 +75,7 @@ class TestAllocationDump1(TestBaseRemote):
         os.remove(output_file_2)
 
     @wimpy
+    @requires_state('first_kernel_stopped')
     def test_dump_char(self):
         self.try_command('language renderscript allocation dump 3',
                          ['(0, 0, 0) = 0',
@@ -96,6 +103,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(0, 1, 7) = 22',
                           '(0, 2, 7) = 23'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_char2(self):
         self.try_command('language renderscript allocation dump 4',
                          ['(0, 0, 0) = {0 1}',
@@ -111,6 +119,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(10, 0, 0) = {20 21}',
                           '(11, 0, 0) = {22 23}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_char3(self):
         self.try_command('language renderscript allocation dump 5',
                          ['(0, 0, 0) = {0 1 2}',
@@ -120,6 +129,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(4, 0, 0) = {16 17 18}',
                           '(5, 0, 0) = {20 21 22}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_char4(self):
         self.try_command('language renderscript allocation dump 6',
                          ['(0, 0, 0) = {0 1 2 3}',
@@ -129,33 +139,12 @@ class TestAllocationDump1(TestBaseRemote):
                           '(4, 0, 0) = {16 17 18 19}',
                           '(5, 0, 0) = {20 21 22 23}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_short(self):
-        self.try_command('language renderscript allocation dump 7',
-                         ['(0, 0, 0) = 0',
-                          '(1, 0, 0) = 1',
-                          '(2, 0, 0) = 2',
-                          '(3, 0, 0) = 3',
-                          '(4, 0, 0) = 4',
-                          '(5, 0, 0) = 5',
-                          '(6, 0, 0) = 6',
-                          '(7, 0, 0) = 7',
-                          '(8, 0, 0) = 8',
-                          '(9, 0, 0) = 9',
-                          '(10, 0, 0) = 10',
-                          '(11, 0, 0) = 11',
-                          '(12, 0, 0) = 12',
-                          '(13, 0, 0) = 13',
-                          '(14, 0, 0) = 14',
-                          '(15, 0, 0) = 15',
-                          '(16, 0, 0) = 16',
-                          '(17, 0, 0) = 17',
-                          '(18, 0, 0) = 18',
-                          '(19, 0, 0) = 19',
-                          '(20, 0, 0) = 20',
-                          '(21, 0, 0) = 21',
-                          '(22, 0, 0) = 22',
-                          '(23, 0, 0) = 23'])
+        self.assert_allocation_dump(
+            7, dict(((x, 0, 0), x) for x in range(24)))
 
+    @requires_state('first_kernel_stopped')
     def test_dump_short2(self):
         self.try_command('language renderscript allocation dump 8',
                          ['(0, 0, 0) = {0 1}',
@@ -171,6 +160,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(4, 0, 1) = {20 21}',
                           '(5, 0, 1) = {22 23}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_short3(self):
         self.try_command('language renderscript allocation dump 9',
                          ['(0, 0, 0) = {0 1 2}',
@@ -180,6 +170,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(4, 0, 0) = {16 17 18}',
                           '(5, 0, 0) = {20 21 22}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_short4(self):
         self.try_command('language renderscript allocation dump 10',
                          ['(0, 0, 0) = {0 1 2 3}',
@@ -189,33 +180,12 @@ class TestAllocationDump1(TestBaseRemote):
                           '(4, 0, 0) = {16 17 18 19}',
                           '(5, 0, 0) = {20 21 22 23}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_int(self):
-        self.try_command('language renderscript allocation dump 11',
-                         ['(0, 0, 0) = 0',
-                          '(1, 0, 0) = 1',
-                          '(2, 0, 0) = 2',
-                          '(3, 0, 0) = 3',
-                          '(4, 0, 0) = 4',
-                          '(5, 0, 0) = 5',
-                          '(6, 0, 0) = 6',
-                          '(7, 0, 0) = 7',
-                          '(8, 0, 0) = 8',
-                          '(9, 0, 0) = 9',
-                          '(10, 0, 0) = 10',
-                          '(11, 0, 0) = 11',
-                          '(12, 0, 0) = 12',
-                          '(13, 0, 0) = 13',
-                          '(14, 0, 0) = 14',
-                          '(15, 0, 0) = 15',
-                          '(16, 0, 0) = 16',
-                          '(17, 0, 0) = 17',
-                          '(18, 0, 0) = 18',
-                          '(19, 0, 0) = 19',
-                          '(20, 0, 0) = 20',
-                          '(21, 0, 0) = 21',
-                          '(22, 0, 0) = 22',
-                          '(23, 0, 0) = 23'])
+        self.assert_allocation_dump(
+            11, dict(((x, 0, 0), x) for x in range(24)))
 
+    @requires_state('first_kernel_stopped')
     def test_dump_int2(self):
         self.try_command('language renderscript allocation dump 12',
                          ['(0, 0, 0) = {0 1}',
@@ -231,6 +201,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(10, 0, 0) = {20 21}',
                           '(11, 0, 0) = {22 23}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_int3(self):
         self.try_command('language renderscript allocation dump 13',
                          ['(0, 0, 0) = {0 1 2}',
@@ -240,6 +211,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(1, 1, 0) = {16 17 18}',
                           '(2, 1, 0) = {20 21 22}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_int4(self):
         self.try_command('language renderscript allocation dump 14',
                          ['(0, 0, 0) = {0 1 2 3}',
@@ -249,6 +221,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(4, 0, 0) = {16 17 18 19}',
                           '(5, 0, 0) = {20 21 22 23}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_int5(self):
         self.try_command('language renderscript allocation dump 15',
                          ['(0, 0, 0) = 0',
@@ -276,6 +249,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(22, 0, 0) = 22',
                           '(23, 0, 0) = 23'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_long2(self):
         self.try_command('language renderscript allocation dump 16',
                          ['(0, 0, 0) = {0 1}',
@@ -291,6 +265,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(10, 0, 0) = {20 21}',
                           '(11, 0, 0) = {22 23}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_long3(self):
         self.try_command('language renderscript allocation dump 17',
                          ['(0, 0, 0) = {0 1 2}',
@@ -300,6 +275,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(4, 0, 0) = {16 17 18}',
                           '(5, 0, 0) = {20 21 22}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_long4(self):
         self.try_command('language renderscript allocation dump 18',
                          ['(0, 0, 0) = {0 1 2 3}',
@@ -309,6 +285,7 @@ class TestAllocationDump1(TestBaseRemote):
                           '(0, 4, 0) = {16 17 18 19}',
                           '(0, 5, 0) = {20 21 22 23}'])
 
+    @requires_state('first_kernel_stopped')
     def test_dump_bool(self):
         self.try_command('language renderscript allocation dump 19',
                          ['(0, 0, 0) = false',
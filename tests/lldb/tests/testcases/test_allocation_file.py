@@ -19,13 +19,14 @@ from __future__ import absolute_import
 import os
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import AllocationAssertionsMixin
 from harness.decorators import (
     cpp_only_test,
     ordered_test
 )
 
 
-class TestAllocationFile(TestBaseRemote):
+class TestAllocationFile(TestBaseRemote, AllocationAssertionsMixin):
     '''Tests saving the contents of allocations to disk and reloading them.'''
 
     bundle_target = {
@@ -141,31 +142,7 @@ class TestAllocationFile(TestBaseRemote):
                           'stop reason = breakpoint'])
 
         # Test that uint allocation has been squared by square_kernel
-        self.try_command('language renderscript allocation dump 28',
-                         ['(0, 0, 0) = 0',
-                          '(1, 0, 0) = 1',
-                          '(2, 0, 0) = 4',
-                          '(3, 0, 0) = 9',
-                          '(4, 0, 0) = 16',
-                          '(5, 0, 0) = 25',
-                          '(6, 0, 0) = 36',
-                          '(7, 0, 0) = 49',
-                          '(8, 0, 0) = 64',
-                          '(9, 0, 0) = 81',
-                          '(10, 0, 0) = 100',
-                          '(11, 0, 0) = 121',
-                          '(12, 0, 0) = 144',
-                          '(13, 0, 0) = 169',
-                          '(14, 0, 0) = 196',
-                          '(15, 0, 0) = 225',
-                          '(16, 0, 0) = 256',
-                          '(17, 0, 0) = 289',
-                          '(18, 0, 0) = 324',
-                          '(19, 0, 0) = 361',
-                          '(20, 0, 0) = 400',
-                          '(21, 0, 0) = 441',
-                          '(22, 0, 0) = 484',
-                          '(23, 0, 0) = 529'])
+        self.assert_allocation_contents(28, [x * x for x in range(24)])
 
         # Load uint allocation from save before square_kernel had been run
         self.try_command('language renderscript allocation load 28 ' +
@@ -175,31 +152,7 @@ class TestAllocationFile(TestBaseRemote):
         os.remove(file_uint)
 
         # Check contents are back to original
-        self.try_command('language renderscript allocation dump 28',
-                         ['(0, 0, 0) = 0',
-                          '(1, 0, 0) = 1',
-                          '(2, 0, 0) = 2',
-                          '(3, 0, 0) = 3',
-                          '(4, 0, 0) = 4',
-                          '(5, 0, 0) = 5',
-                          '(6, 0, 0) = 6',
-                          '(7, 0, 0) = 7',
-                          '(8, 0, 0) = 8',
-                          '(9, 0, 0) = 9',
-                          '(10, 0, 0) = 10',
-                          '(11, 0, 0) = 11',
-                          '(12, 0, 0) = 12',
-                          '(13, 0, 0) = 13',
-                          '(14, 0, 0) = 14',
-                          '(15, 0, 0) = 15',
-                          '(16, 0, 0) = 16',
-                          '(17, 0, 0) = 17',
-                          '(18, 0, 0) = 18',
-                          '(19, 0, 0) = 19',
-                          '(20, 0, 0) = 20',
-                          '(21, 0, 0) = 21',
-                          '(22, 0, 0) = 22',
-                          '(23, 0, 0) = 23'])
+        self.assert_allocation_contents(28, range(24))
 
     @ordered_test('last')
     @cpp_only_test()
@@ -17,6 +17,7 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import AllocationAssertionsMixin
 from harness.decorators import (
     ordered_test,
     wimpy,
@@ -25,7 +26,7 @@ from harness.decorators import (
 )
 
 
-class TestAllocationList(TestBaseRemote):
+class TestAllocationList(TestBaseRemote, AllocationAssertionsMixin):
     '''Tests printing the details of all allocations.'''
 
     bundle_target = {
@@ -37,7 +38,6 @@ class TestAllocationList(TestBaseRemote):
     @wimpy
     @ordered_test(0)
     def test_allocation_list_single(self):
-        # pylint: disable=anomalous-backslash-in-string
         self.try_command('language renderscript kernel breakpoint all enable',
                          ['Breakpoints will be set on all kernels'])
 
@@ -47,155 +47,31 @@ class TestAllocationList(TestBaseRemote):
                           'stop reason = breakpoint'])
 
         # Test command line flag for single allocation
-        self.try_command('language renderscript allocation list -i 3',
-                         [],
-                         ['3:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(1, 3, 8\)\n'
-                          '    Data Type: char\n'
-                          '    Data Kind: User'])
+        self.assert_allocation_details(3, (1, 3, 8), 'char', 'User')
 
     @ordered_test(1)
     def test_allocation_list_all(self):
-        self.try_command('language renderscript allocation list',
-                         [],
-                         ['1:\n'
-                         # Regex for non zero hex number
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(64, 64, 0\)\n'
-                          '    Data Type: uchar4\n'
-                          '    Data Kind: RGBA Pixel',
-                          '2:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(64, 64, 0\)\n'
-                          '    Data Type: uchar4\n'
-                          '    Data Kind: RGBA Pixel',
-                          '3:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(1, 3, 8\)\n'
-                          '    Data Type: char\n'
-                          '    Data Kind: User',
-                          '4:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(12, 0, 0\)\n'
-                          '    Data Type: char2\n'
-                          '    Data Kind: User',
-                          '5:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: char3\n'
-                          '    Data Kind: User',
-                          '6:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: char4\n'
-                          '    Data Kind: User',
-                          '7:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: short\n'
-                          '    Data Kind: User',
-                          '8:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 1, 2\)\n'
-                          '    Data Type: short2\n'
-                          '    Data Kind: User',
-                          '9:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: short3\n'
-                          '    Data Kind: User',
-                          '10:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: short4\n'
-                          '    Data Kind: User',
-                          '11:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: int\n'
-                          '    Data Kind: User',
-                          '12:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(12, 0, 0\)\n'
-                          '    Data Type: int2\n'
-                          '    Data Kind: User',
-                          '13:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(3, 2, 0\)\n'
-                          '    Data Type: int3\n'
-                          '    Data Kind: User',
-                          '14:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: int4\n'
-                          '    Data Kind: User',
-                          '15:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: long\n'
-                          '    Data Kind: User',
-                          '16:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(12, 0, 0\)\n'
-                          '    Data Type: long2\n'
-                          '    Data Kind: User',
-                          '17:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: long3\n'
-                          '    Data Kind: User',
-                          '18:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(1, 6, 0\)\n'
-                          '    Data Type: long4\n'
-                          '    Data Kind: User',
-                          '19:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: bool\n'
-                          '    Data Kind: User'
-                         ])
+        self.assert_allocation_list({
+            1: ((64, 64, 0), 'uchar4', 'RGBA Pixel'),
+            2: ((64, 64, 0), 'uchar4', 'RGBA Pixel'),
+            3: ((1, 3, 8), 'char', 'User'),
+            4: ((12, 0, 0), 'char2', 'User'),
+            5: ((6, 0, 0), 'char3', 'User'),
+            6: ((6, 0, 0), 'char4', 'User'),
+            7: ((24, 0, 0), 'short', 'User'),
+            8: ((6, 1, 2), 'short2', 'User'),
+            9: ((6, 0, 0), 'short3', 'User'),
+            10: ((6, 0, 0), 'short4', 'User'),
+            11: ((24, 0, 0), 'int', 'User'),
+            12: ((12, 0, 0), 'int2', 'User'),
+            13: ((3, 2, 0), 'int3', 'User'),
+            14: ((6, 0, 0), 'int4', 'User'),
+            15: ((24, 0, 0), 'long', 'User'),
+            16: ((12, 0, 0), 'long2', 'User'),
+            17: ((6, 0, 0), 'long3', 'User'),
+            18: ((1, 6, 0), 'long4', 'User'),
+            19: ((24, 0, 0), 'bool', 'User'),
+        })
 
     @wimpy
     @ordered_test(2)
@@ -211,151 +87,30 @@ class TestAllocationList(TestBaseRemote):
 
     @ordered_test(3)
     def test_allocation_list_all2_java(self):
+        expected = {
+            2: ((64, 64, 0), 'uchar4', 'RGBA Pixel'),
+            7: ((24, 0, 0), 'short', 'User'),
+            20: ((24, 0, 0), 'uchar', 'User'),
+            21: ((2, 6, 0), 'uchar2', 'User'),
+            22: ((6, 0, 0), 'uchar3', 'User'),
+            23: ((6, 0, 0), 'uchar4', 'User'),
+            24: ((24, 0, 0), 'ushort', 'User'),
+            25: ((12, 0, 0), 'ushort2', 'User'),
+            26: ((1, 6, 0), 'ushort3', 'User'),
+            27: ((6, 0, 0), 'ushort4', 'User'),
+            28: ((24, 0, 0), 'uint', 'User'),
+            29: ((12, 0, 0), 'uint2', 'User'),
+            30: ((6, 0, 0), 'uint3', 'User'),
+            31: ((1, 1, 6), 'uint4', 'User'),
+            32: ((4, 3, 2), 'ulong', 'User'),
+            33: ((12, 0, 0), 'ulong2', 'User'),
+            34: ((6, 0, 0), 'ulong3', 'User'),
+            35: ((6, 0, 0), 'ulong4', 'User'),
+        }
         # TODO investigate why java tests show extra allocations
         if self.app_type == 'java':
-            allocation_1_re = [
-                '1:\n'
-                # Regex for non zero hex number
-                '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                '    Dimensions: \(64, 64, 0\)\n'
-                '    Data Type: uchar4\n'
-                '    Data Kind: RGBA Pixel'
-            ]
-        else:
-            allocation_1_re = []
-
-        self.try_command('language renderscript allocation list',
-                         [],
-                         allocation_1_re +
-                         ['2:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(64, 64, 0\)\n'
-                          '    Data Type: uchar4\n'
-                          '    Data Kind: RGBA Pixel',
-                          '7:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: short\n'
-                          '    Data Kind: User',
-                          '20:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: uchar\n'
-                          '    Data Kind: User',
-                          '21:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(2, 6, 0\)\n'
-                          '    Data Type: uchar2\n'
-                          '    Data Kind: User',
-                          '22:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: uchar3\n'
-                          '    Data Kind: User',
-                          '23:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: uchar4\n'
-                          '    Data Kind: User',
-                          '24:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: ushort\n'
-                          '    Data Kind: User',
-                          '25:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(12, 0, 0\)\n'
-                          '    Data Type: ushort2\n'
-                          '    Data Kind: User',
-                          '26:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(1, 6, 0\)\n'
-                          '    Data Type: ushort3\n'
-                          '    Data Kind: User',
-                          '27:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: ushort4\n'
-                          '    Data Kind: User',
-                          '28:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: uint\n'
-                          '    Data Kind: User',
-                          '29:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(12, 0, 0\)\n'
-                          '    Data Type: uint2\n'
-                          '    Data Kind: User',
-                          '30:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: uint3\n'
-                          '    Data Kind: User',
-                          '31:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(1, 1, 6\)\n'
-                          '    Data Type: uint4\n'
-                          '    Data Kind: User',
-                          '32:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(4, 3, 2\)\n'
-                          '    Data Type: ulong\n'
-                          '    Data Kind: User',
-                          '33:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(12, 0, 0\)\n'
-                          '    Data Type: ulong2\n'
-                          '    Data Kind: User',
-                          '34:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: ulong3\n'
-                          '    Data Kind: User',
-                          '35:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: ulong4\n'
-                          '    Data Kind: User'
-                         ])
+            expected[1] = ((64, 64, 0), 'uchar4', 'RGBA Pixel')
+        self.assert_allocation_list(expected)
 
     @wimpy
     @ordered_test(4)
@@ -371,113 +126,23 @@ class TestAllocationList(TestBaseRemote):
 
     @ordered_test(5)
     def test_allocation_list_all3(self):
-        self.try_command('language renderscript allocation list',
-                         [],
-                         ['2:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(64, 64, 0\)\n'
-                          '    Data Type: uchar4\n'
-                          '    Data Kind: RGBA Pixel',
-                          '7:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: short\n'
-                          '    Data Kind: User',
-                          '28:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: uint\n'
-                          '    Data Kind: User',
-                          '36:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: half\n'
-                          '    Data Kind: User',
-                          '37:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(12, 0, 0\)\n'
-                          '    Data Type: half2\n'
-                          '    Data Kind: User',
-                          '38:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(1, 6, 0\)\n'
-                          '    Data Type: half3\n'
-                          '    Data Kind: User',
-                          '39:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: half4\n'
-                          '    Data Kind: User',
-                          '40:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: float\n'
-                          '    Data Kind: User',
-                          '41:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(12, 0, 0\)\n'
-                          '    Data Type: float2\n'
-                          '    Data Kind: User',
-                          '42:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(6, 0, 0\)\n'
-                          '    Data Type: float3\n'
-                          '    Data Kind: User',
-                          '43:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(3, 2, 0\)\n'
-                          '    Data Type: float4\n'
-                          '    Data Kind: User',
-                          '44:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: double\n'
-                          '    Data Kind: User',
-                          '45:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(4, 1, 3\)\n'
-                          '    Data Type: double2\n'
-                          '    Data Kind: User',
-                          '46:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(1, 2, 3\)\n'
-                          '    Data Type: double3\n'
-                          '    Data Kind: User',
-                          '47:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(1, 2, 3\)\n'
-                          '    Data Type: double4\n'
-                          '    Data Kind: User'])
+        self.assert_allocation_list({
+            2: ((64, 64, 0), 'uchar4', 'RGBA Pixel'),
+            7: ((24, 0, 0), 'short', 'User'),
+            28: ((24, 0, 0), 'uint', 'User'),
+            36: ((24, 0, 0), 'half', 'User'),
+            37: ((12, 0, 0), 'half2', 'User'),
+            38: ((1, 6, 0), 'half3', 'User'),
+            39: ((6, 0, 0), 'half4', 'User'),
+            40: ((24, 0, 0), 'float', 'User'),
+            41: ((12, 0, 0), 'float2', 'User'),
+            42: ((6, 0, 0), 'float3', 'User'),
+            43: ((3, 2, 0), 'float4', 'User'),
+            44: ((24, 0, 0), 'double', 'User'),
+            45: ((4, 1, 3), 'double2', 'User'),
+            46: ((1, 2, 3), 'double3', 'User'),
+            47: ((1, 2, 3), 'double4', 'User'),
+        })
 
     @wimpy
     @ordered_test(6)
@@ -492,51 +157,14 @@ class TestAllocationList(TestBaseRemote):
                           'stopped',
                           'stop reason = breakpoint'])
 
-        self.try_command('language renderscript allocation list',
-                         [],
-                         ['2:\n'
-                          # Regex for non zero hex number
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(64, 64, 0\)\n'
-                          '    Data Type: uchar4\n'
-                          '    Data Kind: RGBA Pixel',
-                          '7:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: short\n'
-                          '    Data Kind: User',
-                          '28:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: uint\n'
-                          '    Data Kind: User',
-                          '46:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(1, 2, 3\)\n'
-                          '    Data Type: double3\n'
-                          '    Data Kind: User',
-                          '48:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: complexStruct\n'
-                          '    Data Kind: User',
-                          '49:\n'
-                          '    Context: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Address: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Data pointer: 0x0*[1-9a-fA-F][0-9a-fA-F]*\n'
-                          '    Dimensions: \(24, 0, 0\)\n'
-                          '    Data Type: complexStruct\n'
-                          '    Data Kind: User'])
+        self.assert_allocation_list({
+            2: ((64, 64, 0), 'uchar4', 'RGBA Pixel'),
+            7: ((24, 0, 0), 'short', 'User'),
+            28: ((24, 0, 0), 'uint', 'User'),
+            46: ((1, 2, 3), 'double3', 'User'),
+            48: ((24, 0, 0), 'complexStruct', 'User'),
+            49: ((24, 0, 0), 'complexStruct', 'User'),
+        })
 
     @ordered_test(7)
     @cpp_only_test()
@@ -17,13 +17,14 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     ordered_test,
     cpp_only_test,
 )
 
 
-class TestBacktrace(TestBaseRemote):
+class TestBacktrace(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests breaking on a kernel and a function, and viewing the call stack.'''
 
     bundle_target = {
@@ -34,9 +35,7 @@ class TestBacktrace(TestBaseRemote):
 
     def test_kernel_backtrace(self):
         # pylint: disable=line-too-long
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('language renderscript kernel breakpoint set simple_kernel',
                          ['Breakpoint(s) created',
@@ -17,13 +17,14 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     cpp_only_test,
     ordered_test
 )
 
 
-class TestBreakpointFileLine(TestBaseRemote):
+class TestBreakpointFileLine(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests the setting of a breakpoint on a specific line of a RS file.'''
 
     bundle_target = {
@@ -34,9 +35,7 @@ class TestBreakpointFileLine(TestBaseRemote):
 
     @ordered_test(0)
     def test_breakpoint_fileline(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('breakpoint set --file simple.rs --line 28',
                          ['(pending)'])
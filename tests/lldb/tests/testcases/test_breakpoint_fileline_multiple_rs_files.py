@@ -17,13 +17,15 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     cpp_only_test,
     ordered_test
 )
 
 
-class TestBreakpointFileLineMultipleRSFiles(TestBaseRemote):
+class TestBreakpointFileLineMultipleRSFiles(
+        TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests the setting of a breakpoint on one of multiple RS files.'''
 
     bundle_target = {
@@ -41,9 +43,7 @@ class TestBreakpointFileLineMultipleRSFiles(TestBaseRemote):
 
     @ordered_test(0)
     def test_breakpoint_fileline_multiple_files(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('breakpoint set --file first.rs --line 28',
                          ['(pending)'])
@@ -17,13 +17,14 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     ordered_test,
     cpp_only_test
 )
 
 
-class TestBreakpointKernel1(TestBaseRemote):
+class TestBreakpointKernel1(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests the setting of a breakpoint on a RS kernel.'''
 
     bundle_target = {
@@ -35,9 +36,7 @@ class TestBreakpointKernel1(TestBaseRemote):
     @ordered_test(0)
     def test_breakpoint_set_nonexistent_kernel(self):
         # pylint: disable=line-too-long
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('language renderscript kernel breakpoint set simple_kernel',
                          ['Breakpoint(s) created',
@@ -16,18 +16,55 @@
 
 from __future__ import absolute_import
 
-import re
-import string
-
 from harness.test_base_remote import TestBaseRemote
-from harness import RS_funs
+from harness.assert_mixins import RuntimeAssertionsMixin
+from harness.exception import TestSuiteException
+from harness import RS_funs, util_log, util_rs_oracle, util_rs_spec
 from harness.decorators import (
     wimpy,
     ordered_test,
     cpp_only_test,
+    skip_conditional,
+    provides_state,
+    requires_state,
 )
 
 
+def _make_expr_test(entry):
+    """
+    Make the test method evaluating an entry of the expression table.
+    """
+    @ordered_test(entry.index)
+    @requires_state('stopped_in_simple_rs')
+    def test(self):
+        self.try_expr_entry(entry)
+
+    # Make a pretty python method that adheres to the testcase standard
+    test.func_name = entry.test_name
+    # We mark every 10th test case as runnable in wimpy mode
+    return wimpy(test) if entry.index % 10 == 0 else test
+
+
+def _make_bulk_test(name, entries):
+    """
+    Make the test method evaluating a batch of entries of the expression
+    table with a single lldb expression.
+    """
+    @ordered_test(entries[0].index)
+    @requires_state('stopped_in_simple_rs')
+    def test(self):
+        self.try_bulk_entries(entries)
+
+    test.func_name = name
+    return wimpy(test) if any(entry.index % 10 == 0
+                              for entry in entries) else test
+
+
+def _bulk_test_name(batch):
+    """The name of the test method evaluating a batch of expressions."""
+    return 'test_bulk_exprs_%d' % batch
+
+
 class _APIFunsExprTestsMeta(type):
     """
     Generate unique, standalone test methods from a list of lldb expressions.
@@ -36,57 +73,128 @@ class _APIFunsExprTestsMeta(type):
     write the 1000s of individual test cases, we automatically generate them
     and their variants to add to the test class. This is done from a list
     of expressions that are all tested in the same way.
+
+    The methods are only added to the class when a test run needs them, see
+    `materialize_expr_tests`, as most runs only select a subset of them.
+    When the class sets `bulk_expressions`, the expressions are evaluated by
+    batches, a method per batch, unless methods of single expressions are
+    explicitly selected.
     """
-    def __new__(self, name, bases, class_dict):
-        func_name_sub = re.compile(r'[%s\s]+' % string.punctuation)
-
-        for count, line in enumerate(RS_funs.FUNC_LIST):
-            def make_test(line):
-                """
-                We use an extra level of indirection here to properly
-                close over the *value* of the loop variable, `line`
-                """
-                @ordered_test(count)
-                def test(self):
-                    # build the expression
-                    ret, expr = RS_funs.build_expr(line)
-                    try:
-                        # evaluate the expression with expected return value
-                        self.try_command(expr, [], [RS_funs.TYPE_MAP[ret]])
-                    except KeyError:
-                        # or just check the return type if no return value
-                        # specified
-                        self.try_command(expr, '(%s)' % ret)
-                return test
-
-            # Make a pretty python method that adheres to the testcase standard
-            # Use the `count` parameter to ensure the name is unique in the class
-            test_name = 'test_%s_%s' % (re.sub(func_name_sub, '_', line), count)
-            test = make_test(line)
-            test.func_name = test_name
-            # We mark every 10th test case as runnable in wimpy mode
-            class_dict[test_name] = wimpy(test) if count % 10 == 0 else test
-
-        return type(name, bases, class_dict)
-
-
-class TestCallApiFuns(TestBaseRemote):
+    def materialize_expr_tests(cls, names=None, wimpy_only=False):
+        """
+        Add to the class the test methods of the selected expressions.
+
+        Args:
+            names: Iterable of the names of the test methods wanted, or None
+                   for all of them.
+            wimpy_only: Boolean, whether only the wimpy methods are wanted.
+        """
+        names = set(names) if names is not None else None
+        wanted = lambda entry: not wimpy_only or entry.index % 10 == 0
+
+        if getattr(cls, 'bulk_expressions', False):
+            for batch, entries in enumerate(RS_funs.bulk_batches()):
+                name = _bulk_test_name(batch)
+                entries = [entry for entry in entries if wanted(entry)]
+                if (names is None or name in names) and entries and \
+                        name not in cls.__dict__:
+                    setattr(cls, name, _make_bulk_test(name, entries))
+            if names is None:
+                return
+
+        for entry in RS_funs.expression_table():
+            if not wanted(entry):
+                continue
+            if names is not None and entry.test_name not in names:
+                continue
+            if entry.test_name not in cls.__dict__:
+                setattr(cls, entry.test_name, _make_expr_test(entry))
+
+
+class TestCallApiFuns(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests calling of some RS API functions. This tests that JITing works.'''
 
     __metaclass__ = _APIFunsExprTestsMeta
 
+    # evaluate the API calls by batches, see RS_funs.build_bulk_expr
+    bulk_expressions = True
+
     bundle_target = {
         'java': "KernelVariables",
         'jni': "JNIKernelVariables",
         'cpp': "CppKernelVariables"
     }
 
+    def get_test_methods(self):
+        type(self).materialize_expr_tests(self.selected_tests, self.wimpy)
+        return super(TestCallApiFuns, self).get_test_methods()
+
+    def try_expr_entry(self, entry):
+        '''Evaluate a single expression of the expression table.
+
+        Args:
+            entry: The RS_funs.ExprEntry to evaluate.
+
+        Raises:
+            TestFail: The call failed or returned an unexpected type.
+        '''
+        try:
+            # evaluate the expression with expected return value
+            self.try_command(entry.expr, [], [RS_funs.TYPE_MAP[entry.ret]])
+        except KeyError:
+            # or just check the return type if no return value
+            # specified
+            self.try_command(entry.expr, '(%s)' % entry.ret)
+
+    def try_bulk_entries(self, entries):
+        '''Evaluate a batch of expressions of the expression table at once.
+
+        The calls whose return type can not be confirmed from the bulk
+        expression, e.g. because it failed to evaluate, are evaluated again on
+        their own, so that a failure is reported against its own line of
+        FUNC_LIST.
+
+        Args:
+            entries: List of RS_funs.ExprEntry.
+
+        Raises:
+            TestFail: One of the calls failed or returned an unexpected type.
+        '''
+        log = util_log.get_logger()
+        try:
+            types = RS_funs.parse_bulk_types(
+                self.do_command(RS_funs.build_bulk_expr(entries)))
+            succeeded = True
+        except self.TestFail as error:
+            log.info('Bulk expression failed, evaluating each call: %s',
+                     error)
+            types = {}
+            succeeded = False
+
+        failures = []
+        for index, entry in enumerate(entries):
+            if entry.ret == 'void':
+                # there is nothing else to check than the call succeeded
+                confirmed = succeeded
+            else:
+                confirmed = index in types and RS_funs.check_type(
+                    entry.ret, types[index])
+            if confirmed:
+                continue
+            try:
+                self.try_expr_entry(entry)
+            except self.TestFail as error:
+                failures.append('{0}: {1}'.format(entry.line.strip(), error))
+
+        if failures:
+            raise self.TestFail('{0} of {1} calls failed:\n{2}'.format(
+                len(failures), len(entries), '\n'.join(failures)))
+
     @wimpy
     @ordered_test(-2)
+    @provides_state('stopped_in_simple_rs')
     def test_setup(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('b -f simple.rs -l 145', [])
 
@@ -97,97 +205,108 @@ class TestCallApiFuns(TestBaseRemote):
 
     @wimpy
     @ordered_test(-1)
+    @requires_state('stopped_in_simple_rs')
     def test_call_api_funs_atomic(self):
-        # Test the atomics separately because we want to check the output
-        # AtomicAdd(1234, 2)
-        self.try_command('expr rsAtomicAdd(&int_global, 2)',
-                         ['1234'],
-                         [r'\(int(32_t)?\)'])
-
-        self.try_command('expr int_global',
-                         ['(int)',
-                          '1236'])
-
-        # AtomicAnd(2345, 333)
-        self.try_command('expr rsAtomicAnd(&uint_global, 333)',
-                         ['2345'],
-                         [r'\(int(32_t)?\)'])
-
-        self.try_command('expr uint_global',
-                         ['(uint)',
-                          '265'])
-
-        # AtomicCas(1236, 1236, 2345)
-        self.try_command('expr rsAtomicCas(&int_global, 1236, 2345)',
-                         ['1236'],
-                         [r'\(int(32_t)?\)'])
-
-        self.try_command('expr int_global',
-                         ['(int)',
-                          '2345'])
-
-        # AtomicDec(265)
-        self.try_command('expr rsAtomicDec(&uint_global)',
-                         ['265'],
-                         [r'\(int(32_t)?\)'])
-
-        self.try_command('expr uint_global',
-                         ['(uint)',
-                          '264'])
-
-        # AtomicInc(2345)
-        self.try_command('expr rsAtomicInc(&int_global)',
-                         ['2345'],
-                         [r'\(int(32_t)?\)'])
-
-        self.try_command('expr int_global',
-                         ['(int)',
-                          '2346'])
-
-        # AtomicMax(264, 3456)
-        self.try_command('expr rsAtomicMax(&uint_global, 3456)',
-                         ['264'],
-                         [r'\(uint(32_t)?\)'])
-
-        self.try_command('expr uint_global',
-                         ['(uint)',
-                          '3456'])
-
-        # AtomicMin(2346, 3)
-        self.try_command('expr rsAtomicMin(&int_global, 3)',
-                         ['2346'],
-                         [r'\(int(32_t)?\)'])
-
-        self.try_command('expr int_global',
-                         ['(int)',
-                          '3'])
-
-        # AtomicOr(3, 456)
-        self.try_command('expr rsAtomicOr(&int_global, 456)',
-                         ['3'],
-                         [r'\(int(32_t)?\)'])
-
-        self.try_command('expr int_global',
-                         ['(int)',
-                          '459'])
-
-        # AtomicSub(3456, 7)
-        self.try_command('expr rsAtomicSub(&uint_global, 7)',
-                         ['3456'],
-                         [r'\(int(32_t)?\)'])
-
-        self.try_command('expr uint_global',
-                         ['(uint)',
-                          '3449'])
-
-        # AtomicXor(459, 89)
-        self.try_command('expr rsAtomicXor(&int_global, 89)',
-                         ['459'],
-                         [r'\(int(32_t)?\)'])
-
-        self.try_command('expr int_global',
-                         ['(int)',
-                          '402'])
+        # Test the atomics separately because we want to check the output.
+        # They are sent to lldb in a single batch.
+        self.try_commands([
+            # AtomicAdd(1234, 2)
+            ('expr rsAtomicAdd(&int_global, 2)',
+             ['1234'],
+             [r'\(int(32_t)?\)']),
+            ('expr int_global',
+             ['(int)', '1236']),
+            # AtomicAnd(2345, 333)
+            ('expr rsAtomicAnd(&uint_global, 333)',
+             ['2345'],
+             [r'\(int(32_t)?\)']),
+            ('expr uint_global',
+             ['(uint)', '265']),
+            # AtomicCas(1236, 1236, 2345)
+            ('expr rsAtomicCas(&int_global, 1236, 2345)',
+             ['1236'],
+             [r'\(int(32_t)?\)']),
+            ('expr int_global',
+             ['(int)', '2345']),
+            # AtomicDec(265)
+            ('expr rsAtomicDec(&uint_global)',
+             ['265'],
+             [r'\(int(32_t)?\)']),
+            ('expr uint_global',
+             ['(uint)', '264']),
+            # AtomicInc(2345)
+            ('expr rsAtomicInc(&int_global)',
+             ['2345'],
+             [r'\(int(32_t)?\)']),
+            ('expr int_global',
+             ['(int)', '2346']),
+            # AtomicMax(264, 3456)
+            ('expr rsAtomicMax(&uint_global, 3456)',
+             ['264'],
+             [r'\(uint(32_t)?\)']),
+            ('expr uint_global',
+             ['(uint)', '3456']),
+            # AtomicMin(2346, 3)
+            ('expr rsAtomicMin(&int_global, 3)',
+             ['2346'],
+             [r'\(int(32_t)?\)']),
+            ('expr int_global',
+             ['(int)', '3']),
+            # AtomicOr(3, 456)
+            ('expr rsAtomicOr(&int_global, 456)',
+             ['3'],
+             [r'\(int(32_t)?\)']),
+            ('expr int_global',
+             ['(int)', '459']),
+            # AtomicSub(3456, 7)
+            ('expr rsAtomicSub(&uint_global, 7)',
+             ['3456'],
+             [r'\(int(32_t)?\)']),
+            ('expr uint_global',
+             ['(uint)', '3449']),
+            # AtomicXor(459, 89)
+            ('expr rsAtomicXor(&int_global, 89)',
+             ['459'],
+             [r'\(int(32_t)?\)']),
+            ('expr int_global',
+             ['(int)', '402'])
+        ])
+
+    @requires_state('stopped_in_simple_rs')
+    @skip_conditional(lambda self: not util_rs_oracle.have_numpy(),
+                      'NumPy is required to check the values')
+    def test_math_values(self):
+        '''Check the values of the math builtins over sweeps of inputs.
+
+        Each function is evaluated on all its inputs with a single lldb
+        expression and the results are checked against the host reference
+        implementation of util_rs_oracle.
+        '''
+        failures = []
+        for index, signature in enumerate(
+                util_rs_oracle.sweep_signatures(RS_funs.API_LEVEL)):
+            inputs = util_rs_oracle.sample_inputs(signature, seed=index)
+            expr = util_rs_oracle.build_sweep_expr(signature, inputs)
+            try:
+                actual = util_rs_oracle.parse_sweep_values(
+                    self.do_command(expr), len(inputs[0]))
+            except (self.TestFail, TestSuiteException) as error:
+                failures.append('{0}: {1}'.format(
+                    util_rs_spec.format_signature(signature), error))
+                continue
+
+            mismatches = util_rs_oracle.check(signature, inputs, actual)
+            if mismatches:
+                first = mismatches[0]
+                failures.append(
+                    '{0}: {1} of {2} values out of tolerance, e.g. {3}{4} = {5}'
+                    ' instead of {6}'.format(
+                        util_rs_spec.format_signature(signature),
+                        len(mismatches), len(actual), signature.name,
+                        tuple(first.args), first.actual, first.expected))
+
+        if failures:
+            raise self.TestFail('\n'.join(failures))
 
     @ordered_test('last')
     @cpp_only_test()
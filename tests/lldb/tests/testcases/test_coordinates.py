@@ -17,13 +17,14 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     ordered_test,
     cpp_only_test
 )
 
 
-class TestCoordinates(TestBaseRemote):
+class TestCoordinates(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests the inspection of coordinates.
 
     Tests the inspection of the range and dimension of coordinates as well
@@ -54,9 +55,7 @@ class TestCoordinates(TestBaseRemote):
     @ordered_test(0)
     def test_inspect_coordinates(self):
         # pylint: disable=line-too-long
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('language renderscript kernel breakpoint set simple_kernel',
                          ['Breakpoint(s) created',
@@ -103,26 +102,23 @@ class TestCoordinates(TestBaseRemote):
             TestFail: One of the lldb commands did not provide the expected
                       output.
         '''
-        self.try_command('language renderscript kernel coordinate',
-                         ['Coordinate: (%d, %d, %d)'
-                          % (x_coord, y_coord, z_coord)])
-
-        self.try_command('frame select 1',
-                         ['librs.simple.so`simple_kernel.expand',
-                         'at generated.rs:1'])
-
-        # Inspect the invocation length, should be the same every time.
-        self.try_command('expr p->dim',
-                         ['x = 8',
-                          'y = 8',
-                          'z = 0'])
-
-        # The X coordinate is in the rsIndex variable.
-        self.try_command('expr rsIndex',
-                          ['= ' + str(x_coord)])
-
-        # Inspect the Y and Z coordinates.
-        self.try_command('expr p->current',
-                         ['x = ' + str(0),
-                          'y = ' + str(y_coord),
-                          'z = ' + str(z_coord)])
+        self.try_commands([
+            ('language renderscript kernel coordinate',
+             ['Coordinate: (%d, %d, %d)' % (x_coord, y_coord, z_coord)]),
+            ('frame select 1',
+             ['librs.simple.so`simple_kernel.expand',
+              'at generated.rs:1']),
+            # Inspect the invocation length, should be the same every time.
+            ('expr p->dim',
+             ['x = 8',
+              'y = 8',
+              'z = 0']),
+            # The X coordinate is in the rsIndex variable.
+            ('expr rsIndex',
+             ['= ' + str(x_coord)]),
+            # Inspect the Y and Z coordinates.
+            ('expr p->current',
+             ['x = ' + str(0),
+              'y = ' + str(y_coord),
+              'z = ' + str(z_coord)])
+        ])
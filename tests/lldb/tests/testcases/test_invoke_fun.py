@@ -17,13 +17,14 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     ordered_test,
     cpp_only_test
 )
 
 
-class TestInvokeFun(TestBaseRemote):
+class TestInvokeFun(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests debugging a function executed from Java using invoke_*.'''
 
     bundle_target = {
@@ -34,9 +35,7 @@ class TestInvokeFun(TestBaseRemote):
 
     def test_invoke_fun(self):
         # pylint: disable=line-too-long
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('breakpoint set --name addToGlobal',
                          ['Breakpoint 1', '(pending)'])
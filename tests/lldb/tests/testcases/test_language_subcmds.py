@@ -19,13 +19,14 @@ from __future__ import absolute_import
 import os
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     cpp_only_test,
     ordered_test,
 )
 
 
-class TestLanguageSubcmds(TestBaseRemote):
+class TestLanguageSubcmds(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests the 'language renderscript' subcommands.'''
 
     bundle_target = {
@@ -53,16 +54,14 @@ class TestLanguageSubcmds(TestBaseRemote):
         self.try_command('language',
                          [])
 
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered',
-                          'Runtime functions hooked',
-                          'rsdAllocationInit',
-                          'rsdAllocationRead2D',
-                          'rsdScriptInit',
-                          'rsdScriptInvokeForEach',
-                          'rsdScriptInvokeForEachMulti',
-                          'rsdScriptSetGlobalVar'])
+        self.assert_runtime_status([
+            'rsdAllocationInit',
+            'rsdAllocationRead2D',
+            'rsdScriptInit',
+            'rsdScriptInvokeForEach',
+            'rsdScriptInvokeForEachMulti',
+            'rsdScriptSetGlobalVar',
+        ])
 
         self.try_command('breakpoint set --file simple.rs --line 28',
                          ['(pending)'])
@@ -19,13 +19,14 @@ from __future__ import absolute_import
 import os
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     cpp_only_test,
     ordered_test,
 )
 
 
-class TestLanguageSubcmdsNoDebug(TestBaseRemote):
+class TestLanguageSubcmdsNoDebug(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests the 'language renderscript' subcommands without debug info.
 
     In particular, module dump should report missing debug info.
@@ -47,9 +48,7 @@ class TestLanguageSubcmdsNoDebug(TestBaseRemote):
     @ordered_test(0)
     def test_language_subcommands_no_debug(self):
         # pylint: disable=line-too-long
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('language renderscript kernel breakpoint set simple_kernel'
                          '',
@@ -17,12 +17,13 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     ordered_test,
     cpp_only_test,
 )
 
-class TestMultipleRSFiles(TestBaseRemote):
+class TestMultipleRSFiles(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests some commands on an apk which has two rs files.'''
 
     bundle_target = {
@@ -46,10 +47,7 @@ class TestMultipleRSFiles(TestBaseRemote):
         }[self.app_type]
 
     def test_multiple_rs_files(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered',
-                          'Runtime functions hooked'])
+        self.assert_runtime_status()
 
         self.try_command('breakpoint set --file first.rs --line 28',
                          ['(pending)'])
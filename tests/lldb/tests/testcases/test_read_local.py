@@ -17,6 +17,7 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     wimpy,
     ordered_test,
@@ -25,7 +26,7 @@ from harness.decorators import (
 )
 
 
-class TestReadLocal(TestBaseRemote):
+class TestReadLocal(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests inspecting local variables of all types.'''
 
     bundle_target = {
@@ -62,9 +63,7 @@ class TestReadLocal(TestBaseRemote):
     @wimpy
     @ordered_test(0)
     def test_setup(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('breakpoint set --file simple.rs --line 145', [])
 
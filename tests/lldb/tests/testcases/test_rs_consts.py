@@ -17,13 +17,14 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     ordered_test,
     cpp_only_test,
 )
 
 
-class TestRSConsts(TestBaseRemote):
+class TestRSConsts(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests examining the RenderScript constants.'''
 
     bundle_target = {
@@ -33,9 +34,7 @@ class TestRSConsts(TestBaseRemote):
     }
 
     def test_rs_consts(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('language renderscript kernel breakpoint set kernel',
                          [])
@@ -17,10 +17,11 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import wimpy
 
 
-class TestScriptGroup(TestBaseRemote):
+class TestScriptGroup(TestBaseRemote, RuntimeAssertionsMixin):
     bundle_target = {
         'java': 'ScriptGroup'
     }
@@ -38,10 +39,7 @@ class TestScriptGroup(TestBaseRemote):
         # number of allocation elements
         array_size = 8
 
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered',
-                          'rsdDebugHintScriptGroup2'])
+        self.assert_runtime_status(['rsdDebugHintScriptGroup2'])
 
         self.try_command('language renderscript scriptgroup breakpoint set scriptgroup_test',
                          ['Breakpoint 1: no locations (pending)'])
@@ -17,11 +17,12 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (ordered_test, wimpy)
 from harness.exception import TestSuiteException
 
 
-class TestSingleSource(TestBaseRemote):
+class TestSingleSource(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests debugging a function executed from Java using invoke_*.'''
 
     bundle_target = {
@@ -43,9 +44,7 @@ class TestSingleSource(TestBaseRemote):
     def test_startup(self):
 
         # pylint: disable=line-too-long
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('breakpoint set --name check_in',
                          ['(pending)'])
@@ -18,13 +18,14 @@ from __future__ import absolute_import
 
 import os
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     ordered_test,
     cpp_only_test,
 )
 
 
-class TestSourceStep(TestBaseRemote):
+class TestSourceStep(TestBaseRemote, RuntimeAssertionsMixin):
     '''Test stepping through the source using step-in, -over and -out.'''
 
     bundle_target = {
@@ -53,9 +54,7 @@ class TestSourceStep(TestBaseRemote):
         android.pop_prop('debug.rs.max-threads')
 
     def test_source_thread_step_in_out(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('b -f scalars.rs -l 63',
                          ['(pending)'])
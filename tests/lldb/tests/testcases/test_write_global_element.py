@@ -17,6 +17,7 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     ordered_test,
     wimpy,
@@ -24,7 +25,7 @@ from harness.decorators import (
 )
 
 
-class TestWriteGlobalElement(TestBaseRemote):
+class TestWriteGlobalElement(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests modifying elements of global variables of all types.'''
 
     bundle_target = {
@@ -76,9 +77,7 @@ class TestWriteGlobalElement(TestBaseRemote):
     @wimpy
     @ordered_test(0)
     def test_setup(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('b -f simple.rs -l 145', [])
 
@@ -17,13 +17,14 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     ordered_test,
     wimpy
 )
 
 
-class TestWriteLocal(TestBaseRemote):
+class TestWriteLocal(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests modifying local variables of all types.'''
 
     bundle_target = {
@@ -67,9 +68,7 @@ class TestWriteLocal(TestBaseRemote):
     @wimpy
     @ordered_test(0)
     def test_setup(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('b -f simple.rs -l 145', [])
 
@@ -17,13 +17,14 @@
 from __future__ import absolute_import
 
 from harness.test_base_remote import TestBaseRemote
+from harness.assert_mixins import RuntimeAssertionsMixin
 from harness.decorators import (
     wimpy,
     ordered_test
 )
 
 
-class TestWriteLocalElement(TestBaseRemote):
+class TestWriteLocalElement(TestBaseRemote, RuntimeAssertionsMixin):
     '''Tests modifying elements of local variables of all types.'''
 
     bundle_target = {
@@ -75,9 +76,7 @@ class TestWriteLocalElement(TestBaseRemote):
     @wimpy
     @ordered_test(0)
     def test_setup(self):
-        self.try_command('language renderscript status',
-                         ['Runtime Library discovered',
-                          'Runtime Driver discovered'])
+        self.assert_runtime_status()
 
         self.try_command('b -f simple.rs -l 145', [])
 